@@ -0,0 +1,57 @@
+"""
+Refinacja z podziałem dziedziny (src/decomposition.py) w porównaniu
+z RefinementEngine na całym grafie.
+
+Na siatce n x n oznaczamy (P0) co `krok`-ty element, a następnie propagujemy
+podział do punktu stałego: szeregowo oraz w k poddziedzinach przetwarzanych
+w osobnych procesach. Wypisuje czas, liczbę rund i zsynchronizowanych węzłów
+halo oraz zgodność wyniku z przebiegiem szeregowym.
+
+Uruchomienie:
+    python -m benchmarks.bench_decomposition [n] [krok]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+from src.decomposition import DomainDecomposition
+from src.engine import RefinementEngine
+from src.productions.p0 import ProductionP0
+from tests.graphs import get_grid_graph
+from benchmarks.bench_engine import _signature
+
+
+def _marked_grid(n, step):
+    graph = get_grid_graph(n)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for k in range(1, n * n + 1, step):
+            ProductionP0().apply(graph, target_id=f"Q{k}")
+    return graph
+
+
+def main(n=30, step=1):
+    serial = _marked_grid(n, step)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        RefinementEngine().run(serial)
+        serial_time = time.perf_counter() - start
+    expected = _signature(serial)
+
+    print(f"Siatka {n}x{n}, oznaczony co {step}. element, procesorów: {os.cpu_count()}")
+    print(f"{'':<12}{'czas [s]':>10}{'rundy':>7}{'halo':>7}{'zgodne':>8}")
+    print(f"{'szeregowo':<12}{serial_time:>10.3f}{'-':>7}{'-':>7}{'-':>8}")
+    for k in (1, 2, 4, 8):
+        graph = _marked_grid(n, step)
+        start = time.perf_counter()
+        report = DomainDecomposition(k).run(graph)
+        elapsed = time.perf_counter() - start
+        same = _signature(graph) == expected
+        print(f"{f'k={k}':<12}{elapsed:>10.3f}{report.rounds:>7}{report.synced:>7}{str(same):>8}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,77 @@
+"""
+Benchmark pamięci i szybkości tworzenia elementów (Vertex / Hyperedge).
+
+Porównuje klasy z __slots__ z ich odpowiednikami z __dict__ na instancję
+(podklasa bez __slots__ - ta sama semantyka, uid-owe hashowanie i równość).
+
+Uruchomienie:
+    python -m benchmarks.bench_elements [liczba_elementów]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from src.elements import Vertex, Hyperedge
+
+
+class DictVertex(Vertex):
+    """Vertex z __dict__ na instancję (punkt odniesienia)."""
+
+
+class DictHyperedge(Hyperedge):
+    """Hyperedge z __dict__ na instancję (punkt odniesienia)."""
+
+
+def _make_vertices(cls, n):
+    return [cls(uid=i, x=float(i), y=float(-i)) for i in range(n)]
+
+
+def _make_hyperedges(cls, n):
+    return [cls(uid=i, label="E", r=0, b=1) for i in range(n)]
+
+
+def bytes_per_element(factory, cls, n):
+    """Średnia liczba bajtów zaalokowanych na jeden element (bez listy i uid)."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    elements = factory(cls, n)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Lista oraz obiekty int/float nie zależą od wariantu klasy - odejmujemy je
+    shared = sys.getsizeof(elements)
+    del elements
+    return (after - before - shared) / n
+
+
+def elements_per_second(factory, cls, n, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        factory(cls, n)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main(n=200_000):
+    rows = [
+        ("Vertex (__slots__)", _make_vertices, Vertex),
+        ("Vertex (__dict__)", _make_vertices, DictVertex),
+        ("Hyperedge (__slots__)", _make_hyperedges, Hyperedge),
+        ("Hyperedge (__dict__)", _make_hyperedges, DictHyperedge),
+    ]
+
+    print(f"Liczba elementów: {n}")
+    print(f"{'klasa':<24}{'B/element':>12}{'elementy/s':>16}")
+    for name, factory, cls in rows:
+        size = bytes_per_element(factory, cls, n)
+        rate = elements_per_second(factory, cls, n)
+        print(f"{name:<24}{size:>12.1f}{rate:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,84 @@
+"""
+Porównanie silnika worklisty (src/engine.py) z naiwną pętlą "każda produkcja
+skanuje cały graf, aż nic się nie zmieni".
+
+Na siatce n x n oznaczamy elementy w narożnym kwadracie (bok n * ułamek) i
+propagujemy podział do punktu stałego: naiwną pętlą oraz silnikiem z
+seeds (oznaczone elementy) i bez nich. Wypisuje liczbę wywołań apply_rhs /
+find_lhs, liczbę sprawdzonych hiperkrawędzi, najlepszy z kilku czasów oraz
+zgodność wyników.
+
+Uruchomienie:
+    python -m benchmarks.bench_engine [n] [ułamek] [powtórzenia]
+"""
+
+import sys
+import time
+
+from src import marking
+from src.elements import Vertex
+from src.engine import RefinementEngine, run_naive
+from tests.graphs import get_grid_graph
+
+
+def _marked_grid(n, fraction):
+    graph = get_grid_graph(n)
+    seeds = marking.mark(graph, marking.in_box(0, 0, n * fraction, n * fraction))
+    return graph, seeds
+
+
+def _signature(graph):
+    """Stan grafu niezależny od uid: wierzchołki i hiperkrawędzie po współrzędnych."""
+    vertices = sorted(
+        (v.x, v.y, v.hanging) for _, v in graph._storage.nodes() if isinstance(v, Vertex)
+    )
+    hyperedges = sorted(
+        (h.label, h.r, h.b, tuple(sorted((v.x, v.y) for v in graph.get_hyperedge_vertices(h.uid))))
+        for h in graph.find_hyperedges()
+    )
+    return vertices, hyperedges
+
+
+def _run(method, n, fraction, repeats):
+    """Najlepszy czas z `repeats` przebiegów; zwraca (raport, czas, graf)."""
+    best = None
+    for _ in range(repeats):
+        graph, seeds = _marked_grid(n, fraction)
+        start = time.perf_counter()
+        if method == "naive":
+            report = run_naive(graph)
+        elif method == "seeds":
+            report = RefinementEngine().run(graph, seeds=seeds)
+        else:
+            report = RefinementEngine().run(graph)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[1]:
+            best = (report, elapsed, graph)
+    return best
+
+
+def main(n=40, fraction=0.25, repeats=3):
+    naive, naive_time, naive_graph = _run("naive", n, fraction, repeats)
+    rows = [("naiwna pętla", naive, naive_time)]
+    same = True
+    for method, name in (("seeds", "worklista"), ("all", "worklista*")):
+        report, elapsed, graph = _run(method, n, fraction, repeats)
+        rows.append((name, report, elapsed))
+        same = same and _signature(graph) == _signature(naive_graph)
+
+    print(f"Siatka {n}x{n}, oznaczony kwadrat {n * fraction:g}x{n * fraction:g}")
+    print(f"{'':<14}{'apply_rhs':>12}{'find_lhs':>12}{'sprawdzone':>12}{'czas [s]':>12}")
+    for name, r, t in rows:
+        print(
+            f"{name:<14}{r.applications:>12}{r.lhs_calls:>12}"
+            f"{r.candidates_examined:>12}{t:>12.3f}"
+        )
+    print("* bez seeds - pierwsza runda sprawdza wszystkie hiperkrawędzie")
+    print(f"Zaoszczędzono (worklista): {rows[1][1].savings(naive)}")
+    print(f"Przyspieszenie (worklista): {naive_time / rows[1][2]:.2f}x")
+    print(f"Ten sam wynik: {same}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    main(*(cast(a) for cast, a in zip((int, float, int), args)))
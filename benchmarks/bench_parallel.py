@@ -0,0 +1,46 @@
+"""
+Równoległe find_lhs (src/parallel.py) w porównaniu z szeregowym.
+
+Na siatce n x n oznaczamy (P0) część elementów i dla każdej produkcji mierzymy
+find_lhs na całym grafie: szeregowo oraz w puli procesów czytających migawkę
+grafu z pamięci współdzielonej. Czas utworzenia migawki podajemy osobno.
+
+Uruchomienie:
+    python -m benchmarks.bench_parallel [n] [liczba_procesów]
+"""
+
+import contextlib
+import io
+import sys
+
+from src.engine import default_productions
+from src.parallel import ParallelMatcher
+from src.productions.p0 import ProductionP0
+from tests.graphs import get_grid_graph
+
+
+def main(n=60, processes=None):
+    graph = get_grid_graph(n)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for k in range(1, n * n + 1, 3):
+            ProductionP0().apply(graph, target_id=f"Q{k}")
+
+    with ParallelMatcher(graph, processes=processes) as matcher:
+        reports = matcher.compare(default_productions())
+        print(f"Siatka {n}x{n}, węzłów: {len(graph)}, procesów: {matcher.processes}")
+        print(f"Migawka: {matcher.snapshot_time:.3f} s")
+
+    print(
+        f"{'produkcja':<14}{'kandydaci':>10}{'dopas.':>8}"
+        f"{'szereg. [s]':>13}{'równol. [s]':>13}{'przysp.':>9}{'zgodne':>8}"
+    )
+    for r in reports:
+        print(
+            f"{r.production:<14}{r.candidates:>10}{r.matches:>8}"
+            f"{r.serial_time:>13.4f}{r.parallel_time:>13.4f}{r.speedup:>9.2f}{str(r.identical):>8}"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,36 @@
+"""
+Profil przebiegu silnika worklisty: które produkcje i które zapytania grafu
+zajmują czas (src/profiling.py).
+
+Na siatce n x n oznaczamy (P0) wszystkie elementy i propagujemy podział do
+punktu stałego. Wypisuje tabelę czasów i zapisuje ślad Chrome Trace (do
+otwarcia w chrome://tracing, Perfetto lub speedscope).
+
+Uruchomienie:
+    python -m benchmarks.bench_profile [n] [plik_śladu]
+"""
+
+import sys
+
+from src.engine import RefinementEngine
+from src.productions.p0 import ProductionP0
+from src.profiling import profiling
+from tests.graphs import get_grid_graph
+
+
+def main(n=15, trace_path="profile_trace.json"):
+    graph = get_grid_graph(n)
+    with profiling() as prof:
+        ProductionP0().apply(graph)
+        RefinementEngine().run(graph)
+
+    print(f"Siatka {n}x{n}, wszystkie elementy oznaczone")
+    print(prof.table())
+    prof.dump_chrome_trace(trace_path)
+    print(f"Ślad Chrome Trace: {trace_path} ({len(prof.events)} zdarzeń)")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    path = sys.argv[2] if len(sys.argv) > 2 else "profile_trace.json"
+    main(n, path)
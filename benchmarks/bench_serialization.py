@@ -0,0 +1,50 @@
+"""
+Zapis i wczytanie grafu w formacie binarnym (src/serialization.py).
+
+Na siatce n x n mierzymy: budowę grafu wywołaniami add_vertex / connect
+(tests.graphs.get_grid_graph), zapis save_graph, zmapowanie pliku
+(load_packed) oraz zbiorcze zbudowanie grafu z pliku (load_graph) dla
+obu backendów.
+
+Uruchomienie:
+    python -m benchmarks.bench_serialization [n]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.serialization import load_graph, load_packed, save_graph
+from src.storage import BACKEND_NETWORKX, BACKEND_SETS
+from tests.graphs import get_grid_graph
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n=200):
+    graph, build_time = _timed(get_grid_graph, n)
+    print(f"Siatka {n}x{n}, węzłów: {len(graph)}")
+    print(f"{'budowa (add_vertex/connect)':<32}{build_time:>9.3f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mesh.gg")
+        size, save_time = _timed(save_graph, graph, path)
+        print(f"{'save_graph':<32}{save_time:>9.3f} s   {size / 2**20:.1f} MiB")
+
+        packed, map_time = _timed(load_packed, path)
+        print(f"{'load_packed (mmap)':<32}{map_time:>9.3f} s")
+        del packed
+
+        for backend in (BACKEND_NETWORKX, BACKEND_SETS):
+            loaded, load_time = _timed(load_graph, path, backend=backend)
+            assert len(loaded) == len(graph)
+            print(f"{'load_graph ' + backend:<32}{load_time:>9.3f} s")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
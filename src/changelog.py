@@ -0,0 +1,316 @@
+import json
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from . import tracing
+from .elements import Vertex, Hyperedge
+from .events import (
+    Connected,
+    Disconnected,
+    GraphEvent,
+    HyperedgeChanged,
+    NodeAdded,
+    NodeRemoved,
+    VertexChanged,
+    VertexMoved,
+)
+from .graph import Graph
+from .serialization import graph_from_bytes, graph_to_bytes
+from .storage import BACKEND_NETWORKX
+
+PathLike = Union[str, os.PathLike]
+
+# Dziennik to ciąg fragmentów dopisywanych na końcu pliku. Nagłówek fragmentu:
+# sygnatura, rodzaj, numer pierwszego kroku, liczba kroków, długość danych.
+# - KIND_DELTA: kroki first..first+count-1, dane = zlib(JSON [[etykieta, zmiany], ...])
+# - KIND_KEYFRAME: pełny graf po kroku first (graph_to_bytes), count = 0
+CHUNK_MAGIC = b"GGCL"
+KIND_DELTA = 0
+KIND_KEYFRAME = 1
+_CHUNK = struct.Struct("<4sBIII")
+
+# Zmiany w kroku (listy JSON, pierwszy element - kod operacji):
+#   ["+v", uid, x, y, hanging]   ["+h", uid, label, r, b]   ["-", uid]
+#   ["mv", uid, x, y]            ["ch", uid, label, r, b]     ["hg", uid, hanging]
+#   ["c", uid1, uid2]            ["d", uid1, uid2]
+Op = List[Any]
+
+
+def _op(event: GraphEvent) -> Op:
+    if isinstance(event, NodeAdded):
+        node = event.node
+        if isinstance(node, Vertex):
+            return ["+v", node.uid, node.x, node.y, int(node.hanging)]
+        return ["+h", node.uid, node.label, node.r, node.b]
+    if isinstance(event, NodeRemoved):
+        return ["-", event.uid]
+    if isinstance(event, VertexMoved):
+        return ["mv", event.uid, *event.new]
+    if isinstance(event, VertexChanged):
+        return ["hg", event.uid, int(event.new)]
+    if isinstance(event, HyperedgeChanged):
+        return ["ch", event.uid, *event.new]
+    if isinstance(event, Connected):
+        return ["c", event.uid1, event.uid2]
+    return ["d", event.uid1, event.uid2]
+
+
+def replay(graph: Graph, ops: List[Op]) -> None:
+    """Nanosi na graf zmiany jednego kroku dziennika."""
+    for op in ops:
+        code = op[0]
+        if code == "+v":
+            graph.add_vertex(Vertex(op[1], op[2], op[3], bool(op[4])))
+        elif code == "+h":
+            graph.add_hyperedge(Hyperedge(op[1], op[2], op[3], op[4]))
+        elif code == "-":
+            graph.remove_node(op[1])
+        elif code == "mv":
+            graph.update_vertex(op[1], x=op[2], y=op[3])
+        elif code == "hg":
+            graph.update_vertex(op[1], hanging=bool(op[2]))
+        elif code == "ch":
+            graph.update_hyperedge(op[1], label=op[2], r=op[3], b=op[4])
+        elif code == "c":
+            graph.connect(op[1], op[2])
+        elif code == "d":
+            graph.remove_edge(op[1], op[2])
+        else:
+            raise ValueError(f"Nieznana operacja w dzienniku zmian: {code}.")
+
+
+class _StepTracer(tracing.Tracer):
+    """Tracer, który przy każdym find_lhs / apply_rhs wyznacza granice kroków dziennika."""
+
+    def __init__(self, writer: "ChangeLogWriter"):
+        super().__init__()
+        self._writer = writer
+
+    def matched(self, production: Any, count: int) -> None:
+        super().matched(production, count)
+        self._writer._matched(production, count)
+
+    def rhs(self, production: Any, seconds: float) -> None:
+        super().rhs(production, seconds)
+        self._writer._applied(production)
+
+
+class ChangeLogWriter:
+    """
+    Zapisuje historię zmian grafu jako dziennik tylko do dopisywania: kolejne
+    kroki (np. zastosowania produkcji) zawierają wyłącznie zmiany zebrane ze
+    zdarzeń grafu (Graph.subscribe). Kroki są zapisywane fragmentami po
+    chunk_steps, a co keyframe_every kroków - pełny graf (klatka kluczowa),
+    od której ChangeLogReader zaczyna odtwarzanie. Plik jest nadpisywany;
+    pierwsza klatka (krok 0) to graf w chwili utworzenia dziennika.
+
+    Krok zamyka commit(etykieta); w bloku recording() robi to samo każde
+    zastosowanie produkcji (apply_rhs). Rejestr środków krawędzi jest tylko
+    w klatkach kluczowych, a pochodzenie elementów nie jest rejestrowane.
+    Flaga hanging jest zapisywana, gdy zmienia się przez update_vertex
+    (zdarzenie VertexChanged) - bezpośredni zapis v.hanging go omija.
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        path: PathLike,
+        chunk_steps: int = 64,
+        keyframe_every: int = 256,
+    ):
+        if chunk_steps < 1 or keyframe_every < 1:
+            raise ValueError("chunk_steps i keyframe_every muszą być dodatnie.")
+        if graph._pending is not None:
+            raise ValueError("Nie można rozpocząć dziennika zmian w trakcie transakcji.")
+        self.graph = graph
+        self.chunk_steps = chunk_steps
+        self.keyframe_every = keyframe_every
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._ops: List[Op] = []  # zmiany otwartego kroku
+        self._steps: List[Tuple[str, List[Op]]] = []  # zamknięte kroki przed zapisem
+        self._step = 0  # liczba zamkniętych kroków
+        self._label = ""  # etykieta zmian, które jeszcze nadejdą (zob. _matched / _applied)
+        self._keyframe_step = 0
+        self._write(KIND_KEYFRAME, 0, 0, graph_to_bytes(graph))
+        graph.subscribe(self._on_event)
+
+    def __enter__(self) -> "ChangeLogWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Liczba zamkniętych kroków."""
+        return self._step
+
+    def _on_event(self, event: GraphEvent) -> None:
+        self._ops.append(_op(event))
+
+    def commit(self, label: Optional[str] = None) -> Optional[int]:
+        """
+        Zamyka krok ze zmianami zebranymi od poprzedniego commit i zwraca jego
+        numer (od 1); bez zmian nie tworzy kroku i zwraca None.
+        """
+        if self._file is None:
+            raise ValueError("Dziennik zmian jest już zamknięty.")
+        if not self._ops:
+            return None
+        self._steps.append((self._label if label is None else label, self._ops))
+        self._ops = []
+        self._step += 1
+        if len(self._steps) >= self.chunk_steps:
+            self._flush()
+        # W transakcji graf zawiera zmiany, których zdarzenia jeszcze nie
+        # nadeszły - klatka kluczowa czeka na pierwszy krok poza transakcją
+        if (
+            self._step - self._keyframe_step >= self.keyframe_every
+            and self.graph._pending is None
+        ):
+            self._flush()
+            self._write(KIND_KEYFRAME, self._step, 0, graph_to_bytes(self.graph))
+            self._keyframe_step = self._step
+        return self._step
+
+    # Granice kroków z _StepTracer. Zmiany zebrane przed find_lhs lub apply_rhs
+    # należą do wcześniejszej pracy; w transakcji (apply_batched) zmiany RHS
+    # nadchodzą dopiero po jej końcu, więc dostają zapamiętaną etykietę
+    # produkcji przy następnej granicy.
+
+    def _matched(self, production: Any, count: int) -> None:
+        if self._file is None:
+            return
+        self.commit()
+        if count:
+            self._label = type(production).__name__
+
+    def _applied(self, production: Any) -> None:
+        if self._file is None:
+            return
+        name = type(production).__name__
+        if self.graph._pending is None:
+            self.commit(name)
+        else:
+            self.commit()
+        self._label = name
+
+    @contextmanager
+    def recording(self):
+        """
+        Blok, w którym każde zastosowanie produkcji jest osobnym krokiem
+        dziennika (przez śledzenie produkcji - src/tracing.py). Zwraca aktywny
+        Tracer, więc statystyki produkcji są dostępne jak w tracing().
+        """
+        with tracing.tracing(_StepTracer(self)) as trace:
+            try:
+                yield trace
+            finally:
+                self.commit()
+
+    def _flush(self) -> None:
+        if not self._steps:
+            return
+        payload = zlib.compress(json.dumps(self._steps, separators=(",", ":")).encode())
+        self._write(KIND_DELTA, self._step - len(self._steps) + 1, len(self._steps), payload)
+        self._steps = []
+
+    def _write(self, kind: int, first: int, count: int, payload: bytes) -> None:
+        self._file.write(_CHUNK.pack(CHUNK_MAGIC, kind, first, count, len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+
+    def close(self) -> None:
+        """Zamyka otwarty krok, zapisuje resztę kroków i przestaje śledzić graf."""
+        if self._file is None:
+            return
+        self.commit()
+        self._flush()
+        self.graph.unsubscribe(self._on_event)
+        self._file.close()
+        self._file = None
+
+
+class _Chunk(NamedTuple):
+    kind: int
+    first: int
+    count: int
+    offset: int  # początek danych w pliku
+    size: int
+
+
+class ChangeLogReader:
+    """
+    Odczyt dziennika ChangeLogWriter. Przy otwarciu czytane są tylko nagłówki
+    fragmentów; graph_at(krok) buduje graf z najbliższej wcześniejszej klatki
+    kluczowej i odtwarza zmiany kolejnych kroków. Niedokończony ostatni
+    fragment (przerwany zapis) jest pomijany.
+    """
+
+    def __init__(self, path: PathLike):
+        self._file = open(path, "rb")
+        self._chunks: List[_Chunk] = []
+        end = os.fstat(self._file.fileno()).st_size
+        offset = 0
+        while offset + _CHUNK.size <= end:
+            self._file.seek(offset)
+            magic, kind, first, count, size = _CHUNK.unpack(self._file.read(_CHUNK.size))
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Plik {path} nie jest dziennikiem zmian grafu.")
+            if offset + _CHUNK.size + size > end:
+                break
+            self._chunks.append(_Chunk(kind, first, count, offset + _CHUNK.size, size))
+            offset += _CHUNK.size + size
+        if not self._chunks or self._chunks[0].kind != KIND_KEYFRAME:
+            raise ValueError(f"Dziennik {path} nie zaczyna się klatką kluczową.")
+
+    def __enter__(self) -> "ChangeLogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        """Liczba zapisanych kroków."""
+        deltas = [c for c in self._chunks if c.kind == KIND_DELTA]
+        return deltas[-1].first + deltas[-1].count - 1 if deltas else 0
+
+    @property
+    def keyframes(self) -> List[int]:
+        """Kroki, po których zapisano pełny graf."""
+        return [c.first for c in self._chunks if c.kind == KIND_KEYFRAME]
+
+    def _payload(self, chunk: _Chunk) -> bytes:
+        self._file.seek(chunk.offset)
+        return self._file.read(chunk.size)
+
+    def steps(self, start: int = 1, stop: Optional[int] = None) -> Iterator[Tuple[int, str, List[Op]]]:
+        """Kroki start..stop (włącznie) jako (numer, etykieta, zmiany)."""
+        stop = len(self) if stop is None else stop
+        for chunk in self._chunks:
+            if chunk.kind != KIND_DELTA or chunk.first + chunk.count <= start:
+                continue
+            if chunk.first > stop:
+                break
+            steps = json.loads(zlib.decompress(self._payload(chunk)))
+            for number, (label, ops) in enumerate(steps, chunk.first):
+                if start <= number <= stop:
+                    yield number, label, ops
+
+    def graph_at(self, step: int, backend: str = BACKEND_NETWORKX) -> Graph:
+        """Graf po kroku step (0 - graf z chwili utworzenia dziennika)."""
+        if not 0 <= step <= len(self):
+            raise ValueError(f"Krok {step} spoza dziennika (0..{len(self)}).")
+        keyframe = max(
+            (c for c in self._chunks if c.kind == KIND_KEYFRAME and c.first <= step),
+            key=lambda c: c.first,
+        )
+        graph = graph_from_bytes(self._payload(keyframe), backend=backend)
+        for _, _, ops in self.steps(keyframe.first + 1, step):
+            replay(graph, ops)
+        return graph
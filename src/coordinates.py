@@ -0,0 +1,208 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .elements import Vertex
+from .storage import CowDict
+
+
+class CoordinateStore:
+    """
+    Współrzędne wierzchołków w jednej tablicy NumPy (N x 2, float64).
+    Każdy dołączony wierzchołek dostaje gęsty indeks wiersza; Vertex.x / Vertex.y
+    czytają i zapisują bezpośrednio ten wiersz. Usunięcie wierzchołka przenosi
+    ostatni wiersz w zwolnione miejsce, więc tablica pozostaje gęsta.
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        self._xy = np.empty((self.INITIAL_CAPACITY, 2), dtype=np.float64)
+        self._owners: List[Vertex] = []
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    @property
+    def xy(self) -> np.ndarray:
+        """
+        Widok (bez kopiowania) na współrzędne wszystkich wierzchołków, wiersz i
+        odpowiada wierzchołkowi o indeksie i. Widok jest ważny do najbliższego
+        dodania lub usunięcia wierzchołka (tablica może zostać powiększona).
+        """
+        return self._xy[: len(self._owners)]
+
+    @property
+    def raw(self) -> np.ndarray:
+        """Cały bufor (łącznie z wolną pojemnością) - używany przez Vertex."""
+        return self._xy
+
+    def snapshot(self) -> "CoordinateStore":
+        """
+        Kopia dla Graph.snapshot: tablica współrzędnych i lista właścicieli
+        kopiowane jednym memcpy. Właściciele to wciąż obiekty rodzica - migawka
+        podmienia je na własne przy pierwszym dostępie (Graph._adopt).
+        """
+        copy = CoordinateStore.__new__(CoordinateStore)
+        copy._xy = self._xy.copy()
+        copy._owners = list(self._owners)
+        return copy
+
+    def adopt(self, v: Vertex) -> Vertex:
+        """Własna kopia wierzchołka rodzica: ten sam wiersz, ale w tym magazynie."""
+        own = Vertex.__new__(Vertex)
+        own.uid = v.uid
+        own.hanging = v.hanging
+        own._x = own._y = 0.0
+        own._store = self
+        own._index = v._index
+        self._owners[v._index] = own
+        return own
+
+    def owner(self, index: int) -> Vertex:
+        return self._owners[index]
+
+    def attach(self, v: Vertex) -> None:
+        """Przenosi współrzędne wierzchołka do magazynu i podpina do niego Vertex."""
+        if v._store is self:
+            return
+        x, y = v.x, v.y
+        if v._store is not None:
+            v._store.detach(v)
+
+        index = len(self._owners)
+        if index == self._xy.shape[0]:
+            grown = np.empty((self._xy.shape[0] * 2, 2), dtype=np.float64)
+            grown[:index] = self._xy
+            self._xy = grown
+
+        self._xy[index, 0] = x
+        self._xy[index, 1] = y
+        self._owners.append(v)
+        v._store = self
+        v._index = index
+
+    def attach_many(self, vertices: Sequence[Vertex], xy: Optional[np.ndarray] = None) -> None:
+        """
+        Dołącza wiele nowych (niedołączonych) wierzchołków jednym zapisem do
+        tablicy. xy (K x 2): ich współrzędne, gdy są już policzone wektorowo.
+        """
+        count = len(vertices)
+        if any(v._store is not None for v in vertices):
+            raise ValueError("Wierzchołek jest już dołączony do magazynu współrzędnych.")
+        if xy is None:
+            xy = np.array([(v._x, v._y) for v in vertices], dtype=np.float64).reshape(-1, 2)
+
+        start = len(self._owners)
+        capacity = self._xy.shape[0]
+        if start + count > capacity:
+            while start + count > capacity:
+                capacity *= 2
+            grown = np.empty((capacity, 2), dtype=np.float64)
+            grown[:start] = self._xy[:start]
+            self._xy = grown
+
+        self._xy[start : start + count] = xy
+        self._owners.extend(vertices)
+        for index, v in enumerate(vertices, start):
+            v._store = self
+            v._index = index
+
+    def detach(self, v: Vertex) -> None:
+        """Odpina wierzchołek; jego współrzędne wracają do samego obiektu."""
+        if v._store is not self:
+            return
+        index = v._index
+        v._x, v._y = self._xy.item(index, 0), self._xy.item(index, 1)
+        v._store = None
+        v._index = -1
+
+        last = len(self._owners) - 1
+        moved = self._owners.pop()
+        if index != last:
+            self._xy[index] = self._xy[last]
+            self._owners[index] = moved
+            moved._index = index
+
+    def reattach(self, v: Vertex, index: int) -> None:
+        """
+        Odwrotność detach: wierzchołek wraca do wiersza index, a wierzchołek,
+        który detach tam przeniósł, wraca na koniec tablicy.
+        """
+        count = len(self._owners)
+        if count == self._xy.shape[0]:
+            grown = np.empty((count * 2, 2), dtype=np.float64)
+            grown[:count] = self._xy
+            self._xy = grown
+
+        if index < count:
+            moved = self._owners[index]
+            self._xy[count] = self._xy[index]
+            self._owners.append(moved)
+            moved._index = count
+            self._owners[index] = v
+        else:
+            self._owners.append(v)
+        self._xy[index, 0] = v._x
+        self._xy[index, 1] = v._y
+        v._store = self
+        v._index = index
+
+
+class CoordinateHash:
+    """
+    Rejestr wierzchołków po współrzędnych. Kluczem jest komórka siatki o boku
+    tolerance, w której leży punkt; dwa punkty odległe o co najwyżej tolerance
+    leżą w tej samej albo sąsiedniej komórce, więc find sprawdza 3 x 3
+    komórki - koszt O(1) niezależnie od liczby wierzchołków.
+    """
+
+    def __init__(self, tolerance: float = 1e-9):
+        if tolerance <= 0:
+            raise ValueError(f"Tolerancja musi być dodatnia (podano {tolerance}).")
+        self.tolerance = tolerance
+        self._buckets: Dict[Tuple[int, int], List[Vertex]] = {}
+        self._keys: Dict[Union[int, str], Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _key(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.tolerance), math.floor(y / self.tolerance)
+
+    def add(self, v: Vertex) -> None:
+        self.discard(v.uid)
+        key = self._key(v.x, v.y)
+        self._keys[v.uid] = key
+        # Kubełki nie są zmieniane w miejscu - migawki mogą współdzielić listy
+        self._buckets[key] = self._buckets.get(key, []) + [v]
+
+    def discard(self, uid: Union[int, str]) -> None:
+        key = self._keys.pop(uid, None)
+        if key is None:
+            return
+        bucket = [v for v in self._buckets[key] if v.uid != uid]
+        if bucket:
+            self._buckets[key] = bucket
+        else:
+            del self._buckets[key]
+
+    def snapshot(self) -> "CoordinateHash":
+        copy = CoordinateHash(self.tolerance)
+        copy._buckets = CowDict(self._buckets)
+        copy._keys = CowDict(self._keys)
+        return copy
+
+    def find(self, x: float, y: float) -> Optional[Vertex]:
+        """Najbliższy wierzchołek odległy o co najwyżej tolerance albo None."""
+        kx, ky = self._key(x, y)
+        limit = self.tolerance * self.tolerance
+        best, best_d2 = None, limit
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for v in self._buckets.get((kx + dx, ky + dy), ()):
+                    d2 = (v.x - x) ** 2 + (v.y - y) ** 2
+                    if d2 < best_d2 or (d2 == best_d2 and best is None):
+                        best, best_d2 = v, d2
+        return best
@@ -0,0 +1,318 @@
+import multiprocessing
+import os
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .elements import Vertex, Hyperedge
+from .engine import RefinementEngine, default_productions
+from .graph import Graph
+from .ids import NO_PARENT
+from .packed import PackedGraph
+from .productions.production import Production
+from .storage import BACKEND_SETS
+
+NodeId = Union[int, str]
+# ("V", x, y, hanging) dla wierzchołka, ("H", label, r, b) dla hiperkrawędzi
+NodeState = Tuple
+
+
+def partition_elements(graph: Graph, k: int) -> List[List[NodeId]]:
+    """
+    Dzieli elementy siatki (hiperkrawędzie inne niż E) na k poddziedzin metodą
+    rekurencyjnej bisekcji współrzędnych środków ciężkości - zawsze wzdłuż
+    dłuższego boku, proporcjonalnie do liczby części po obu stronach.
+    """
+    if k < 1:
+        raise ValueError(f"Liczba poddziedzin musi być dodatnia, podano {k}.")
+
+    elements = [h.uid for h in graph.find_hyperedges() if h.label != "E"]
+    if not elements:
+        return [[] for _ in range(k)]
+    centroids = np.array(
+        [graph.centroid(graph.get_hyperedge_vertices(uid)) for uid in elements]
+    ).reshape(-1, 2)
+
+    parts: List[List[NodeId]] = []
+
+    def bisect(indices: np.ndarray, parts_left: int) -> None:
+        if parts_left == 1:
+            parts.append([elements[i] for i in sorted(indices)])
+            return
+        xy = centroids[indices]
+        axis = int(np.argmax(xy.max(axis=0) - xy.min(axis=0))) if len(xy) else 0
+        order = indices[np.lexsort((xy[:, 1 - axis], xy[:, axis]))]
+        low = parts_left // 2
+        cut = len(order) * low // parts_left
+        bisect(order[:cut], low)
+        bisect(order[cut:], parts_left - low)
+
+    bisect(np.arange(len(elements)), k)
+    return parts
+
+
+def subdomain_nodes(graph: Graph, elements: Sequence[NodeId]) -> Set[NodeId]:
+    """
+    Węzły poddziedziny: jej elementy, ich wierzchołki oraz warstwa "halo" -
+    zarejestrowane środki krawędzi między tymi wierzchołkami (podział już
+    wykonany przez sąsiada) i wszystkie krawędzie E łączące wierzchołki poddziedziny.
+    """
+    vertices: Set[NodeId] = set()
+    for uid in elements:
+        vertices.update(v.uid for v in graph.get_hyperedge_vertices(uid))
+    for pair, mid in graph._midpoints.items():
+        if pair <= vertices:
+            vertices.add(mid)
+
+    nodes = set(elements) | vertices
+    for uid in vertices:
+        for h in graph.get_vertex_hyperedges(uid):
+            if h.label == "E" and all(
+                v.uid in vertices for v in graph.get_hyperedge_vertices(h.uid)
+            ):
+                nodes.add(h.uid)
+    return nodes
+
+
+@dataclass
+class SubdomainDelta:
+    """Zmiany wprowadzone w jednej poddziedzinie, w jej lokalnych uid."""
+
+    removed: List[NodeId] = field(default_factory=list)
+    changed: List[Tuple[NodeId, NodeState]] = field(default_factory=list)
+    # (uid, stan, uid rodzica lub None, numer dziecka) w kolejności dodania
+    added: List[Tuple[NodeId, NodeState, Optional[NodeId], int]] = field(
+        default_factory=list
+    )
+    # sąsiedzi nowych węzłów po zakończeniu przebiegu
+    added_neighbors: Dict[NodeId, List[NodeId]] = field(default_factory=dict)
+    connected: List[Tuple[NodeId, NodeId]] = field(default_factory=list)
+    disconnected: List[Tuple[NodeId, NodeId]] = field(default_factory=list)
+    midpoints: List[Tuple[NodeId, NodeId, NodeId]] = field(default_factory=list)
+    applications: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.removed or self.changed or self.added or self.connected
+            or self.disconnected or self.midpoints
+        )
+
+
+def _state(node: Union[Vertex, Hyperedge]) -> NodeState:
+    if isinstance(node, Vertex):
+        return "V", node.x, node.y, node.hanging
+    return "H", node.label, node.r, node.b
+
+
+def _refine_subdomain(
+    packed: PackedGraph, productions: List[Production]
+) -> SubdomainDelta:
+    """Proces roboczy: przebieg RefinementEngine na poddziedzinie do punktu stałego."""
+    local = packed.to_graph(backend=BACKEND_SETS)
+    before = {node.uid: _state(node) for node in local.nodes()}
+    adjacency = {uid: set(local._storage.neighbors(uid)) for uid in before}
+    midpoints = dict(local._midpoints)
+
+    report = RefinementEngine(productions).run(local)
+
+    delta = SubdomainDelta(applications=report.applications)
+    for uid, state in before.items():
+        if uid not in local:
+            delta.removed.append(uid)
+            continue
+        now = _state(local.get_node(uid))
+        if now != state:
+            delta.changed.append((uid, now))
+        neighbors = set(local._storage.neighbors(uid))
+        for other in neighbors - adjacency[uid]:
+            if other in before:
+                delta.connected.append((uid, other))
+        for other in adjacency[uid] - neighbors:
+            if other in local:
+                delta.disconnected.append((uid, other))
+
+    for node in local.nodes():
+        if node.uid in before:
+            continue
+        parent, slot, _ = local.lineage(node.uid)
+        parent_uid = local.uid_at(parent) if parent != NO_PARENT else None
+        delta.added.append((node.uid, _state(node), parent_uid, slot))
+        delta.added_neighbors[node.uid] = list(local._storage.neighbors(node.uid))
+
+    for pair, mid in local._midpoints.items():
+        if midpoints.get(pair) != mid:
+            v1, v2 = tuple(pair)
+            delta.midpoints.append((v1, v2, mid))
+
+    return delta
+
+
+@dataclass
+class DecompositionReport:
+    """Statystyki przebiegu DomainDecomposition.run."""
+
+    rounds: int = 0
+    applications: int = 0  # apply_rhs we wszystkich poddziedzinach
+    changed_subdomains: List[int] = field(default_factory=list)  # na rundę
+    synced: int = 0  # węzły z halo utożsamione z węzłem dodanym przez sąsiada
+    conflicts: int = 0  # zmiany węzłów usuniętych wcześniej przez inną poddziedzinę
+    converged: bool = True
+
+
+class DomainDecomposition:
+    """
+    Refinacja z podziałem dziedziny: elementy siatki są dzielone na k poddziedzin
+    (partition_elements), każda poddziedzina (z warstwą halo, zob.
+    subdomain_nodes) jest przetwarzana przez RefinementEngine w osobnym procesie,
+    a wyniki są scalane w grafie na końcu rundy.
+
+    Krawędzie współdzielone (B=0) między poddziedzinami są w obu kopiach, więc
+    obie strony mogą je podzielić. Przy scalaniu synchronizujemy je jak P2:
+    środek krawędzi (v1, v2), który sąsiad już dodał w tej rundzie, jest
+    używany ponownie, podobnie jak połówki krawędzi między tymi samymi
+    wierzchołkami. Podział wykonany tylko po jednej stronie trafia do halo
+    drugiej w kolejnej rundzie. Rundy trwają, aż żadna poddziedzina niczego nie
+    zmieni.
+    """
+
+    def __init__(
+        self,
+        k: int,
+        productions: Optional[Sequence[Production]] = None,
+        processes: Optional[int] = None,
+        max_rounds: Optional[int] = None,
+    ):
+        if k < 1:
+            raise ValueError(f"Liczba poddziedzin musi być dodatnia, podano {k}.")
+        self.k = k
+        self.productions = list(productions) if productions is not None else None
+        self.processes = processes or min(k, os.cpu_count() or 1)
+        self.max_rounds = max_rounds
+
+    def run(self, graph: Graph) -> DecompositionReport:
+        report = DecompositionReport()
+        productions = (
+            self.productions if self.productions is not None else default_productions()
+        )
+        with multiprocessing.get_context().Pool(self.processes) as pool:
+            while True:
+                if self.max_rounds is not None and report.rounds >= self.max_rounds:
+                    report.converged = False
+                    break
+                parts = [p for p in partition_elements(graph, self.k) if p]
+                packed = [
+                    PackedGraph.from_graph(graph, subdomain_nodes(graph, part))
+                    for part in parts
+                ]
+                deltas = pool.starmap(
+                    _refine_subdomain, [(p, productions) for p in packed]
+                )
+                report.rounds += 1
+                report.applications += sum(d.applications for d in deltas)
+                report.changed_subdomains.append(sum(1 for d in deltas if d))
+                if not any(deltas):
+                    break
+                self._merge(graph, deltas, report)
+        return report
+
+    @staticmethod
+    def _merge(
+        graph: Graph, deltas: List[SubdomainDelta], report: DecompositionReport
+    ) -> None:
+        """Przenosi zmiany poddziedzin do grafu (w kolejności poddziedzin) w jednej transakcji."""
+        with graph.transaction():
+            # Indeksy rodziców nowych węzłów - przed usunięciem rodziców z grafu
+            parent_index: Dict[NodeId, int] = {}
+            for delta in deltas:
+                for _, _, parent, _ in delta.added:
+                    if parent is not None and parent in graph:
+                        parent_index[parent] = graph.uid_index(parent)
+
+            for delta in deltas:
+                for uid in delta.removed:
+                    if uid in graph:
+                        graph.remove_node(uid)
+                for uid, state in delta.changed:
+                    if uid not in graph:
+                        report.conflicts += 1
+                        continue
+                    if state[0] == "V":
+                        _, x, y, hanging = state
+                        graph.update_vertex(uid, x=x, y=y, hanging=hanging)
+                    else:
+                        _, label, r, b = state
+                        graph.update_hyperedge(uid, label=label, r=r, b=b)
+
+            # Węzły dodane w tej rundzie przez wcześniejsze poddziedziny:
+            # środek krawędzi i krawędź E po parze wierzchołków (uid globalne)
+            synced_midpoints: Dict[FrozenSet[NodeId], NodeId] = {}
+            synced_edges: Dict[FrozenSet[NodeId], NodeId] = {}
+
+            for delta in deltas:
+                to_global: Dict[NodeId, NodeId] = {}
+                aliased: Set[NodeId] = set()
+
+                def glob(uid: NodeId) -> NodeId:
+                    return to_global.get(uid, uid)
+
+                midpoint_of = {mid: (v1, v2) for v1, v2, mid in delta.midpoints}
+                vertices = [a for a in delta.added if a[1][0] == "V"]
+                hyperedges = [a for a in delta.added if a[1][0] == "H"]
+
+                for uid, (_, x, y, hanging), _, _ in vertices:
+                    pair = midpoint_of.get(uid)
+                    key = frozenset(map(glob, pair)) if pair is not None else None
+                    if key is not None and key in synced_midpoints:
+                        to_global[uid] = synced_midpoints[key]
+                        aliased.add(uid)
+                        continue
+                    new_uid = graph.ids.next_vertex_uid()
+                    graph.add_vertex(Vertex(new_uid, x, y, hanging))
+                    to_global[uid] = new_uid
+                    if key is not None:
+                        synced_midpoints[key] = new_uid
+
+                for uid, (_, label, r, b), _, _ in hyperedges:
+                    key = None
+                    if label == "E":
+                        ends = frozenset(glob(v) for v in delta.added_neighbors[uid])
+                        if len(ends) == 2:
+                            key = ends
+                    if key is not None and key in synced_edges:
+                        to_global[uid] = synced_edges[key]
+                        aliased.add(uid)
+                        continue
+                    new_uid = graph.ids.next_hyperedge_uid(label)
+                    graph.add_hyperedge(Hyperedge(new_uid, label, r, b))
+                    to_global[uid] = new_uid
+                    if key is not None:
+                        synced_edges[key] = new_uid
+
+                report.synced += len(aliased)
+
+                for uid, _, parent, slot in delta.added:
+                    if uid in aliased or parent is None:
+                        continue
+                    if parent in to_global:
+                        index = graph.uid_index(to_global[parent])
+                    elif parent in parent_index:
+                        index = parent_index[parent]
+                    else:
+                        continue
+                    graph.record_lineage(to_global[uid], index, slot)
+
+                for uid, neighbors in delta.added_neighbors.items():
+                    for other in neighbors:
+                        if glob(other) in graph:
+                            graph.connect(glob(uid), glob(other))
+                for uid1, uid2 in delta.connected:
+                    if uid1 in graph and uid2 in graph:
+                        graph.connect(uid1, uid2)
+                for uid1, uid2 in delta.disconnected:
+                    if graph._storage.has_edge(uid1, uid2):
+                        graph.remove_edge(uid1, uid2)
+                for v1, v2, mid in delta.midpoints:
+                    v1, v2, mid = glob(v1), glob(v2), glob(mid)
+                    if v1 in graph and v2 in graph and mid in graph:
+                        graph.register_midpoint(v1, v2, mid)
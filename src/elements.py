@@ -1,21 +1,54 @@
-from dataclasses import dataclass
 from typing import Union
 
+# Atrybuty hiperkrawędzi, po których Graph indeksuje elementy
+_INDEXED_HYPEREDGE_ATTRS = frozenset(("label", "r", "b"))
+
 
-@dataclass
 class Vertex:
     """
     Reprezentuje geometryczny wierzchołek 2D (x, y).
+    Po dodaniu do grafu współrzędne są przechowywane w jego tablicy NumPy
+    (CoordinateStore), a x / y są widokami na odpowiedni wiersz.
+    Używa __slots__ - bez __dict__ na instancję (istotne przy milionach elementów).
     """
 
-    uid: Union[int, str]
-    x: float
-    y: float
-    hanging: bool = False  # Czy węzeł jest wiszący (hanging node)
+    __slots__ = ("uid", "_x", "_y", "_store", "_index", "hanging")
+
+    def __init__(
+        self, uid: Union[int, str], x: float, y: float, hanging: bool = False
+    ):
+        self.uid = uid
+        self._x = x
+        self._y = y
+        self._store = None  # CoordinateStore grafu, do którego dodano wierzchołek
+        self._index = -1  # Wiersz w CoordinateStore
+        self.hanging = hanging  # Czy węzeł jest wiszący (hanging node)
+
+    @property
+    def x(self) -> float:
+        if self._store is None:
+            return self._x
+        return self._store.raw.item(self._index, 0)
+
+    @x.setter
+    def x(self, value: float) -> None:
+        if self._store is None:
+            self._x = value
+        else:
+            self._store.raw[self._index, 0] = value
 
-    def __post_init__(self):
-        # Obejście dla dataclass, aby uid był dostępny (jeśli używamy go poza NetworkX)
-        pass
+    @property
+    def y(self) -> float:
+        if self._store is None:
+            return self._y
+        return self._store.raw.item(self._index, 1)
+
+    @y.setter
+    def y(self, value: float) -> None:
+        if self._store is None:
+            self._y = value
+        else:
+            self._store.raw[self._index, 1] = value
 
     def __repr__(self):
         return f"V(id={self.uid}, x={self.x}, y={self.y}, h={self.hanging})"
@@ -29,16 +62,35 @@ class Vertex:
         return self.uid == other.uid
 
 
-@dataclass
 class Hyperedge:
     """
     Reprezentuje hiperkrawędź: Wnętrze (Q, P, S) lub Krawędź (E).
+    Używa __slots__ - bez __dict__ na instancję.
     """
 
-    uid: Union[int, str]
-    label: str  # 'Q', 'E', 'P', 'S'
-    r: int = 0  # Refinement flag (0 lub 1)
-    b: int = 0  # Boundary flag (0 lub 1)
+    __slots__ = ("uid", "label", "r", "b", "_graph")
+
+    def __init__(self, uid: Union[int, str], label: str, r: int = 0, b: int = 0):
+        # object.__setattr__ omija śledzenie zmian - obiekt nie należy jeszcze do grafu
+        object.__setattr__(self, "uid", uid)
+        object.__setattr__(self, "label", label)  # 'Q', 'E', 'P', 'S'
+        object.__setattr__(self, "r", r)  # Refinement flag (0 lub 1)
+        object.__setattr__(self, "b", b)  # Boundary flag (0 lub 1)
+        # Słaba referencja do grafu, do którego dodano hiperkrawędź
+        # (ustawiana przez Graph.add_hyperedge)
+        object.__setattr__(self, "_graph", None)
+
+    def __setattr__(self, name, value):
+        # Graf, do którego dodano hiperkrawędź, musi widzieć zmiany label/R/B,
+        # nawet jeśli są wykonywane bezpośrednio na obiekcie (np. `he.r = 1`).
+        ref = self._graph
+        graph = ref() if ref is not None else None
+        if graph is None or name not in _INDEXED_HYPEREDGE_ATTRS:
+            object.__setattr__(self, name, value)
+            return
+        old_key = (self.label, self.r, self.b)
+        object.__setattr__(self, name, value)
+        graph._on_hyperedge_changed(self, old_key)
 
     def __repr__(self):
         return f"{self.label}(id={self.uid}, R={self.r}, B={self.b})"
@@ -0,0 +1,272 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from .elements import Vertex
+from .graph import Graph
+from .productions.production import Production
+from .productions.p1 import ProductionP1
+from .productions.p2 import ProductionP2
+from .productions.p3 import ProductionP3
+from .productions.p4 import ProductionP4
+from .productions.p5 import ProductionP5
+from .productions.p7 import ProductionP7
+from .productions.p8 import ProductionP8
+from .productions.p10 import ProductionP10
+from .productions.p11 import ProductionP11
+from .productions.p13 import ProductionP13
+from .productions.p14 import ProductionP14
+
+NodeId = Union[int, str]
+
+
+def default_productions() -> List[Production]:
+    """
+    Produkcje propagujące podział: oznaczanie krawędzi (P1/P7/P10/P13), podział
+    krawędzi (P2 przed P3, P4) i podział elementów (P5/P8/P11/P14).
+    Produkcje oznaczające elementy (P0/P6/P9/P12) wybierają, CO dzielić - stosuje
+    się je wcześniej, np. z target_id; w pętli do punktu stałego dzieliłyby
+    bez końca każdy nowo powstały element.
+    """
+    return [
+        ProductionP1(),
+        ProductionP7(),
+        ProductionP10(),
+        ProductionP13(),
+        ProductionP2(),
+        ProductionP3(),
+        ProductionP4(),
+        ProductionP5(),
+        ProductionP8(),
+        ProductionP11(),
+        ProductionP14(),
+    ]
+
+
+@dataclass
+class RefinementReport:
+    """Statystyki jednego przebiegu do punktu stałego."""
+
+    applications: int = 0  # wywołania apply_rhs
+    idle_applications: int = 0  # ...z nich te, które nie zmieniły grafu
+    lhs_calls: int = 0  # wywołania find_lhs
+    candidates_examined: int = 0  # hiperkrawędzie sprawdzone (pełny skan: wszystkie o LHS_LABEL)
+    full_scans: int = 0  # wywołania find_lhs na całym grafie (bez target_id)
+    converged: bool = True
+
+    def savings(self, naive: "RefinementReport") -> Dict[str, int]:
+        """Ile pracy zaoszczędzono względem `naive` (np. wyniku run_naive)."""
+        return {
+            "applications": naive.applications - self.applications,
+            "lhs_calls": naive.lhs_calls - self.lhs_calls,
+            "candidates_examined": naive.candidates_examined - self.candidates_examined,
+            "full_scans": naive.full_scans - self.full_scans,
+        }
+
+
+class RefinementEngine:
+    """
+    Stosuje zbiór produkcji aż do punktu stałego, sterowany zbiorem brudnych
+    hiperkrawędzi. Po każdym apply_rhs graf zwraca uid dotkniętych węzłów
+    (Graph.take_changes); brudne stają się hiperkrawędzie incydentne z dotkniętymi
+    wierzchołkami. Kolejność jest taka jak w naiwnej pętli (rundy, w rundzie
+    produkcje po kolei), ale każda produkcja sprawdza (find_lhs z target_id) tylko
+    brudne węzły o swojej LHS_LABEL - czyli te, w których otoczeniu coś zmieniło
+    się od jej poprzedniego przebiegu - jednym find_lhs na produkcję w rundzie.
+    Wynik jest taki sam jak run_naive.
+    """
+
+    def __init__(
+        self,
+        productions: Optional[Sequence[Production]] = None,
+        max_applications: Optional[int] = None,
+    ):
+        self.productions = (
+            list(productions) if productions is not None else default_productions()
+        )
+        self.max_applications = max_applications
+
+    def run(
+        self, graph: Graph, seeds: Optional[Iterable[NodeId]] = None
+    ) -> RefinementReport:
+        """
+        Przetwarza graf do punktu stałego. seeds: uid węzłów, od których zaczyna
+        się praca (domyślnie wszystkie hiperkrawędzie grafu).
+        """
+        report = RefinementReport()
+        if seeds is None:
+            # Otoczenie wszystkich hiperkrawędzi to znowu wszystkie hiperkrawędzie
+            dirty = {h.uid for h in graph.find_hyperedges()}
+        else:
+            dirty = self._affected(graph, seeds)
+
+        was_tracking = graph.is_tracking
+        graph.start_tracking()
+        graph.take_changes()
+        try:
+            while dirty:
+                dirty_by_label = self._group_by_label(graph, dirty)
+                # Węzły dotknięte w tej rundzie - widoczne dla kolejnych produkcji
+                # jeszcze w tej rundzie i dla wszystkich w następnej
+                touched: Set[NodeId] = set()
+                touched_by_label: Dict[str, Set[NodeId]] = {}
+                for production in self.productions:
+                    candidates = self._candidates(
+                        graph, production, dirty_by_label, touched_by_label
+                    )
+                    if not candidates:
+                        continue
+                    # Jedno find_lhs dla wszystkich brudnych kandydatów produkcji -
+                    # jak w naiwnej pętli dopasowania powstają przed zastosowaniem RHS
+                    report.lhs_calls += 1
+                    report.candidates_examined += len(candidates)
+                    matches = production.find_lhs(graph, target_id=candidates)
+                    if self.max_applications is not None:
+                        budget = self.max_applications - report.applications
+                        if len(matches) > budget:
+                            report.converged = False
+                            matches = matches[:budget]
+                    changes: Set[NodeId] = set()
+                    if production.BATCH_APPLY:
+                        # Dopasowania są niezależne: jedno apply_batched
+                        if matches:
+                            production.apply_batched(graph, matches)
+                            report.applications += len(matches)
+                            changes = graph.take_changes()
+                            if not changes:
+                                report.idle_applications += len(matches)
+                    else:
+                        for match in matches:
+                            production.apply_rhs(graph, match)
+                            report.applications += 1
+                            changed = graph.take_changes()
+                            if not changed:
+                                report.idle_applications += 1
+                            changes |= changed
+                    # Otoczenie zmian liczone raz dla całej produkcji
+                    self._record_changes(graph, changes, touched, touched_by_label)
+                    if not report.converged:
+                        return report
+                dirty = touched
+        finally:
+            if not was_tracking:
+                graph.stop_tracking()
+
+        return report
+
+    def _record_changes(
+        self,
+        graph: Graph,
+        changes: Set[NodeId],
+        touched: Set[NodeId],
+        touched_by_label: Dict[str, Set[NodeId]],
+    ) -> None:
+        """Dołącza hiperkrawędzie z otoczenia zmienionych węzłów do dotkniętych w rundzie."""
+        if not changes:
+            return
+        new = self._affected(graph, changes) - touched
+        touched.update(new)
+        for label, uids in self._group_by_label(graph, new).items():
+            touched_by_label.setdefault(label, set()).update(uids)
+
+    @staticmethod
+    def _group_by_label(graph: Graph, uids: Iterable[NodeId]) -> Dict[str, Set[NodeId]]:
+        groups: Dict[str, Set[NodeId]] = {}
+        storage = graph._storage
+        for uid in uids:
+            if uid not in storage:
+                continue
+            node = storage.get(uid)
+            if not isinstance(node, Vertex):
+                groups.setdefault(node.label, set()).add(uid)
+        return groups
+
+    @staticmethod
+    def _candidates(
+        graph: Graph,
+        production: Production,
+        dirty_by_label: Dict[str, Set[NodeId]],
+        touched_by_label: Dict[str, Set[NodeId]],
+    ) -> List[NodeId]:
+        """Brudne hiperkrawędzie o etykiecie LHS produkcji."""
+        labels = (
+            [production.LHS_LABEL]
+            if production.LHS_LABEL is not None
+            else list(dirty_by_label.keys() | touched_by_label.keys())
+        )
+        candidates: Set[NodeId] = set()
+        for label in labels:
+            candidates |= dirty_by_label.get(label, set())
+            candidates |= touched_by_label.get(label, set())
+        # Kolejność dodania do grafu zapewnia find_hyperedges w candidate_scope
+        return list(candidates)
+
+    @staticmethod
+    def _affected(graph: Graph, changed: Iterable[NodeId]) -> Set[NodeId]:
+        """
+        Hiperkrawędzie, których LHS mogła się zmienić: same dotknięte hiperkrawędzie
+        oraz wszystkie hiperkrawędzie incydentne z ich wierzchołkami (i z
+        dotkniętymi wierzchołkami).
+        """
+        # Graf jest dwudzielny: sąsiedzi hiperkrawędzi to wierzchołki i odwrotnie,
+        # więc wystarczą uid sąsiadów z magazynu, bez budowania list obiektów
+        storage = graph._storage
+        hyperedges: Set[NodeId] = set()
+        vertices: Set[NodeId] = set()
+        for uid in changed:
+            if uid not in storage:
+                continue
+            if isinstance(storage.get(uid), Vertex):
+                vertices.add(uid)
+            else:
+                hyperedges.add(uid)
+                vertices.update(storage.neighbors(uid))
+
+        for vertex_uid in vertices:
+            hyperedges.update(storage.neighbors(vertex_uid))
+
+        return hyperedges
+
+
+def run_naive(
+    graph: Graph,
+    productions: Optional[Sequence[Production]] = None,
+    max_rounds: Optional[int] = None,
+) -> RefinementReport:
+    """
+    Pętla odniesienia: w każdej rundzie każda produkcja skanuje cały graf
+    (find_lhs bez target_id) i stosuje wszystkie dopasowania; koniec, gdy runda
+    niczego nie zmieni. Służy do porównania z RefinementEngine.run.
+    """
+    productions = list(productions) if productions is not None else default_productions()
+    report = RefinementReport()
+
+    was_tracking = graph.is_tracking
+    graph.start_tracking()
+    graph.take_changes()
+    try:
+        rounds = 0
+        changed = True
+        while changed:
+            if max_rounds is not None and rounds >= max_rounds:
+                report.converged = False
+                break
+            rounds += 1
+            changed = False
+            for production in productions:
+                report.lhs_calls += 1
+                report.full_scans += 1
+                report.candidates_examined += len(
+                    graph.find_hyperedges(label=production.LHS_LABEL)
+                )
+                for match in production.find_lhs(graph):
+                    production.apply_rhs(graph, match)
+                    report.applications += 1
+                    if graph.take_changes():
+                        changed = True
+                    else:
+                        report.idle_applications += 1
+    finally:
+        if not was_tracking:
+            graph.stop_tracking()
+
+    return report
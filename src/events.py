@@ -0,0 +1,119 @@
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+
+from .elements import Vertex, Hyperedge
+
+NodeId = Union[int, str]
+LabelKey = Tuple[str, int, int]
+
+
+class NodeAdded(NamedTuple):
+    uid: NodeId
+    node: Union[Vertex, Hyperedge]
+
+
+class NodeRemoved(NamedTuple):
+    """Emitowane po Disconnected dla wszystkich połączeń usuwanego węzła."""
+
+    uid: NodeId
+    node: Union[Vertex, Hyperedge]
+
+
+class VertexMoved(NamedTuple):
+    uid: NodeId
+    old: Tuple[float, float]
+    new: Tuple[float, float]
+
+
+class VertexChanged(NamedTuple):
+    """Zmiana flagi hanging wierzchołka (update_vertex(..., hanging=...))."""
+
+    uid: NodeId
+    old: bool
+    new: bool
+
+
+class HyperedgeChanged(NamedTuple):
+    """Zmiana (label, R, B) hiperkrawędzi - także przez bezpośrednie `he.r = 1`."""
+
+    uid: NodeId
+    old: LabelKey
+    new: LabelKey
+
+
+class Connected(NamedTuple):
+    uid1: NodeId
+    uid2: NodeId
+
+
+class Disconnected(NamedTuple):
+    uid1: NodeId
+    uid2: NodeId
+
+
+GraphEvent = Union[
+    NodeAdded, NodeRemoved, VertexMoved, VertexChanged, HyperedgeChanged, Connected, Disconnected
+]
+
+# Zdarzenia zmiany stanu istniejącego węzła (sklejane w coalesce po rodzaju i uid)
+_CHANGE_EVENTS = (VertexMoved, VertexChanged, HyperedgeChanged)
+
+
+def touched_uids(event: GraphEvent) -> Tuple[NodeId, ...]:
+    """uid węzłów, których stan lub sąsiedztwo zmienia zdarzenie (usunięty węzeł pomijamy)."""
+    if isinstance(event, (Connected, Disconnected)):
+        return event.uid1, event.uid2
+    if isinstance(event, NodeRemoved):
+        return ()
+    return (event.uid,)
+
+
+def coalesce(events: List[GraphEvent]) -> List[GraphEvent]:
+    """
+    Skleja zdarzenia jednej transakcji, zachowując kolejność pozostałych:
+    - węzeł dodany i usunięty w transakcji znika całkowicie,
+    - zmiany węzła dodanego w transakcji są pomijane (NodeAdded wskazuje obiekt),
+    - kolejne zmiany tego samego rodzaju i węzła łączą się w jedną (pierwsze old,
+      ostatnie new), a zmiana bez efektu netto znika,
+    - Connected, po którym nastąpił Disconnected tej samej pary, znika.
+    """
+    out: List[Optional[GraphEvent]] = []
+    added_at: Dict[NodeId, int] = {}
+    changed_at: Dict[Tuple[type, NodeId], int] = {}
+    connected_at: Dict[FrozenSet[NodeId], int] = {}
+
+    for event in events:
+        if isinstance(event, NodeAdded):
+            added_at[event.uid] = len(out)
+            out.append(event)
+        elif isinstance(event, NodeRemoved):
+            for kind in _CHANGE_EVENTS:
+                changed_at.pop((kind, event.uid), None)
+            index = added_at.pop(event.uid, None)
+            if index is not None:
+                out[index] = None
+            else:
+                out.append(event)
+        elif isinstance(event, _CHANGE_EVENTS):
+            if event.uid in added_at:
+                continue
+            key = (type(event), event.uid)
+            index = changed_at.get(key)
+            if index is None:
+                changed_at[key] = len(out)
+                out.append(event)
+                continue
+            merged = event._replace(old=out[index].old)
+            out[index] = merged if merged.old != merged.new else None
+            if out[index] is None:
+                del changed_at[key]
+        elif isinstance(event, Connected):
+            connected_at[frozenset((event.uid1, event.uid2))] = len(out)
+            out.append(event)
+        else:
+            index = connected_at.pop(frozenset((event.uid1, event.uid2)), None)
+            if index is not None:
+                out[index] = None
+            else:
+                out.append(event)
+
+    return [event for event in out if event is not None]
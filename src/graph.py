@@ -1,36 +1,363 @@
+import itertools
+import weakref
+from contextlib import contextmanager
 import networkx as nx
-from typing import List, Union, Optional
+import numpy as np
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    Optional,
+)
 
+from .coordinates import CoordinateHash, CoordinateStore
 from .elements import Vertex, Hyperedge
+from .events import (
+    Connected,
+    Disconnected,
+    GraphEvent,
+    HyperedgeChanged,
+    NodeAdded,
+    NodeRemoved,
+    VertexChanged,
+    VertexMoved,
+    coalesce,
+    touched_uids,
+)
+from .ids import IdAllocator, UidInterner
+from .storage import BACKEND_NETWORKX, CowDict, OverlayStorage, create_storage
+
+LabelKey = Tuple[str, int, int]
+PairKey = FrozenSet[Union[int, str]]
+
+
+def _copy_pair_bucket(
+    by_label: Dict[str, Dict[Union[int, str], Hyperedge]]
+) -> Dict[str, Dict[Union[int, str], Hyperedge]]:
+    """Kopia (małego) wpisu indeksu par wierzchołków dla migawki."""
+    return {label: dict(bucket) for label, bucket in by_label.items()}
+
+
+def _peek(index: Mapping, key, default=None):
+    """Odczyt z indeksu bez kopiowania kubełka migawki (CowDict.peek)."""
+    if isinstance(index, CowDict):
+        return index.peek(key, default)
+    return index.get(key, default)
 
 
 class Graph:
-    def __init__(self):
-        self._nx_graph = nx.Graph()
+    def __init__(self, backend: str = BACKEND_NETWORKX):
+        """
+        backend: sposób przechowywania grafu - "networkx" (domyślny, nx.Graph)
+        lub "sets" (lekkie słowniki sąsiedztwa bez duplikowania atrybutów).
+        """
+        self._backend = backend
+        self._storage = create_storage(backend)
+        # Współrzędne wszystkich wierzchołków w jednej tablicy NumPy
+        self._coords = CoordinateStore()
+        # Przydział identyfikatorów nowych węzłów - liczniki śledzą dodawane uid
+        self._ids = IdAllocator()
+        # uid -> indeks kolejności dodania (tablica pomocnicza - magazyn i indeksy
+        # grafu są kluczowane uid) + rekordy pochodzenia elementów
+        self._interner = UidInterner()
+        # Indeks hiperkrawędzi po (label, R, B) -> {uid: Hyperedge}.
+        # Pozwala produkcjom pomijać wierzchołki i niepasujące hiperkrawędzie.
+        self._label_index: Dict[LabelKey, Dict[Union[int, str], Hyperedge]] = {}
+        # Indeks par wierzchołków: {v1, v2} -> {label: {uid: Hyperedge}} dla
+        # hiperkrawędzi połączonych z oboma wierzchołkami.
+        self._pair_index: Dict[
+            PairKey, Dict[str, Dict[Union[int, str], Hyperedge]]
+        ] = {}
+        # Rejestr podzielonych krawędzi: {narożnik1, narożnik2} -> uid środka.
+        # Wypełniany przez produkcje dzielące krawędzie (P2, P3, P4).
+        self._midpoints: Dict[PairKey, Union[int, str]] = {}
+        # uid wierzchołka -> pary w rejestrze, w których występuje (do sprzątania)
+        self._midpoint_refs: Dict[Union[int, str], Set[PairKey]] = {}
+        # Opcjonalny rejestr wierzchołków po współrzędnych (zob. enable_vertex_dedup)
+        self._vertex_hash: Optional[CoordinateHash] = None
+        # Cykl narożników elementu przeciwnie do ruchu wskazówek zegara:
+        # uid hiperkrawędzi -> uid wierzchołków (zob. corner_cycles). Wpis znika
+        # przy każdej zmianie połączeń hiperkrawędzi lub ruchu jej wierzchołka.
+        self._corners: Dict[Union[int, str], Tuple[Union[int, str], ...]] = {}
+        # Subskrybenci zdarzeń zmian (src/events.py); bez subskrybentów mutacje
+        # nie tworzą żadnych obiektów zdarzeń
+        self._subscribers: List[Callable[[GraphEvent], None]] = []
+        # Zdarzenia zbierane w transakcji (None = poza transakcją)
+        self._pending: Optional[List[GraphEvent]] = None
+        self._transaction_depth = 0
+        # Dziennik cofania (zob. transaction(atomic=True)): operacje odwrotne do
+        # mutacji, None = poza transakcją atomową. Punkty powrotu zagnieżdżonych
+        # transakcji atomowych: (długość dziennika, liczniki identyfikatorów)
+        self._journal: Optional[List[tuple]] = None
+        self._savepoints: List[Tuple[int, IdAllocator]] = []
+        # uid węzłów dotkniętych przez mutacje (None = śledzenie wyłączone),
+        # zob. start_tracking / take_changes - używane przez silnik worklisty
+        self._changes: Optional[Set[Union[int, str]]] = None
+        # Zawężenie find_hyperedges do podanych uid (zob. candidate_scope)
+        self._scope: Optional[List[Union[int, str]]] = None
+        # Migawki (zob. snapshot): graf, z którego zrobiono tę migawkę, oraz
+        # liczba żywych migawek tego grafu - dopóki są, graf jest tylko do odczytu
+        self._parent: Optional["Graph"] = None
+        self._live_snapshots = 0
+        self._read_only = False
+        # Hiperkrawędzie grafu trzymają słabą referencję (Hyperedge._graph) - bez
+        # cykli referencji porzucona migawka znika od razu, bez czekania na gc
+        self._ref = weakref.ref(self)
+
+    def __contains__(self, uid: Union[int, str]) -> bool:
+        return uid in self._storage
+
+    def __len__(self) -> int:
+        return len(self._storage)
+
+    def nodes(self) -> Iterator[Union[Vertex, Hyperedge]]:
+        """Wszystkie węzły (wierzchołki i hiperkrawędzie) w kolejności dodania do grafu."""
+        for _, node in self._storage.nodes():
+            yield node
+
+    def snapshot(self) -> "Graph":
+        """
+        Migawka grafu kopiowana przy zapisie - do sprawdzania wariantów
+        podziału jednej siatki bez jej kopiowania. Migawka współdzieli
+        struktury z tym grafem: słowniki i kubełki indeksów (CowDict), listy
+        sąsiadów i obiekty węzłów (OverlayStorage) są kopiowane dopiero przy
+        pierwszej zmianie, a odczyty zwracają obiekty tego grafu - koszt
+        wariantu zależy od liczby zmienionych węzłów. Samo utworzenie migawki
+        kosztuje O(N): płaskie tablice (współrzędne, lista uid, pochodzenie)
+        są kopiowane w całości (memcpy, ok. 5 ms dla 100 tys. węzłów).
+
+        Dopóki migawka żyje, ten graf jest tylko do odczytu (zmiana - ValueError),
+        ale można z niego robić kolejne migawki. Węzły migawki zmienia się przez
+        jej metody (update_vertex, update_hyperedge...) - bezpośredni zapis
+        atrybutu węzła współdzielonego z tym grafem kończy się ValueError.
+        Niepotrzebny wariant zwalnia release(); odrzucenie wariantu to po
+        prostu release() i nowa migawka. Z migawki można robić kolejne migawki.
+        """
+        if self._parent is not None and not self._release.alive:
+            raise ValueError("Migawka została zwolniona - nie można z niej robić migawek.")
+        if self._pending is not None:
+            raise ValueError("Nie można zrobić migawki w trakcie transakcji.")
+        child = Graph(self._backend)
+        # Przez słabą referencję - magazyn migawki nie trzyma przy życiu jej samej
+        adopt = weakref.WeakMethod(child._adopt)
+        child._storage = OverlayStorage(self._storage, lambda node: adopt()(node))
+        child._coords = self._coords.snapshot()
+        child._ids = self._ids.snapshot()
+        child._interner = self._interner.snapshot()
+        child._label_index = CowDict(self._label_index, wrap=CowDict)
+        child._pair_index = CowDict(self._pair_index, wrap=_copy_pair_bucket)
+        child._midpoints = CowDict(self._midpoints)
+        child._midpoint_refs = CowDict(self._midpoint_refs, wrap=set)
+        child._corners = CowDict(self._corners)
+        if self._vertex_hash is not None:
+            child._vertex_hash = self._vertex_hash.snapshot()
+        child._parent = self
+
+        self._live_snapshots += 1
+        self._read_only = True
+        self._coords.raw.flags.writeable = False
+        # Zwolnienie także wtedy, gdy migawka zostanie po prostu porzucona
+        child._release = weakref.finalize(child, self._snapshot_released)
+        return child
+
+    def release(self) -> None:
+        """
+        Zwalnia migawkę: graf, z którego ją zrobiono, znów można zmieniać.
+        Po release() migawki nie należy już używać.
+        """
+        if self._parent is None:
+            raise ValueError("Ten graf nie jest migawką.")
+        if self._live_snapshots:
+            raise ValueError("Migawka ma własne żywe migawki - zwolnij je najpierw.")
+        self._read_only = True
+        self._release()
+
+    def _snapshot_released(self) -> None:
+        self._live_snapshots -= 1
+        if self._live_snapshots == 0:
+            self._read_only = False
+            self._coords.raw.flags.writeable = True
+
+    @property
+    def read_only(self) -> bool:
+        """True, dopóki istnieją migawki tego grafu (zob. snapshot)."""
+        return self._read_only
+
+    def _check_writable(self) -> None:
+        if self._read_only:
+            raise ValueError(
+                "Graf jest tylko do odczytu - istnieją jego migawki (snapshot), "
+                "migawka została zwolniona albo to widok PackedGraph.view(). "
+                "Węzły migawki zmienia się przez jej update_vertex / update_hyperedge."
+            )
+
+    def _adopt(self, node: Union[Vertex, Hyperedge]) -> Union[Vertex, Hyperedge]:
+        """Kopia węzła rodzica należąca do migawki (wywoływana przez OverlayStorage.own)."""
+        if isinstance(node, Vertex):
+            return self._coords.adopt(node)
+        own = Hyperedge(uid=node.uid, label=node.label, r=node.r, b=node.b)
+        object.__setattr__(own, "_graph", self._ref)
+        return own
+
+    def _owned(self, nodes: List) -> List:
+        """
+        W migawce indeksy mogą trzymać obiekty rodzica węzłów, które migawka
+        już skopiowała - zamienia je na obiekty z magazynu (bez kopiowania).
+        """
+        if self._parent is None:
+            return nodes
+        get = self._storage.get
+        return [get(node.uid) for node in nodes]
+
+    def _own(self, node: Union[Vertex, Hyperedge]) -> Union[Vertex, Hyperedge]:
+        """Węzeł do zmiany w miejscu - w migawce jej własna kopia (przy pierwszym zapisie)."""
+        if self._parent is None:
+            return node
+        return self._storage.own(node.uid)
 
     def add_vertex(self, v: Vertex) -> None:
         """Dodaje wierzchołek geometryczny 2D."""
-        self._nx_graph.add_node(v.uid, type="vertex", data=v, x=v.x, y=v.y)
+        self._check_writable()
+        # Przed attach - inaczej CoordinateStore dostałby wiersz bez węzła
+        if v.uid in self._storage:
+            raise ValueError(f"Węzeł o ID {v.uid} już istnieje w grafie.")
+        self._coords.attach(v)
+        self._storage.add_node(v)
+        self._ids.observe(v.uid)
+        self._interner.intern(v.uid)
+        if self._vertex_hash is not None:
+            self._vertex_hash.add(v)
+        if self._journal is not None:
+            self._journal.append(("add", v.uid))
+        if self._subscribers:
+            self._emit(NodeAdded(v.uid, v))
+
+    def add_vertices(
+        self, vertices: Sequence[Vertex], xy: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Dodaje wiele nowych wierzchołków; współrzędne trafiają do coords jednym
+        zapisem (xy: tablica K x 2, gdy policzono je wektorowo).
+        """
+        self._check_writable()
+        seen = set()
+        for v in vertices:
+            if v.uid in self._storage or v.uid in seen:
+                raise ValueError(f"Węzeł o ID {v.uid} już istnieje w grafie.")
+            seen.add(v.uid)
+        self._coords.attach_many(vertices, xy)
+        for v in vertices:
+            self._storage.add_node(v)
+            self._ids.observe(v.uid)
+            self._interner.intern(v.uid)
+            if self._vertex_hash is not None:
+                self._vertex_hash.add(v)
+            if self._journal is not None:
+                self._journal.append(("add", v.uid))
+            if self._subscribers:
+                self._emit(NodeAdded(v.uid, v))
 
     def update_vertex(
-        self, uid: Union[int, str], x: Optional[float] = None, y: Optional[float] = None
+        self,
+        uid: Union[int, str],
+        x: Optional[float] = None,
+        y: Optional[float] = None,
+        hanging: Optional[bool] = None,
     ) -> None:
-        """Aktualizuje pozycję wierzchołka."""
+        """Aktualizuje pozycję wierzchołka i/lub flagę hanging."""
+        self._check_writable()
 
-        vertex_obj = self.get_vertex(uid)
+        vertex_obj = self._own(self.get_vertex(uid))
+        old = (vertex_obj.x, vertex_obj.y)
+        old_hanging = vertex_obj.hanging
+        if self._journal is not None:
+            self._journal.append(("move", uid, *old, old_hanging))
 
+        if hanging is not None:
+            vertex_obj.hanging = hanging
+            if self._subscribers and hanging != old_hanging:
+                self._emit(VertexChanged(uid, old_hanging, hanging))
+        if x is None and y is None:
+            return
         if x is not None:
             vertex_obj.x = x
-            self._nx_graph.nodes[uid]["x"] = x
+            self._storage.set_attrs(uid, x=x)
         if y is not None:
             vertex_obj.y = y
-            self._nx_graph.nodes[uid]["y"] = y
+            self._storage.set_attrs(uid, y=y)
+        if self._vertex_hash is not None:
+            self._vertex_hash.add(vertex_obj)
+        if self._corners:
+            for neighbor_id in self._storage.neighbors(uid):
+                self._corners.pop(neighbor_id, None)
+        if self._subscribers:
+            new = (vertex_obj.x, vertex_obj.y)
+            if new != old:
+                self._emit(VertexMoved(uid, old, new))
 
     def add_hyperedge(self, h: Hyperedge) -> None:
         """Dodaje węzeł hiperkrawędzi."""
-        self._nx_graph.add_node(
-            h.uid, type="hyperedge", label=h.label, R=h.r, B=h.b, data=h
-        )
+        self._check_writable()
+        if h.uid in self._storage:
+            raise ValueError(f"Węzeł o ID {h.uid} już istnieje w grafie.")
+        self._storage.add_node(h)
+        self._ids.observe(h.uid)
+        self._interner.intern(h.uid)
+        self._label_index.setdefault(self._label_key(h), {})[h.uid] = h
+        # Bezpośrednie zmiany h.label / h.r / h.b również aktualizują indeks
+        h._graph = self._ref
+        if self._journal is not None:
+            self._journal.append(("add", h.uid))
+        if self._subscribers:
+            self._emit(NodeAdded(h.uid, h))
+
+    def add_hyperedges(
+        self,
+        items: Iterable[Tuple[Hyperedge, Sequence[Union[int, str]]]],
+        ordered: bool = False,
+    ) -> None:
+        """
+        Dodaje wiele nowych hiperkrawędzi razem z połączeniami: items to pary
+        (hiperkrawędź, uid jej wierzchołków). Indeks par wierzchołków jest
+        uzupełniany raz na hiperkrawędź, a nie przy każdym connect.
+        ordered=True: wierzchołki elementów (co najmniej 3) podano w kolejności
+        przeciwnej do ruchu wskazówek zegara - zapamiętujemy je jako cykl
+        narożników (corner_cycles) bez sortowania.
+        """
+        self._check_writable()
+        items = list(items)
+        storage = self._storage
+        pair_index = self._pair_index
+        for h, vertex_uids in items:
+            for uid in vertex_uids:
+                if uid not in storage or not isinstance(storage.peek(uid), Vertex):
+                    raise ValueError(f"Węzeł o ID {uid} nie jest wierzchołkiem typu Vertex.")
+            self.add_hyperedge(h)
+            vertex_uids = list(dict.fromkeys(vertex_uids))
+            for uid in vertex_uids:
+                storage.add_edge(h.uid, uid)
+            if self._journal is not None:
+                self._journal.extend(("connect", h.uid, uid) for uid in vertex_uids)
+            # Jak _index_pair, bez wywołania na każdą parę (wczytywanie dużych grafów)
+            label = h.label
+            for pair in itertools.combinations(vertex_uids, 2):
+                pair_index.setdefault(frozenset(pair), {}).setdefault(label, {})[h.uid] = h
+            if self._subscribers:
+                for uid in vertex_uids:
+                    self._emit(Connected(h.uid, uid))
+        if ordered:
+            elements = [(h.uid, list(dict.fromkeys(uids))) for h, uids in items if len(uids) >= 3]
+            self._record_corner_cycles(
+                [uid for uid, _ in elements], [uids for _, uids in elements], ordered=True
+            )
 
     def update_hyperedge(
         self,
@@ -40,34 +367,80 @@ class Graph:
         b: Optional[int] = None,
     ) -> None:
         """Aktualizuje właściwości hiperkrawędzi."""
+        self._check_writable()
 
-        hyperedge_obj = self.get_hyperedge(uid)
+        hyperedge_obj = self._own(self.get_hyperedge(uid))
 
         if label is not None:
             hyperedge_obj.label = label
-            self._nx_graph.nodes[uid]["label"] = label
+            self._storage.set_attrs(uid, label=label)
 
         if r is not None:
             hyperedge_obj.r = r
-            self._nx_graph.nodes[uid]["r"] = r
+            self._storage.set_attrs(uid, r=r)
         if b is not None:
             hyperedge_obj.b = b
-            self._nx_graph.nodes[uid]["b"] = b
+            self._storage.set_attrs(uid, b=b)
+
+    def update_hyperedges(
+        self,
+        uids: Iterable[Union[int, str]],
+        r: Optional[int] = None,
+        b: Optional[int] = None,
+    ) -> int:
+        """
+        Ustawia R/B wielu hiperkrawędzi naraz - wpisy indeksu etykiet są
+        przenoszone bezpośrednio, bez osobnego update_hyperedge na każdą.
+        Zwraca liczbę hiperkrawędzi, które się zmieniły.
+        """
+        self._check_writable()
+        hyperedges = [self.get_hyperedge(uid) for uid in uids]
+        changed = 0
+        for h in hyperedges:
+            old_key = self._label_key(h)
+            new_key = (
+                h.label,
+                old_key[1] if r is None else r,
+                old_key[2] if b is None else b,
+            )
+            if new_key == old_key:
+                continue
+            h = self._own(h)
+            # object.__setattr__ omija przeindeksowanie pojedynczej hiperkrawędzi
+            object.__setattr__(h, "r", new_key[1])
+            object.__setattr__(h, "b", new_key[2])
+            self._storage.set_attrs(h.uid, r=new_key[1], b=new_key[2])
+            self._unindex_hyperedge(h, old_key)
+            self._label_index.setdefault(new_key, {})[h.uid] = h
+            if self._journal is not None:
+                self._journal.append(("change", h.uid, old_key))
+            if self._subscribers:
+                self._emit(HyperedgeChanged(h.uid, old_key, new_key))
+            changed += 1
+        return changed
 
     def connect(self, node_id1: Union[int, str], node_id2: Union[int, str]) -> None:
         """Tworzy krawędź grafową między węzłami."""
+        self._check_writable()
 
-        if node_id1 not in self._nx_graph.nodes:
+        if node_id1 not in self._storage:
             raise ValueError(f"Węzeł o ID {node_id1} nie istnieje w grafie.")
-        if node_id2 not in self._nx_graph.nodes:
+        if node_id2 not in self._storage:
             raise ValueError(f"Węzeł o ID {node_id2} nie istnieje w grafie.")
 
-        self._nx_graph.add_edge(node_id1, node_id2)
+        if self._storage.has_edge(node_id1, node_id2):
+            return
+        self._index_incidence(node_id1, node_id2, add=True)
+        self._storage.add_edge(node_id1, node_id2)
+        if self._journal is not None:
+            self._journal.append(("connect", node_id1, node_id2))
+        if self._subscribers:
+            self._emit(Connected(node_id1, node_id2))
 
     def get_node(self, uid) -> Union[Vertex, Hyperedge, None]:
-        if uid not in self._nx_graph.nodes:
+        if uid not in self._storage:
             raise ValueError(f"Węzeł o ID {uid} nie istnieje w grafie.")
-        return self._nx_graph.nodes[uid]["data"]
+        return self._storage.get(uid)
 
     def get_vertex(self, uid: Union[int, str]) -> Vertex:
         node = self.get_node(uid)
@@ -82,23 +455,54 @@ class Graph:
         return node
 
     def remove_node(self, uid: Union[int, str]) -> None:
-        if uid not in self._nx_graph:
+        self._check_writable()
+        if uid not in self._storage:
             raise ValueError(f"Węzeł o ID {uid} nie istnieje w grafie.")
-        self._nx_graph.remove_node(uid)
+        node = self._own(self._storage.get(uid))
+        neighbors = list(self._storage.neighbors(uid))
+        if self._journal is not None:
+            self._journal.append(self._removal_record(node, neighbors))
+        for neighbor_id in neighbors:
+            self._index_incidence(uid, neighbor_id, add=False)
+            if self._subscribers:
+                self._emit(Disconnected(uid, neighbor_id))
+        if isinstance(node, Hyperedge):
+            self._unindex_hyperedge(node, self._label_key(node))
+            if node._graph is self._ref:
+                node._graph = None
+        else:
+            for pair in self._midpoint_refs.pop(uid, ()):
+                self._forget_midpoint(pair)
+            if self._vertex_hash is not None:
+                self._vertex_hash.discard(uid)
+            if self._parent is not None:
+                # detach przenosi ostatni wiersz - jego wierzchołek musi należeć do migawki
+                self._storage.own(self._coords.owner(len(self._coords) - 1).uid)
+            self._coords.detach(node)
+        self._storage.remove_node(uid)
+        self._interner.release(uid)
+        if self._subscribers:
+            self._emit(NodeRemoved(uid, node))
 
     def remove_edge(self, node_id1: Union[int, str], node_id2: Union[int, str]) -> None:
-        if not self._nx_graph.has_edge(node_id1, node_id2):
+        self._check_writable()
+        if not self._storage.has_edge(node_id1, node_id2):
             raise ValueError(
                 f"Krawędź między {node_id1} a {node_id2} nie istnieje w grafie."
             )
-        self._nx_graph.remove_edge(node_id1, node_id2)
+        self._index_incidence(node_id1, node_id2, add=False)
+        self._storage.remove_edge(node_id1, node_id2)
+        if self._journal is not None:
+            self._journal.append(("disconnect", node_id1, node_id2))
+        if self._subscribers:
+            self._emit(Disconnected(node_id1, node_id2))
 
     def get_neighbors(self, uid: Union[int, str]) -> List[Vertex]:
         if not isinstance(self.get_node(uid), Vertex):
             raise ValueError(f"Węzeł o ID {uid} nie jest wierzchołkiem typu Vertex.")
 
         neighbors = set()
-        for hyperedge_id in self._nx_graph.neighbors(uid):
+        for hyperedge_id in self._storage.neighbors(uid):
             neighbors_with_self = self.get_hyperedge_vertices(hyperedge_id)
             for neighbor_obj in neighbors_with_self:
                 if neighbor_obj.uid != uid:
@@ -114,7 +518,7 @@ class Graph:
             )
 
         hyperedges = set()
-        for neighbor_id in self._nx_graph.neighbors(vertex_uid):
+        for neighbor_id in self._storage.neighbors(vertex_uid):
             try:
                 hyperedge_obj = self.get_hyperedge(neighbor_id)
                 hyperedges.add(hyperedge_obj)
@@ -130,7 +534,7 @@ class Graph:
             raise ValueError(f"Węzeł o ID {hyperedge_uid} nie jest hiperkrawędzią.")
 
         vertices = set()
-        for neighbor_id in self._nx_graph.neighbors(hyperedge_uid):
+        for neighbor_id in self._storage.neighbors(hyperedge_uid):
             try:
                 vertex_obj = self.get_vertex(neighbor_id)
                 vertices.add(vertex_obj)
@@ -140,9 +544,15 @@ class Graph:
         return list(vertices)
 
     def get_hyperedges_between_vertices(
-        self, vertex_uid1: Union[int, str], vertex_uid2: Union[int, str]
+        self,
+        vertex_uid1: Union[int, str],
+        vertex_uid2: Union[int, str],
+        label: Optional[str] = None,
     ) -> List[Hyperedge]:
-        """Zwraca hiperkrawędź łączącą dwa wierzchołki, jeśli istnieje."""
+        """
+        Zwraca hiperkrawędzie łączące dwa wierzchołki (opcjonalnie tylko o danej
+        etykiecie). Odczyt z indeksu par wierzchołków - O(liczba wyników).
+        """
 
         if not isinstance(self.get_node(vertex_uid1), Vertex):
             raise ValueError(
@@ -153,11 +563,592 @@ class Graph:
                 f"Węzeł o ID {vertex_uid2} nie jest wierzchołkiem typu Vertex."
             )
 
-        neighbors1 = set(self.get_vertex_hyperedges(vertex_uid1))
-        neighbors2 = set(self.get_vertex_hyperedges(vertex_uid2))
+        if vertex_uid1 == vertex_uid2:
+            return [
+                he
+                for he in self.get_vertex_hyperedges(vertex_uid1)
+                if label is None or he.label == label
+            ]
+
+        by_label = _peek(self._pair_index, frozenset((vertex_uid1, vertex_uid2)))
+        if not by_label:
+            return []
+        if label is not None:
+            return self._owned(list(by_label.get(label, {}).values()))
+        return self._owned([he for bucket in by_label.values() for he in bucket.values()])
+
+    def register_midpoint(
+        self,
+        vertex_uid1: Union[int, str],
+        vertex_uid2: Union[int, str],
+        midpoint_uid: Union[int, str],
+    ) -> None:
+        """Zapamiętuje, że krawędź (v1, v2) została podzielona wierzchołkiem midpoint."""
+        self._check_writable()
+        for uid in (vertex_uid1, vertex_uid2, midpoint_uid):
+            if not isinstance(self.get_node(uid), Vertex):
+                raise ValueError(f"Węzeł o ID {uid} nie jest wierzchołkiem typu Vertex.")
+
+        pair = frozenset((vertex_uid1, vertex_uid2))
+        if self._journal is not None:
+            self._journal.append(("midpoint", pair, self._midpoints.get(pair)))
+        self._forget_midpoint(pair)
+        self._remember_midpoint(pair, midpoint_uid)
+
+    def get_midpoint(
+        self, vertex_uid1: Union[int, str], vertex_uid2: Union[int, str]
+    ) -> Optional[Vertex]:
+        """
+        Zwraca zarejestrowany środek krawędzi (v1, v2) w czasie O(1).
+        Wpis jest ważny tylko, jeśli środek nadal łączy się z oboma narożnikami
+        krawędziami E; w przeciwnym razie zwraca None.
+        """
+        midpoint_uid = self._midpoints.get(frozenset((vertex_uid1, vertex_uid2)))
+        if midpoint_uid is None:
+            return None
+        if not self.get_hyperedges_between_vertices(
+            vertex_uid1, midpoint_uid, label="E"
+        ) or not self.get_hyperedges_between_vertices(
+            midpoint_uid, vertex_uid2, label="E"
+        ):
+            return None
+        return self.get_vertex(midpoint_uid)
+
+    def _remember_midpoint(self, pair: PairKey, midpoint_uid: Union[int, str]) -> None:
+        self._midpoints[pair] = midpoint_uid
+        for uid in (*pair, midpoint_uid):
+            self._midpoint_refs.setdefault(uid, set()).add(pair)
+
+    def _forget_midpoint(self, pair: PairKey) -> None:
+        midpoint_uid = self._midpoints.pop(pair, None)
+        if midpoint_uid is None:
+            return
+        for uid in (*pair, midpoint_uid):
+            refs = self._midpoint_refs.get(uid)
+            if refs is not None:
+                refs.discard(pair)
+                if not refs:
+                    del self._midpoint_refs[uid]
+
+    def enable_vertex_dedup(self, tolerance: float = 1e-9) -> None:
+        """
+        Włącza rejestr wierzchołków po współrzędnych (z dokładnością tolerance).
+        Produkcje dzielące krawędzie (P3, P4) używają wtedy istniejącego
+        wierzchołka w środku krawędzi zamiast tworzyć drugi w tym samym
+        miejscu. Rejestr śledzi add_vertex / update_vertex / remove_node;
+        bezpośredni zapis v.x / v.y go omija.
+        """
+        registry = CoordinateHash(tolerance)
+        for i in range(len(self._coords)):
+            registry.add(self._coords.owner(i))
+        self._vertex_hash = registry
+
+    def disable_vertex_dedup(self) -> None:
+        self._vertex_hash = None
+
+    def find_vertex_at(self, x: float, y: float) -> Optional[Vertex]:
+        """
+        Wierzchołek w punkcie (x, y) w czasie O(1) - tylko przy włączonym
+        rejestrze (enable_vertex_dedup); bez niego zawsze None.
+        """
+        if self._vertex_hash is None:
+            return None
+        found = self._vertex_hash.find(x, y)
+        return found if found is None else self._storage.get(found.uid)
+
+    @property
+    def coords(self) -> np.ndarray:
+        """
+        Widok (bez kopiowania) N x 2 na współrzędne wszystkich wierzchołków.
+        Wiersz odpowiada indeksowi z vertex_index(); widok jest ważny do
+        najbliższego dodania lub usunięcia wierzchołka.
+        """
+        return self._coords.xy
+
+    def vertex_index(self, uid: Union[int, str]) -> int:
+        """Zwraca gęsty indeks wierzchołka (wiersz w coords)."""
+        return self.get_vertex(uid)._index
+
+    def vertex_indices(self, uids: Iterable[Union[int, str]]) -> np.ndarray:
+        return np.fromiter(
+            (self.vertex_index(uid) for uid in uids), dtype=np.intp
+        )
+
+    def vertex_at_index(self, index: int) -> Vertex:
+        return self._coords.owner(index)
+
+    def centroid(self, vertices: Iterable[Vertex]) -> Tuple[float, float]:
+        """Środek ciężkości wierzchołków - jedno zapytanie wektorowe do coords."""
+        indices = self.vertex_indices(v.uid for v in vertices)
+        cx, cy = self._coords.xy[indices].mean(axis=0)
+        return float(cx), float(cy)
+
+    def sort_counter_clockwise(self, vertices: List[Vertex]) -> List[Vertex]:
+        """
+        Sortuje wierzchołki geometrycznie (przeciwnie do ruchu wskazówek zegara)
+        wokół ich środka ciężkości - kąty liczone wektorowo na coords.
+        """
+        if not vertices:
+            return []
+
+        xy = self._coords.xy[self.vertex_indices(v.uid for v in vertices)]
+        rel = xy - xy.mean(axis=0)
+        order = np.argsort(np.arctan2(rel[:, 1], rel[:, 0]), kind="stable")
+        return [vertices[i] for i in order]
+
+    def corner_cycles(
+        self, hyperedge_uids: Iterable[Union[int, str]]
+    ) -> List[Tuple[Union[int, str], ...]]:
+        """
+        Uporządkowane krotki uid wierzchołków hiperkrawędzi - przeciwnie do ruchu
+        wskazówek zegara, od wierzchołka o najmniejszym kącie (jak
+        sort_counter_clockwise). Cykl zapisany przy tworzeniu elementu
+        (add_hyperedges(..., ordered=True)) albo policzony przy pierwszym
+        zapytaniu jest przechowywany do zmiany połączeń elementu lub ruchu
+        jego wierzchołka; brakujące cykle liczone są wektorowo, grupami.
+        """
+        uids = list(hyperedge_uids)
+        corners = self._corners
+        missing = [uid for uid in dict.fromkeys(uids) if uid not in corners]
+        if missing:
+            # Graf z migawkami nie zapisuje pamięci podręcznej - migawki ją współdzielą
+            if self._read_only:
+                corners = CowDict(corners)
+            self._record_corner_cycles(
+                missing, [self._hyperedge_vertex_ids(uid) for uid in missing], into=corners
+            )
+        return [corners[uid] for uid in uids]
+
+    def corner_cycle(self, hyperedge_uid: Union[int, str]) -> Tuple[Union[int, str], ...]:
+        return self.corner_cycles((hyperedge_uid,))[0]
+
+    def get_hyperedge_corners(self, hyperedge_uid: Union[int, str]) -> List[Vertex]:
+        """Wierzchołki hiperkrawędzi w kolejności corner_cycle."""
+        return [self._storage.get(uid) for uid in self.corner_cycle(hyperedge_uid)]
+
+    def _record_corner_cycles(
+        self,
+        hyperedge_uids: List[Union[int, str]],
+        vertex_lists: List[List[Union[int, str]]],
+        ordered: bool = False,
+        into: Optional[Dict[Union[int, str], Tuple[Union[int, str], ...]]] = None,
+    ) -> None:
+        """
+        Zapisuje cykle narożników. Hiperkrawędzie o tej samej liczbie
+        wierzchołków są obsługiwane razem: kąty wokół środków ciężkości liczone
+        jednym arctan2, a kolejność - sortowaniem jak w sort_counter_clockwise.
+        Dla list już uporządkowanych (ordered) wystarczy obrót cyklu tak, by
+        zaczynał się od najmniejszego kąta.
+        """
+        into = self._corners if into is None else into
+        by_size: Dict[int, List[int]] = {}
+        for i, vertex_ids in enumerate(vertex_lists):
+            by_size.setdefault(len(vertex_ids), []).append(i)
+        for size, rows in by_size.items():
+            if size == 0:
+                for i in rows:
+                    into[hyperedge_uids[i]] = ()
+                continue
+            flat = [uid for i in rows for uid in vertex_lists[i]]
+            xy = self._coords.xy[self.vertex_indices(flat).reshape(-1, size)]
+            rel = xy - xy.mean(axis=1, keepdims=True)
+            angles = np.arctan2(rel[..., 1], rel[..., 0])
+            if ordered:
+                order = (np.argmin(angles, axis=1)[:, None] + np.arange(size)) % size
+            else:
+                order = np.argsort(angles, axis=1, kind="stable")
+            for i, perm in zip(rows, order.tolist()):
+                vertex_ids = vertex_lists[i]
+                into[hyperedge_uids[i]] = tuple(vertex_ids[j] for j in perm)
+
+    def find_hyperedges(
+        self,
+        label: Optional[str] = None,
+        r: Optional[int] = None,
+        b: Optional[int] = None,
+    ) -> List[Hyperedge]:
+        """
+        Zwraca hiperkrawędzie o zadanej etykiecie i flagach R/B (None = dowolna).
+        Korzysta z indeksu, więc koszt zależy od liczby dopasowań, a nie od
+        rozmiaru grafu. Kolejność jest zgodna z kolejnością dodania do grafu.
+        Wewnątrz candidate_scope zwraca tylko hiperkrawędzie z zawężenia.
+        """
+        if self._scope is not None:
+            return self._find_in_scope(label, r, b)
+
+        matches: List[Hyperedge] = []
+        for key in self._label_index:
+            key_label, key_r, key_b = key
+            if label is not None and key_label != label:
+                continue
+            if r is not None and key_r != r:
+                continue
+            if b is not None and key_b != b:
+                continue
+            matches.extend(_peek(self._label_index, key).values())
+
+        index = self._interner.index
+        matches.sort(key=lambda h: index(h.uid))
+        return self._owned(matches)
+
+    @contextmanager
+    def candidate_scope(self, uids: Iterable[Union[int, str]]):
+        """
+        Zawęża find_hyperedges (źródło kandydatów w find_lhs produkcji) do podanych
+        uid - koszt dopasowania zależy wtedy od ich liczby, a nie od rozmiaru grafu.
+        Pozostałe zapytania (sąsiedzi, pary wierzchołków) widzą cały graf.
+        Zagnieżdżone zawężenia działają jak część wspólna.
+        """
+        previous = self._scope
+        self._scope = list(uids)
+        if previous is not None:
+            allowed = set(previous)
+            self._scope = [uid for uid in self._scope if uid in allowed]
+        try:
+            yield self
+        finally:
+            self._scope = previous
+
+    def _find_in_scope(
+        self, label: Optional[str], r: Optional[int], b: Optional[int]
+    ) -> List[Hyperedge]:
+        index = self._interner.index
+        # Gdy pasujących kubełków indeksu (etykieta, R, B) jest mniej niż uid
+        # w zawężeniu, przeglądamy kubełki - koszt min(cele, dopasowania)
+        buckets = [
+            _peek(self._label_index, key)
+            for key in self._label_index
+            if (label is None or key[0] == label)
+            and (r is None or key[1] == r)
+            and (b is None or key[2] == b)
+        ]
+        if sum(map(len, buckets)) < len(self._scope):
+            allowed = set(self._scope)
+            matches = [h for bucket in buckets for uid, h in bucket.items() if uid in allowed]
+            matches.sort(key=lambda h: index(h.uid))
+            return self._owned(matches)
+
+        matches: List[Hyperedge] = []
+        for uid in dict.fromkeys(self._scope):
+            if uid not in self._storage:
+                continue
+            h = self._storage.get(uid)
+            if not isinstance(h, Hyperedge):
+                continue
+            if label is not None and h.label != label:
+                continue
+            if r is not None and h.r != r:
+                continue
+            if b is not None and h.b != b:
+                continue
+            matches.append(h)
+
+        matches.sort(key=lambda h: index(h.uid))
+        return matches
+
+    def uid_index(self, uid: Union[int, str]) -> int:
+        """
+        Gęsty indeks całkowity węzła, nadawany w kolejności dodania do grafu.
+        Indeks pozostaje ważny (np. jako rodzic w lineage) także po usunięciu węzła.
+        """
+        return self._interner.index(uid)
+
+    def uid_at(self, index: int) -> Union[int, str]:
+        return self._interner.uid(index)
+
+    def record_lineage(self, uid: Union[int, str], parent_index: int, slot: int) -> None:
+        """
+        Zapisuje pochodzenie nowego węzła: dziecko nr `slot` węzła o indeksie
+        `parent_index` (z uid_index - rodzic może być już usunięty z grafu).
+        """
+        self._check_writable()
+        index = self.uid_index(uid)
+        if self._journal is not None:
+            self._journal.append(("lineage", index, self._interner.lineage(index)))
+        self._interner.set_parent(index, parent_index, slot)
+
+    def lineage(self, uid: Union[int, str]) -> Tuple[int, int, int]:
+        """Zwraca (indeks rodzica lub -1, numer dziecka, poziom podziału)."""
+        return self._interner.lineage(self.uid_index(uid))
+
+    def level(self, uid: Union[int, str]) -> int:
+        return self.lineage(uid)[2]
 
-        return list(neighbors1.intersection(neighbors2))
+    def display_name(self, uid: Union[int, str]) -> str:
+        """
+        Czytelna nazwa hierarchiczna (np. "Q1.2.0" - dziecko 0 dziecka 2 elementu Q1),
+        składana na żądanie do debugowania i wizualizacji.
+        """
+        return self._interner.name(self.uid_index(uid))
+
+    def subscribe(
+        self, callback: Callable[[GraphEvent], None]
+    ) -> Callable[[GraphEvent], None]:
+        """
+        Rejestruje odbiorcę zdarzeń zmian grafu (NodeAdded, NodeRemoved, VertexMoved,
+        VertexChanged, HyperedgeChanged, Connected, Disconnected - zob. src/events.py).
+        Zwraca callback, więc można go użyć jako dekoratora.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[GraphEvent], None]) -> None:
+        try:
+            self._subscribers.remove(callback)
+        except ValueError:
+            raise ValueError("Ten odbiorca nie subskrybuje zdarzeń grafu.") from None
+
+    @contextmanager
+    def transaction(self, atomic: bool = False):
+        """
+        Grupuje mutacje: zdarzenia są buforowane i po wyjściu z bloku (także przez
+        wyjątek) dostarczane raz, sklejone przez events.coalesce. Transakcje
+        zagnieżdżone dołączają do zewnętrznej.
+
+        atomic=True: mutacje są zapisywane w dzienniku cofania (operacje
+        odwrotne), a wyjątek w bloku wycofuje wszystkie zmiany z tej transakcji
+        przed przekazaniem wyjątku dalej - koszt zatwierdzenia i wycofania
+        zależy od liczby operacji, nie od rozmiaru grafu. Wewnątrz bloku zmiany
+        wycofuje też rollback(). Zagnieżdżona transakcja atomowa działa jak
+        punkt powrotu: jej wycofanie nie cofa zmian transakcji zewnętrznej.
+        Bezpośrednie zapisy v.x / v.y omijają dziennik (jak rejestr
+        enable_vertex_dedup).
+        """
+        self._transaction_depth += 1
+        if self._pending is None:
+            self._pending = []
+        if atomic:
+            if self._journal is None:
+                self._journal = []
+            self._savepoints.append((len(self._journal), self._ids.snapshot()))
+        try:
+            yield self
+        except BaseException:
+            if atomic:
+                self.rollback()
+            raise
+        finally:
+            if atomic:
+                self._savepoints.pop()
+                if not self._savepoints:
+                    self._journal = None
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                pending, self._pending = self._pending, None
+                for event in coalesce(pending):
+                    self._dispatch(event)
+
+    def rollback(self) -> None:
+        """
+        Cofa zmiany od początku najbardziej wewnętrznej transakcji atomowej
+        (łącznie z licznikami identyfikatorów); transakcja trwa dalej. Cofnięte
+        węzły wracają jako te same obiekty, z tymi samymi indeksami
+        (vertex_index, uid_index). Subskrybenci dostają zdarzenia odwrotne,
+        sklejone z pierwotnymi w tej samej transakcji.
+        """
+        if not self._savepoints:
+            raise ValueError("Brak otwartej transakcji atomowej (transaction(atomic=True)).")
+        length, ids = self._savepoints[-1]
+        journal, self._journal = self._journal, None
+        try:
+            while len(journal) > length:
+                self._undo(journal.pop())
+        finally:
+            self._journal = journal
+        self._ids.restore(ids)
+
+    def _undo(self, entry: tuple) -> None:
+        """Wykonuje operację odwrotną zapisaną w dzienniku."""
+        op = entry[0]
+        if op == "add":
+            self.remove_node(entry[1])
+            self._interner.unintern(entry[1])
+        elif op == "move":
+            self.update_vertex(entry[1], x=entry[2], y=entry[3], hanging=entry[4])
+        elif op == "change":
+            label, r, b = entry[2]
+            self.update_hyperedge(entry[1], label=label, r=r, b=b)
+        elif op == "connect":
+            self.remove_edge(entry[1], entry[2])
+        elif op == "disconnect":
+            self.connect(entry[1], entry[2])
+        elif op == "remove":
+            self._restore_node(*entry[1:])
+        elif op == "midpoint":
+            pair, previous = entry[1:]
+            self._forget_midpoint(pair)
+            if previous is not None:
+                self._remember_midpoint(pair, previous)
+        else:
+            self._interner.restore_lineage(entry[1], entry[2])
+
+    def _removal_record(self, node: Union[Vertex, Hyperedge], neighbors: List) -> tuple:
+        """Wpis dziennika dla remove_node - wszystko, czego potrzebuje _restore_node."""
+        midpoints = []
+        if isinstance(node, Vertex):
+            for pair in self._midpoint_refs.get(node.uid, ()):
+                midpoints.append((pair, self._midpoints[pair]))
+        coords_index = node._index if isinstance(node, Vertex) else -1
+        return ("remove", node, coords_index, self.uid_index(node.uid), neighbors, midpoints)
+
+    def _restore_node(self, node, coords_index, uid_index, neighbors, midpoints) -> None:
+        """Odwrotność remove_node: ten sam obiekt, indeksy, połączenia i środki krawędzi."""
+        if isinstance(node, Vertex):
+            if self._parent is not None and coords_index < len(self._coords):
+                # reattach przenosi wierzchołek z wiersza coords_index na koniec
+                self._storage.own(self._coords.owner(coords_index).uid)
+            self._coords.reattach(node, coords_index)
+            if self._vertex_hash is not None:
+                self._vertex_hash.add(node)
+        self._storage.add_node(node)
+        self._interner.restore(node.uid, uid_index)
+        if isinstance(node, Hyperedge):
+            self._label_index.setdefault(self._label_key(node), {})[node.uid] = node
+            node._graph = self._ref
+        if self._subscribers:
+            self._emit(NodeAdded(node.uid, node))
+        for neighbor_id in neighbors:
+            self.connect(node.uid, neighbor_id)
+        for pair, midpoint_uid in midpoints:
+            self._remember_midpoint(pair, midpoint_uid)
+
+    def _emit(self, event: GraphEvent) -> None:
+        if self._pending is not None:
+            self._pending.append(event)
+        else:
+            self._dispatch(event)
+
+    def _dispatch(self, event: GraphEvent) -> None:
+        for callback in list(self._subscribers):
+            callback(event)
+
+    def start_tracking(self) -> None:
+        """Włącza zbieranie uid węzłów dotkniętych przez mutacje grafu."""
+        if self._changes is None:
+            self._changes = set()
+            self.subscribe(self._track)
+
+    def stop_tracking(self) -> None:
+        if self._changes is not None:
+            self.unsubscribe(self._track)
+            self._changes = None
 
     @property
-    def nx_graph(self):
-        return self._nx_graph
+    def is_tracking(self) -> bool:
+        return self._changes is not None
+
+    def take_changes(self) -> Set[Union[int, str]]:
+        """
+        Zwraca uid węzłów dodanych, zmienionych lub połączonych/rozłączonych od
+        poprzedniego wywołania (także sąsiadów usuniętych węzłów) i czyści zbiór.
+        Zmiany z otwartej transakcji są widoczne dopiero po jej zakończeniu.
+        """
+        if self._changes is None:
+            raise ValueError("Śledzenie zmian grafu nie jest włączone.")
+        changes, self._changes = self._changes, set()
+        return changes
+
+    def _track(self, event: GraphEvent) -> None:
+        if isinstance(event, NodeRemoved):
+            self._changes.discard(event.uid)
+        else:
+            self._changes.update(touched_uids(event))
+
+    @staticmethod
+    def _label_key(h: Hyperedge) -> LabelKey:
+        return (h.label, h.r, h.b)
+
+    def _unindex_hyperedge(self, h: Hyperedge, key: LabelKey) -> None:
+        bucket = self._label_index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(h.uid, None)
+        if not bucket:
+            del self._label_index[key]
+
+    def _on_hyperedge_changed(self, h: Hyperedge, old_key: LabelKey) -> None:
+        """Wywoływane przez Hyperedge po zmianie label/r/b - przenosi wpis w indeksie."""
+        new_key = self._label_key(h)
+        if new_key == old_key:
+            return
+        if self._read_only:
+            for name, value in zip(("label", "r", "b"), old_key):
+                object.__setattr__(h, name, value)
+            self._check_writable()
+        self._unindex_hyperedge(h, old_key)
+        self._label_index.setdefault(new_key, {})[h.uid] = h
+        if self._journal is not None:
+            self._journal.append(("change", h.uid, old_key))
+        if self._subscribers:
+            self._emit(HyperedgeChanged(h.uid, old_key, new_key))
+
+        if new_key[0] != old_key[0]:
+            vertex_ids = self._hyperedge_vertex_ids(h.uid)
+            for pair in itertools.combinations(vertex_ids, 2):
+                self._unindex_pair(frozenset(pair), old_key[0], h.uid)
+                self._index_pair(frozenset(pair), h)
+
+    def _hyperedge_vertex_ids(self, hyperedge_uid) -> List[Union[int, str]]:
+        peek = self._storage.peek
+        return [n for n in self._storage.neighbors(hyperedge_uid) if isinstance(peek(n), Vertex)]
+
+    def _index_incidence(self, node_id1, node_id2, add: bool) -> None:
+        """
+        Aktualizuje indeks par wierzchołków przy dodaniu/usunięciu połączenia
+        hiperkrawędź-wierzchołek. Pozostałe rodzaje połączeń są pomijane.
+        """
+        node1 = self._storage.peek(node_id1)
+        node2 = self._storage.peek(node_id2)
+        if isinstance(node1, Hyperedge) and isinstance(node2, Vertex):
+            h, vertex_id = node1, node_id2
+        elif isinstance(node1, Vertex) and isinstance(node2, Hyperedge):
+            h, vertex_id = node2, node_id1
+        else:
+            return
+
+        self._corners.pop(h.uid, None)
+        for other_id in self._hyperedge_vertex_ids(h.uid):
+            if other_id == vertex_id:
+                continue
+            pair = frozenset((vertex_id, other_id))
+            if add:
+                self._index_pair(pair, h)
+            else:
+                self._unindex_pair(pair, h.label, h.uid)
+
+    def _index_pair(self, pair: PairKey, h: Hyperedge) -> None:
+        self._pair_index.setdefault(pair, {}).setdefault(h.label, {})[h.uid] = h
+
+    def _unindex_pair(self, pair: PairKey, label: str, hyperedge_uid) -> None:
+        by_label = self._pair_index.get(pair)
+        if by_label is None:
+            return
+        bucket = by_label.get(label)
+        if bucket is None:
+            return
+        bucket.pop(hyperedge_uid, None)
+        if not bucket:
+            del by_label[label]
+        if not by_label:
+            del self._pair_index[pair]
+
+    @property
+    def ids(self) -> IdAllocator:
+        """Przydział nowych identyfikatorów (wierzchołki: int, hiperkrawędzie: 'E12', 'Q3', ...)."""
+        return self._ids
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @property
+    def nx_graph(self) -> nx.Graph:
+        """
+        Graf networkx. Dla backendu "networkx" jest to graf roboczy, dla "sets"
+        widok budowany na żądanie (np. do wizualizacji) - jego modyfikacje nie
+        wpływają na Graph.
+        """
+        return self._storage.to_networkx()
+
+    # Zgodność wsteczna - część kodu odwołuje się bezpośrednio do _nx_graph
+    _nx_graph = nx_graph
@@ -0,0 +1,183 @@
+import re
+import threading
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from .storage import CowDict
+
+# Przestrzenie nazw identyfikatorów: wierzchołki (liczby całkowite) oraz
+# hiperkrawędzie nazywane "<etykieta><numer>", np. "E12", "Q3".
+VERTEX_NAMESPACE = "V"
+HYPEREDGE_NAMESPACES = ("E", "Q", "P", "S", "T")
+
+_HYPEREDGE_UID = re.compile(r"^([EQPST])(\d+)$")
+
+# Rekord pochodzenia elementu: (indeks rodzica, numer dziecka, poziom podziału).
+# Elementy siatki początkowej mają parent = NO_PARENT i level = 0.
+LINEAGE_DTYPE = np.dtype([("parent", np.int64), ("slot", np.int32), ("level", np.int32)])
+NO_PARENT = -1
+
+
+class IdAllocator:
+    """
+    Monotoniczny przydział identyfikatorów dla nowych węzłów grafu.
+    Graph zgłasza każdy dodany uid (observe), więc liczniki są zawsze powyżej
+    istniejących identyfikatorów bez przeszukiwania grafu. Bezpieczny wątkowo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            ns: 0 for ns in (VERTEX_NAMESPACE, *HYPEREDGE_NAMESPACES)
+        }
+
+    def observe(self, uid: Union[int, str]) -> None:
+        """Uwzględnia istniejący uid w licznikach (wywoływane przy dodaniu węzła)."""
+        if isinstance(uid, int):
+            namespace, number = VERTEX_NAMESPACE, uid
+        else:
+            match = _HYPEREDGE_UID.match(uid)
+            if match is None:
+                return
+            namespace, number = match.group(1), int(match.group(2))
+
+        with self._lock:
+            if number > self._counters[namespace]:
+                self._counters[namespace] = number
+
+    def next(self, namespace: str) -> int:
+        """Zwraca kolejny wolny numer w danej przestrzeni nazw."""
+        if namespace not in self._counters:
+            raise ValueError(f"Nieznana przestrzeń identyfikatorów: {namespace}.")
+        with self._lock:
+            self._counters[namespace] += 1
+            return self._counters[namespace]
+
+    def snapshot(self) -> "IdAllocator":
+        """Niezależna kopia liczników (dla Graph.snapshot)."""
+        copy = IdAllocator()
+        with self._lock:
+            copy._counters = dict(self._counters)
+        return copy
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Kopia liczników: przestrzeń nazw -> ostatnio przydzielony numer."""
+        with self._lock:
+            return dict(self._counters)
+
+    def restore(self, saved: "IdAllocator") -> None:
+        """Przywraca liczniki zapamiętane przez snapshot (wycofanie transakcji)."""
+        with self._lock:
+            self._counters = dict(saved._counters)
+
+    def next_vertex_uid(self) -> int:
+        return self.next(VERTEX_NAMESPACE)
+
+    def next_hyperedge_uid(self, label: str) -> str:
+        return f"{label}{self.next(label)}"
+
+
+class UidInterner:
+    """
+    Tablica pomocnicza grafu: zewnętrzny uid (int / str) -> indeks 0, 1, 2, ...
+    nadawany w kolejności dodawania węzłów do grafu (porządek find_hyperedges,
+    rodzic w pochodzeniu). Magazyn i indeksy grafu pozostają kluczowane uid.
+    Każdy indeks ma zwarty rekord pochodzenia (LINEAGE_DTYPE) w jednej
+    tablicy NumPy; czytelne nazwy hierarchiczne (np. "Q1.2.0") są składane
+    dopiero na żądanie.
+
+    Indeksy nie są używane ponownie - po usunięciu węzła jego rekord zostaje,
+    więc pochodzenie potomków nadal da się odtworzyć.
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        self._index: Dict[Union[int, str], int] = {}
+        self._uids: List[Union[int, str]] = []
+        self._lineage = np.empty(self.INITIAL_CAPACITY, dtype=LINEAGE_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self._uids)
+
+    def __contains__(self, uid: Union[int, str]) -> bool:
+        return uid in self._index
+
+    def intern(self, uid: Union[int, str]) -> int:
+        """Nadaje nowy indeks węzłowi dodawanemu do grafu."""
+        index = len(self._uids)
+        if index == self._lineage.shape[0]:
+            grown = np.empty(index * 2, dtype=LINEAGE_DTYPE)
+            grown[:index] = self._lineage
+            self._lineage = grown
+
+        self._lineage[index] = (NO_PARENT, 0, 0)
+        self._uids.append(uid)
+        self._index[uid] = index
+        return index
+
+    def snapshot(self) -> "UidInterner":
+        """
+        Kopia dla Graph.snapshot: słownik uid -> indeks jest współdzielony i
+        kopiowany przy zapisie (CowDict), tablica pochodzenia i lista uid -
+        kopiowane w całości jednym memcpy.
+        """
+        copy = UidInterner.__new__(UidInterner)
+        copy._index = CowDict(self._index)
+        copy._uids = list(self._uids)
+        copy._lineage = self._lineage.copy()
+        return copy
+
+    def release(self, uid: Union[int, str]) -> None:
+        """Odpina uid od indeksu (węzeł usunięty z grafu); rekord pochodzenia zostaje."""
+        self._index.pop(uid, None)
+
+    def restore(self, uid: Union[int, str], index: int) -> None:
+        """Odwrotność release - węzeł wraca do grafu ze swoim dawnym indeksem."""
+        self._index[uid] = index
+
+    def unintern(self, uid: Union[int, str]) -> None:
+        """Odwrotność intern dla ostatnio nadanego indeksu (wycofanie dodania węzła)."""
+        if not self._uids or self._uids[-1] != uid:
+            raise ValueError(f"Węzeł o ID {uid} nie ma ostatnio nadanego indeksu.")
+        self._uids.pop()
+        self._index.pop(uid, None)
+
+    def index(self, uid: Union[int, str]) -> int:
+        try:
+            return self._index[uid]
+        except KeyError:
+            raise ValueError(f"Węzeł o ID {uid} nie istnieje w grafie.") from None
+
+    def uid(self, index: int) -> Union[int, str]:
+        return self._uids[index]
+
+    def set_parent(self, index: int, parent: int, slot: int) -> None:
+        """Zapisuje, że element `index` jest dzieckiem nr `slot` elementu `parent`."""
+        if not 0 <= parent < len(self._uids):
+            raise ValueError(f"Nieznany indeks rodzica: {parent}.")
+        self._lineage[index] = (parent, slot, self._lineage["level"][parent] + 1)
+
+    def restore_lineage(self, index: int, record: Tuple[int, int, int]) -> None:
+        self._lineage[index] = record
+
+    def lineage(self, index: int) -> Tuple[int, int, int]:
+        parent, slot, level = self._lineage[index].item()
+        return parent, slot, level
+
+    @property
+    def lineage_array(self) -> np.ndarray:
+        """Widok (bez kopiowania) na rekordy pochodzenia wszystkich indeksów."""
+        return self._lineage[: len(self._uids)]
+
+    def name(self, index: int) -> str:
+        """Nazwa hierarchiczna: uid przodka z siatki początkowej i numery kolejnych dzieci."""
+        slots = []
+        parent, slot, _ = self.lineage(index)
+        while parent != NO_PARENT:
+            slots.append(str(slot))
+            index = parent
+            parent, slot, _ = self.lineage(index)
+        return ".".join([str(self._uids[index]), *reversed(slots)])
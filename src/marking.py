@@ -0,0 +1,231 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .graph import Graph
+from .productions.production import Production
+from .productions.p0 import ProductionP0
+from .productions.p6 import ProductionP6
+from .productions.p9 import ProductionP9
+from .productions.p12 import ProductionP12
+
+NodeId = Union[int, str]
+
+# Etykiety elementów oznaczanych przez P0 (Q), P6 (P), P9 (S), P12 (T) i liczba ich narożników
+ELEMENT_ARITY: Dict[str, int] = {"Q": 4, "P": 5, "S": 6, "T": 7}
+
+
+def marking_productions() -> Dict[str, Production]:
+    """Produkcja oznaczająca dla każdej etykiety elementu (do mark(..., verify=True))."""
+    return {
+        "Q": ProductionP0(),
+        "P": ProductionP6(),
+        "S": ProductionP9(),
+        "T": ProductionP12(),
+    }
+
+
+@dataclass
+class ElementArrays:
+    """
+    Nieoznaczone elementy (R=0) grafu jako tablice - wejście predykatów
+    oznaczania. Wiersz i opisuje element uids[i]; kolejność jak w grafie.
+    """
+
+    uids: List[NodeId]
+    labels: np.ndarray  # (m,) etykiety
+    index: np.ndarray  # (m,) Graph.uid_index - pozycja w tablicach indeksowanych uid_index
+    centroids: np.ndarray  # (m, 2)
+    bbox: np.ndarray  # (m, 4): xmin, ymin, xmax, ymax
+    levels: np.ndarray  # (m,) poziom podziału z lineage
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+
+# Predykat: maska logiczna (m,) dla elementów z ElementArrays
+Predicate = Callable[[ElementArrays], np.ndarray]
+
+
+def element_arrays(graph: Graph, labels: Optional[Iterable[str]] = None) -> ElementArrays:
+    """
+    Zbiera nieoznaczone elementy o podanych etykietach (domyślnie wszystkie z
+    ELEMENT_ARITY) z indeksu etykiet grafu. Elementy o złej liczbie narożników
+    są pomijane. Środki ciężkości i prostokąty otaczające liczone są wektorowo,
+    osobno dla każdej liczby narożników.
+    """
+    labels = list(ELEMENT_ARITY) if labels is None else list(labels)
+    uids: List[NodeId] = []
+    label_parts, centroid_parts, bbox_parts = [], [], []
+    for label in labels:
+        if label not in ELEMENT_ARITY:
+            raise ValueError(f"Nieznana etykieta elementu: {label}.")
+        n = ELEMENT_ARITY[label]
+        elements, vertex_uids = [], []
+        for h in graph.find_hyperedges(label=label, r=0):
+            corners = graph._hyperedge_vertex_ids(h.uid)
+            if len(corners) == n:
+                elements.append(h.uid)
+                vertex_uids.extend(corners)
+        if not elements:
+            continue
+        xy = graph.coords[graph.vertex_indices(vertex_uids).reshape(-1, n)]
+        uids.extend(elements)
+        label_parts.append(np.full(len(elements), label))
+        centroid_parts.append(xy.mean(axis=1))
+        bbox_parts.append(np.concatenate([xy.min(axis=1), xy.max(axis=1)], axis=1))
+
+    index = np.fromiter((graph.uid_index(uid) for uid in uids), dtype=np.int64, count=len(uids))
+    order = np.argsort(index, kind="stable")
+    if uids:
+        labels_array = np.concatenate(label_parts)[order]
+        centroids = np.concatenate(centroid_parts)[order]
+        bbox = np.concatenate(bbox_parts)[order]
+    else:
+        labels_array = np.empty(0, dtype=str)
+        centroids = np.empty((0, 2))
+        bbox = np.empty((0, 4))
+    index = index[order]
+    return ElementArrays(
+        uids=[uids[i] for i in order.tolist()],
+        labels=labels_array,
+        index=index,
+        centroids=centroids,
+        bbox=bbox,
+        levels=graph._interner.lineage_array["level"][index],
+    )
+
+
+def in_box(xmin: float, ymin: float, xmax: float, ymax: float) -> Predicate:
+    """Elementy, których środek ciężkości leży w prostokącie (z brzegiem)."""
+
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        x, y = arrays.centroids[:, 0], arrays.centroids[:, 1]
+        return (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+
+    return predicate
+
+
+def overlaps_box(xmin: float, ymin: float, xmax: float, ymax: float) -> Predicate:
+    """Elementy, których prostokąt otaczający przecina prostokąt."""
+
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        b = arrays.bbox
+        return (b[:, 0] <= xmax) & (b[:, 2] >= xmin) & (b[:, 1] <= ymax) & (b[:, 3] >= ymin)
+
+    return predicate
+
+
+def in_circle(cx: float, cy: float, radius: float) -> Predicate:
+    """Elementy, których środek ciężkości leży w kole."""
+
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        d = arrays.centroids - (cx, cy)
+        return np.einsum("ij,ij->i", d, d) <= radius * radius
+
+    return predicate
+
+
+def at_level(*levels: int) -> Predicate:
+    """Elementy na podanych poziomach podziału (0 - siatka początkowa)."""
+
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        return np.isin(arrays.levels, levels)
+
+    return predicate
+
+
+def below_level(level: int) -> Predicate:
+    """Elementy o poziomie podziału mniejszym niż level (ogranicza głębokość adaptacji)."""
+
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        return arrays.levels < level
+
+    return predicate
+
+
+def error_above(
+    errors: Union[np.ndarray, Mapping[NodeId, float]], threshold: float
+) -> Predicate:
+    """
+    Elementy ze wskaźnikiem błędu większym niż threshold. errors: tablica
+    indeksowana Graph.uid_index albo słownik uid -> błąd (brak wpisu = 0).
+    """
+
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        if isinstance(errors, Mapping):
+            values = np.fromiter(
+                (errors.get(uid, 0.0) for uid in arrays.uids),
+                dtype=np.float64,
+                count=len(arrays),
+            )
+        else:
+            values = np.asarray(errors)[arrays.index]
+        return values > threshold
+
+    return predicate
+
+
+def all_of(*predicates: Predicate) -> Predicate:
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        mask = np.ones(len(arrays), dtype=bool)
+        for p in predicates:
+            mask &= p(arrays)
+        return mask
+
+    return predicate
+
+
+def any_of(*predicates: Predicate) -> Predicate:
+    def predicate(arrays: ElementArrays) -> np.ndarray:
+        mask = np.zeros(len(arrays), dtype=bool)
+        for p in predicates:
+            mask |= p(arrays)
+        return mask
+
+    return predicate
+
+
+def select(
+    graph: Graph, predicate: Predicate, labels: Optional[Sequence[str]] = None
+) -> List[NodeId]:
+    """uid nieoznaczonych elementów spełniających predykat (bez zmiany grafu)."""
+    arrays = element_arrays(graph, labels)
+    mask = np.asarray(predicate(arrays), dtype=bool)
+    if mask.shape != (len(arrays),):
+        raise ValueError(
+            f"Predykat zwrócił maskę o kształcie {mask.shape}, oczekiwano ({len(arrays)},)."
+        )
+    return [arrays.uids[i] for i in np.flatnonzero(mask).tolist()]
+
+
+def mark(
+    graph: Graph,
+    predicate: Predicate,
+    labels: Optional[Sequence[str]] = None,
+    verify: bool = False,
+) -> List[NodeId]:
+    """
+    Oznacza do podziału (R=1) wszystkie nieoznaczone elementy spełniające
+    predykat - jedną zbiorczą zmianą indeksu etykiet (Graph.update_hyperedges)
+    w jednej transakcji, zamiast P0/P6/P9/P12 element po elemencie. Zwraca uid
+    oznaczonych elementów; można je przekazać jako seeds do RefinementEngine.run.
+
+    Sprawdzana jest tylko liczba narożników. verify=True dodatkowo sprawdza
+    pełne LHS produkcji oznaczającej (find_lhs z listą target_id).
+    """
+    selected = select(graph, predicate, labels)
+    if verify and selected:
+        productions = marking_productions()
+        by_label: Dict[str, List[NodeId]] = {}
+        for uid in selected:
+            by_label.setdefault(graph.get_hyperedge(uid).label, []).append(uid)
+        valid = set()
+        for label, uids in by_label.items():
+            valid.update(h.uid for h in productions[label].find_lhs(graph, target_id=uids))
+        selected = [uid for uid in selected if uid in valid]
+
+    with graph.transaction():
+        graph.update_hyperedges(selected, r=1)
+    return selected
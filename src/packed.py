@@ -0,0 +1,518 @@
+import gc
+import weakref
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .elements import Vertex, Hyperedge
+from .graph import Graph
+from .storage import BACKEND_NETWORKX, BACKEND_SETS
+
+NodeId = Union[int, str]
+Element = Union[Vertex, Hyperedge]
+
+KIND_VERTEX = 0
+KIND_HYPEREDGE = 1
+
+# Nazwy i typy tablic PackedGraph (N - liczba węzłów, M - liczba połączeń * 2,
+# K - liczba wpisów rejestru środków krawędzi, U - długość tablicy bajtów uid)
+PACKED_DTYPES: Dict[str, np.dtype] = {
+    "kind": np.dtype(np.uint8),  # N: KIND_VERTEX / KIND_HYPEREDGE
+    "uid_int": np.dtype(np.int64),  # N: uid całkowity (dla uid tekstowych: 0)
+    "uid_offsets": np.dtype(np.int64),  # N+1: uid tekstowy = uid_bytes[o[i]:o[i+1]]
+    "uid_bytes": np.dtype(np.uint8),  # U: uid tekstowe w UTF-8 (puste dla int)
+    "uid_is_str": np.dtype(np.uint8),  # N
+    "xy": np.dtype(np.float64),  # N x 2: współrzędne (NaN dla hiperkrawędzi)
+    "hanging": np.dtype(np.uint8),  # N
+    "label": np.dtype(np.uint8),  # N: indeks w PackedGraph.labels
+    "r": np.dtype(np.int8),  # N
+    "b": np.dtype(np.int8),  # N
+    "indptr": np.dtype(np.int64),  # N+1: CSR - sąsiedzi i = indices[indptr[i]:indptr[i+1]]
+    "indices": np.dtype(np.int64),  # M
+    "midpoints": np.dtype(np.int64),  # K x 3: (narożnik1, narożnik2, środek)
+}
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Wyłącza cykliczny odśmiecacz na czas budowy dużego grafu - każdy nowy
+    węzeł to kilka obiektów, a kolejne przebiegi gc skanowałyby cały rosnący
+    graf (przy wczytywaniu ok. 1/3 czasu). Zbieranie jest tylko odłożone
+    do końca bloku.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class PackedGraph:
+    """
+    Graf w postaci kilku płaskich tablic NumPy (PACKED_DTYPES): węzły w kolejności
+    dodania do grafu, sąsiedztwo w formacie CSR, tablica uid. Bez obiektów
+    Pythona na węzeł - nadaje się do pamięci współdzielonej między procesami
+    i do zapisu binarnego.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], labels: List[str]):
+        self.arrays = arrays
+        self.labels = labels
+
+    def __len__(self) -> int:
+        return len(self.arrays["kind"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    @classmethod
+    def from_graph(
+        cls, graph: Graph, uids: Optional[Iterable[Union[int, str]]] = None
+    ) -> "PackedGraph":
+        """
+        uids: pakuje tylko podgraf indukowany przez te węzły (połączenia i wpisy
+        rejestru środków krawędzi wychodzące poza podzbiór są pomijane).
+        """
+        if uids is None:
+            nodes = list(graph.nodes())
+        else:
+            nodes = [graph.get_node(uid) for uid in sorted(set(uids), key=graph.uid_index)]
+        position = {node.uid: i for i, node in enumerate(nodes)}
+        n = len(nodes)
+
+        is_vertex = np.fromiter((isinstance(v, Vertex) for v in nodes), dtype=bool, count=n)
+        is_str = np.fromiter((isinstance(v.uid, str) for v in nodes), dtype=bool, count=n)
+
+        uid_int = np.fromiter(
+            (0 if isinstance(v.uid, str) else v.uid for v in nodes), dtype=np.int64, count=n
+        )
+        encoded = [v.uid.encode() if isinstance(v.uid, str) else b"" for v in nodes]
+        uid_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=uid_offsets[1:])
+        uid_bytes = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        xy = np.full((n, 2), np.nan, dtype=np.float64)
+        vertex_rows = np.flatnonzero(is_vertex)
+        xy[vertex_rows] = graph.coords[graph.vertex_indices(nodes[i].uid for i in vertex_rows)]
+        hanging = np.fromiter(
+            (isinstance(v, Vertex) and v.hanging for v in nodes), dtype=np.uint8, count=n
+        )
+
+        labels: List[str] = []
+        label_codes: Dict[str, int] = {}
+        label = np.zeros(n, dtype=np.uint8)
+        r = np.zeros(n, dtype=np.int8)
+        b = np.zeros(n, dtype=np.int8)
+        for i, node in enumerate(nodes):
+            if isinstance(node, Hyperedge):
+                if node.label not in label_codes:
+                    label_codes[node.label] = len(labels)
+                    labels.append(node.label)
+                label[i] = label_codes[node.label]
+                r[i] = node.r
+                b[i] = node.b
+
+        neighbors = [
+            [position[u] for u in graph._storage.neighbors(node.uid) if u in position]
+            for node in nodes
+        ]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(ns) for ns in neighbors], out=indptr[1:])
+        indices = np.fromiter(
+            (i for ns in neighbors for i in ns), dtype=np.int64, count=int(indptr[-1])
+        )
+
+        midpoints = np.array(
+            [
+                (position[v1], position[v2], position[mid])
+                for pair, mid in graph._midpoints.items()
+                for v1, v2 in [tuple(pair)]
+                if v1 in position and v2 in position and mid in position
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 3)
+
+        arrays = {
+            "kind": np.where(is_vertex, KIND_VERTEX, KIND_HYPEREDGE).astype(np.uint8),
+            "uid_int": uid_int,
+            "uid_offsets": uid_offsets,
+            "uid_bytes": uid_bytes,
+            "uid_is_str": is_str.astype(np.uint8),
+            "xy": xy,
+            "hanging": hanging,
+            "label": label,
+            "r": r,
+            "b": b,
+            "indptr": indptr,
+            "indices": indices,
+            "midpoints": midpoints,
+        }
+        return cls(arrays, labels)
+
+    def uids(self) -> List[Union[int, str]]:
+        a = self.arrays
+        raw = a["uid_bytes"].tobytes()
+        offsets = a["uid_offsets"].tolist()
+        return [
+            raw[offsets[i] : offsets[i + 1]].decode() if is_str else value
+            for i, (is_str, value) in enumerate(
+                zip(a["uid_is_str"].tolist(), a["uid_int"].tolist())
+            )
+        ]
+
+    def to_graph(self, backend: str = BACKEND_NETWORKX) -> Graph:
+        """
+        Buduje Graph (w kolejności węzłów z tablic, więc z tą samą kolejnością
+        dodania). Węzły dodawane są zbiorczo seriami jednego rodzaju:
+        wierzchołki przez add_vertices (współrzędne jednym zapisem),
+        hiperkrawędzie razem z połączeniami z wcześniejszymi wierzchołkami
+        przez add_hyperedges. Pozostałe połączenia (rzadkie) - przez connect.
+        """
+        a = self.arrays
+        graph = Graph(backend=backend)
+        uids = self.uids()
+        n = len(uids)
+        kinds = a["kind"]
+        hanging = a["hanging"].tolist()
+        labels = [self.labels[code] for code in a["label"].tolist()] if self.labels else []
+        r = a["r"].tolist()
+        b = a["b"].tolist()
+
+        # Podział połączeń CSR: hiperkrawędź - wcześniejszy wierzchołek trafia do
+        # add_hyperedges, każde inne połączenie raz (od strony mniejszego indeksu
+        # albo od hiperkrawędzi) do connect na końcu
+        indptr = a["indptr"]
+        indices = a["indices"]
+        is_vertex = kinds == KIND_VERTEX
+        row = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+        mixed = is_vertex[row] != is_vertex[indices]
+        bulk = mixed & ~is_vertex[row] & (indices < row)
+        deferred = (~mixed & (indices > row)) | (mixed & ~is_vertex[row] & (indices > row))
+        bulk_uids = [uids[j] for j in indices[bulk].tolist()]
+        bulk_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row[bulk], minlength=n), out=bulk_ptr[1:])
+        bulk_ptr = bulk_ptr.tolist()
+
+        run_starts = [0, *(np.flatnonzero(kinds[1:] != kinds[:-1]) + 1).tolist(), n]
+        with _gc_paused():
+            for start, stop in zip(run_starts, run_starts[1:]):
+                if start == stop:
+                    continue
+                if kinds[start] == KIND_VERTEX:
+                    vertices = [
+                        Vertex(uids[i], 0.0, 0.0, bool(hanging[i])) for i in range(start, stop)
+                    ]
+                    graph.add_vertices(vertices, a["xy"][start:stop])
+                else:
+                    graph.add_hyperedges(
+                        (
+                            Hyperedge(uids[i], labels[i], r[i], b[i]),
+                            bulk_uids[bulk_ptr[i] : bulk_ptr[i + 1]],
+                        )
+                        for i in range(start, stop)
+                    )
+
+            for i, j in zip(row[deferred].tolist(), indices[deferred].tolist()):
+                graph.connect(uids[i], uids[j])
+
+            for v1, v2, mid in a["midpoints"].tolist():
+                graph.register_midpoint(uids[v1], uids[v2], uids[mid])
+
+        return graph
+
+    def view(self) -> Graph:
+        """
+        Graf tylko do odczytu wprost na tych tablicach (np. w pamięci
+        współdzielonej) - bez budowania obiektów i indeksów całego grafu jak
+        to_graph. Zapytania (find_hyperedges, sąsiedzi, pary wierzchołków,
+        rejestr środków) czytają tablice label/R/B i CSR; obiekty Vertex /
+        Hyperedge powstają dopiero przy pierwszym odczycie węzła. Pochodzenie
+        elementów i zapisane cykle narożników nie należą do PackedGraph -
+        widok liczy narożniki geometrycznie. Zmiany grafu kończą się ValueError.
+        """
+        graph = Graph(backend=BACKEND_SETS)
+        storage = PackedStorage(self, graph._ref)
+        graph._storage = storage
+        graph._coords = storage
+        graph._interner = storage
+        graph._label_index = storage.label_index()
+        graph._pair_index = _PackedPairIndex(storage)
+        graph._midpoints = _PackedMidpoints(storage)
+        graph._read_only = True
+        return graph
+
+    def layout(self) -> Tuple[Dict[str, Tuple[int, Tuple[int, ...]]], int]:
+        """Rozmieszczenie tablic w jednym buforze: {nazwa: (offset, kształt)} i rozmiar."""
+        layout = {}
+        offset = 0
+        for name, dtype in PACKED_DTYPES.items():
+            array = self.arrays[name]
+            offset = -(-offset // 8) * 8  # wyrównanie do 8 bajtów
+            layout[name] = (offset, array.shape)
+            offset += array.nbytes
+        return layout, offset
+
+    def write_into(self, buffer, layout: Dict[str, Tuple[int, Tuple[int, ...]]]) -> None:
+        for name, (offset, shape) in layout.items():
+            view = np.ndarray(shape, dtype=PACKED_DTYPES[name], buffer=buffer, offset=offset)
+            view[...] = self.arrays[name]
+
+    @classmethod
+    def from_buffer(
+        cls, buffer, layout: Dict[str, Tuple[int, Tuple[int, ...]]], labels: List[str]
+    ) -> "PackedGraph":
+        """Widoki (bez kopiowania) na tablice zapisane w buforze przez write_into."""
+        arrays = {
+            name: np.ndarray(shape, dtype=PACKED_DTYPES[name], buffer=buffer, offset=offset)
+            for name, (offset, shape) in layout.items()
+        }
+        return cls(arrays, labels)
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class PackedStorage:
+    """
+    Magazyn widoku PackedGraph.view(): węzły i sąsiedztwo czytane z tablic
+    PackedGraph (niezapisywalne widoki). Uid -> wiersz przez posortowane
+    tablice uid (searchsorted), bez słownika na wszystkie węzły; obiekty
+    węzłów powstają przy pierwszym odczycie i są zapamiętywane. Pełni też
+    rolę magazynu współrzędnych (xy / raw - wiersz węzła) i tablicy uid
+    (index - wiersz, czyli kolejność dodania do grafu).
+    """
+
+    def __init__(self, packed: PackedGraph, graph_ref: weakref.ref):
+        a = {name: _readonly(array) for name, array in packed.arrays.items()}
+        self.arrays = a
+        self.labels = packed.labels
+        self._graph_ref = graph_ref
+        self._objects: Dict[int, Element] = {}  # wiersz -> węzeł (odczytane)
+        self._rows: Dict[NodeId, int] = {}  # uid -> wiersz (odczytane)
+        self._adj: Dict[int, List[int]] = {}  # wiersz -> wiersze sąsiadów (odczytane)
+
+        is_str = a["uid_is_str"].astype(bool)
+        int_rows = np.flatnonzero(~is_str)
+        order = np.argsort(a["uid_int"][int_rows], kind="stable")
+        self._int_rows = int_rows[order]
+        self._int_keys = a["uid_int"][self._int_rows]
+
+        # Uid tekstowe jako tablica bajtów stałej szerokości (dtype S)
+        str_rows = np.flatnonzero(is_str)
+        offsets = a["uid_offsets"]
+        starts = offsets[str_rows]
+        lengths = offsets[str_rows + 1] - starts
+        width = max(int(lengths.max()) if len(lengths) else 0, 1)
+        matrix = np.zeros((len(str_rows), width), dtype=np.uint8)
+        owner = np.repeat(np.arange(len(str_rows)), lengths)
+        column = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        matrix[owner, column] = a["uid_bytes"][np.repeat(starts, lengths) + column]
+        keys = matrix.view(f"S{width}").ravel()
+        order = np.argsort(keys, kind="stable")
+        self._str_rows = str_rows[order]
+        self._str_keys = keys[order]
+
+    def __contains__(self, uid: NodeId) -> bool:
+        return self.row(uid) >= 0
+
+    def __len__(self) -> int:
+        return len(self.arrays["kind"])
+
+    def row(self, uid: NodeId) -> int:
+        """Wiersz węzła w tablicach albo -1."""
+        row = self._rows.get(uid)
+        if row is not None:
+            return row
+        if isinstance(uid, str):
+            key = uid.encode()
+            if len(key) > self._str_keys.dtype.itemsize:
+                return -1
+            keys, rows = self._str_keys, self._str_rows
+        elif isinstance(uid, (int, np.integer)):
+            key = uid
+            keys, rows = self._int_keys, self._int_rows
+        else:
+            return -1
+        i = int(np.searchsorted(keys, key))
+        if i == len(keys) or keys[i] != key:
+            return -1
+        row = self._rows[uid] = int(rows[i])
+        return row
+
+    def node(self, row: int) -> Element:
+        node = self._objects.get(row)
+        if node is not None:
+            return node
+        a = self.arrays
+        if a["uid_is_str"][row]:
+            offsets = a["uid_offsets"]
+            uid = a["uid_bytes"][offsets[row] : offsets[row + 1]].tobytes().decode()
+        else:
+            uid = int(a["uid_int"][row])
+        if a["kind"][row] == KIND_VERTEX:
+            node = Vertex.__new__(Vertex)
+            node.uid = uid
+            node.hanging = bool(a["hanging"][row])
+            node._x = node._y = 0.0
+            node._store = self
+            node._index = row
+        else:
+            node = Hyperedge(uid, self.labels[a["label"][row]], int(a["r"][row]), int(a["b"][row]))
+            # Bezpośrednia zmiana label/R/B trafia do grafu - ten jest tylko do odczytu
+            object.__setattr__(node, "_graph", self._graph_ref)
+        self._objects[row] = node
+        self._rows[uid] = row
+        return node
+
+    def neighbor_rows(self, row: int) -> List[int]:
+        rows = self._adj.get(row)
+        if rows is None:
+            indptr = self.arrays["indptr"]
+            rows = self._adj[row] = self.arrays["indices"][indptr[row] : indptr[row + 1]].tolist()
+        return rows
+
+    def get(self, uid: NodeId) -> Element:
+        row = self.row(uid)
+        if row < 0:
+            raise KeyError(uid)
+        return self.node(row)
+
+    peek = get
+
+    def neighbors(self, uid: NodeId) -> Iterable[NodeId]:
+        row = self.row(uid)
+        if row < 0:
+            raise KeyError(uid)
+        return [self.node(j).uid for j in self.neighbor_rows(row)]
+
+    def has_edge(self, uid1: NodeId, uid2: NodeId) -> bool:
+        row1, row2 = self.row(uid1), self.row(uid2)
+        return row1 >= 0 and row2 >= 0 and row2 in self.neighbor_rows(row1)
+
+    def nodes(self) -> Iterator[Tuple[NodeId, Element]]:
+        for row in range(len(self)):
+            node = self.node(row)
+            yield node.uid, node
+
+    # Magazyn współrzędnych (Vertex.x / Vertex.y, Graph.coords): wiersz węzła
+    @property
+    def xy(self) -> np.ndarray:
+        return self.arrays["xy"]
+
+    raw = xy
+
+    # Tablica uid (Graph.uid_index): kolejność dodania to kolejność wierszy
+    def index(self, uid: NodeId) -> int:
+        row = self.row(uid)
+        if row < 0:
+            raise ValueError(f"Węzeł o ID {uid} nie istnieje w grafie.")
+        return row
+
+    def label_index(self) -> Dict[Tuple[str, int, int], "_PackedBucket"]:
+        """Indeks (label, R, B) -> kubełek wierszy, policzony wektorowo z tablic."""
+        a = self.arrays
+        rows = np.flatnonzero(a["kind"] == KIND_HYPEREDGE)
+        codes = (
+            a["label"][rows].astype(np.int64) * 65536
+            + (a["r"][rows].astype(np.int64) + 128) * 256
+            + (a["b"][rows].astype(np.int64) + 128)
+        )
+        index = {}
+        for code in np.unique(codes).tolist():
+            key = (self.labels[code >> 16], ((code >> 8) & 255) - 128, (code & 255) - 128)
+            index[key] = _PackedBucket(self, rows[codes == code])
+        return index
+
+
+class _PackedBucket(Mapping):
+    """Kubełek indeksu (label, R, B) widoku: uid -> Hyperedge dla wierszy rows."""
+
+    def __init__(self, storage: PackedStorage, rows: np.ndarray):
+        self._storage = storage
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[NodeId]:
+        node = self._storage.node
+        return (node(row).uid for row in self._rows.tolist())
+
+    def __getitem__(self, uid: NodeId) -> Hyperedge:
+        row = self._storage.row(uid)
+        i = int(np.searchsorted(self._rows, row))
+        if row < 0 or i == len(self._rows) or self._rows[i] != row:
+            raise KeyError(uid)
+        return self._storage.node(row)
+
+    def values(self):
+        node = self._storage.node
+        return [node(row) for row in self._rows.tolist()]
+
+    def items(self):
+        return [(h.uid, h) for h in self.values()]
+
+
+class _PackedPairIndex:
+    """
+    Indeks par wierzchołków widoku: część wspólna sąsiadów obu wierzchołków
+    z CSR, zapamiętywana dla odczytanych par (graf się nie zmienia).
+    """
+
+    def __init__(self, storage: PackedStorage):
+        self._storage = storage
+        self._pairs: Dict[frozenset, Dict[str, Dict[NodeId, Hyperedge]]] = {}
+
+    def get(self, pair: frozenset, default=None):
+        by_label = self._pairs.get(pair)
+        if by_label is None:
+            by_label = self._pairs[pair] = self._lookup(pair)
+        return by_label or default
+
+    def _lookup(self, pair: frozenset) -> Dict[str, Dict[NodeId, Hyperedge]]:
+        storage = self._storage
+        rows = [storage.row(uid) for uid in pair]
+        by_label: Dict[str, Dict[NodeId, Hyperedge]] = {}
+        if len(rows) != 2 or min(rows) < 0:
+            return by_label
+        second = set(storage.neighbor_rows(rows[1]))
+        for row in sorted(r for r in storage.neighbor_rows(rows[0]) if r in second):
+            h = storage.node(row)
+            if isinstance(h, Hyperedge):
+                by_label.setdefault(h.label, {})[h.uid] = h
+        return by_label
+
+
+class _PackedMidpoints:
+    """Rejestr środków krawędzi widoku: para wierszy narożników -> wiersz środka."""
+
+    def __init__(self, storage: PackedStorage):
+        self._storage = storage
+        midpoints = storage.arrays["midpoints"]
+        n = len(storage)
+        keys = np.minimum(midpoints[:, 0], midpoints[:, 1]) * n + np.maximum(
+            midpoints[:, 0], midpoints[:, 1]
+        )
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._mids = midpoints[order, 2]
+
+    def get(self, pair: frozenset, default=None):
+        storage = self._storage
+        rows = [storage.row(uid) for uid in pair]
+        if len(rows) != 2 or min(rows) < 0:
+            return default
+        key = min(rows) * len(storage) + max(rows)
+        i = int(np.searchsorted(self._keys, key))
+        if i == len(self._keys) or self._keys[i] != key:
+            return default
+        return storage.node(int(self._mids[i])).uid
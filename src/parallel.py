@@ -0,0 +1,184 @@
+import contextlib
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .elements import Hyperedge
+from .graph import Graph
+from .packed import PackedGraph
+from .productions.production import Production
+
+NodeId = Union[int, str]
+
+# Widok grafu na migawce w pamięci współdzielonej (ustawiany przez _init_worker)
+# i jej uchwyt - tablice widoku wskazują na shm.buf przez cały czas życia procesu
+_worker_graph: Optional[Graph] = None
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _init_worker(shm_name: str, layout, labels: List[str]) -> None:
+    global _worker_graph, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    packed = PackedGraph.from_buffer(_worker_shm.buf, layout, labels)
+    _worker_graph = packed.view()
+
+
+def _match_shard(
+    production: Production, shard: List[NodeId], kwargs: Dict[str, Any]
+) -> Tuple[List[NodeId], bool]:
+    """Uid węzłów dopasowania w jednym fragmencie kandydatów i czy dopasowania to Hyperedge."""
+    with _worker_graph.candidate_scope(shard):
+        matches = production.find_lhs(_worker_graph, **kwargs)
+    plain = all(isinstance(m, Hyperedge) for m in matches)
+    return [production.match_node(m).uid for m in matches], plain
+
+
+@dataclass
+class SpeedupReport:
+    """Porównanie find_lhs produkcji: szeregowo na grafie vs równolegle na migawce."""
+
+    production: str
+    candidates: int
+    matches: int
+    serial_time: float
+    parallel_time: float
+    identical: bool  # te same dopasowania w tej samej kolejności
+
+    @property
+    def speedup(self) -> float:
+        return self.serial_time / self.parallel_time if self.parallel_time else float("inf")
+
+
+class ParallelMatcher:
+    """
+    Równoległe find_lhs: kandydaci (hiperkrawędzie o LHS_LABEL produkcji) są
+    dzieleni na fragmenty i sprawdzani w puli procesów. Procesy dopasowują swój
+    fragment (Graph.candidate_scope) na widoku PackedGraph.view() jednej
+    migawki grafu w pamięci współdzielonej - etykiety, R/B i sąsiedzi są
+    czytane wprost z tablic, bez odtwarzania grafu w każdym procesie. Wyniki są scalane w kolejności dodania
+    węzłów do grafu - tak samo jak w find_lhs wywołanym szeregowo.
+
+    Migawka jest nieaktualna po każdej zmianie grafu (śledzonej przez subscribe);
+    kolejne find_lhs odświeża ją automatycznie. Używać jako menedżera kontekstu
+    albo wywołać close().
+    """
+
+    # Liczba fragmentów kandydatów na jeden proces (równoważenie obciążenia)
+    SHARDS_PER_PROCESS = 4
+
+    def __init__(self, graph: Graph, processes: Optional[int] = None):
+        self.graph = graph
+        self.processes = processes or os.cpu_count() or 1
+        self.snapshot_time = 0.0
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._pool = None
+        self._stale = True
+        graph.subscribe(self._on_graph_event)
+
+    def __enter__(self) -> "ParallelMatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _on_graph_event(self, event) -> None:
+        self._stale = True
+
+    def refresh(self) -> None:
+        """Tworzy nową migawkę grafu i pulę procesów, które ją czytają."""
+        self._release()
+        start = time.perf_counter()
+        packed = PackedGraph.from_graph(self.graph)
+        layout, size = packed.layout()
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        packed.write_into(self._shm.buf, layout)
+        self._pool = multiprocessing.get_context().Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(self._shm.name, layout, packed.labels),
+        )
+        self.snapshot_time = time.perf_counter() - start
+        self._stale = False
+
+    def find_lhs(self, production: Production, **kwargs) -> List[Any]:
+        """Jak production.find_lhs(graph, **kwargs), ale kandydaci sprawdzani równolegle."""
+        if self._stale:
+            self.refresh()
+
+        graph = self.graph
+        candidates = [h.uid for h in graph.find_hyperedges(label=production.LHS_LABEL)]
+        if not candidates:
+            return []
+
+        size = -(-len(candidates) // (self.processes * self.SHARDS_PER_PROCESS))
+        shards = [candidates[i : i + size] for i in range(0, len(candidates), size)]
+        results = self._pool.starmap(
+            _match_shard, [(production, shard, kwargs) for shard in shards]
+        )
+
+        matched: List[NodeId] = []
+        plain = True
+        for uids, shard_plain in results:
+            matched.extend(uids)
+            plain = plain and shard_plain
+        matched.sort(key=graph.uid_index)
+
+        if plain:
+            return [graph.get_hyperedge(uid) for uid in matched]
+        # Dopasowania-słowniki (np. P8) odtwarzamy na grafie, sprawdzając tylko
+        # węzły, które dopasowały się w procesach roboczych
+        with graph.candidate_scope(matched):
+            return production.find_lhs(graph, **kwargs)
+
+    def compare(self, productions: Sequence[Production]) -> List[SpeedupReport]:
+        """
+        Mierzy find_lhs każdej produkcji szeregowo i równolegle i sprawdza zgodność
+        wyników. Czas utworzenia migawki (snapshot_time) i uruchomienia procesów
+        nie wchodzi do pomiarów.
+        """
+        if self._stale:
+            self.refresh()
+
+        reports = []
+        for production in productions:
+            self.find_lhs(production)  # rozgrzewka: start procesów i widoków migawki
+            start = time.perf_counter()
+            serial = production.find_lhs(self.graph)
+            serial_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel = self.find_lhs(production)
+            parallel_time = time.perf_counter() - start
+
+            reports.append(
+                SpeedupReport(
+                    production=production.__class__.__name__,
+                    candidates=len(self.graph.find_hyperedges(label=production.LHS_LABEL)),
+                    matches=len(serial),
+                    serial_time=serial_time,
+                    parallel_time=parallel_time,
+                    identical=[production.match_node(m).uid for m in serial]
+                    == [production.match_node(m).uid for m in parallel],
+                )
+            )
+        return reports
+
+    def _release(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def close(self) -> None:
+        """Zamyka pulę procesów, zwalnia pamięć współdzieloną i przestaje śledzić graf."""
+        self._release()
+        with contextlib.suppress(ValueError):
+            self.graph.unsubscribe(self._on_graph_event)
+        self._stale = True
@@ -4,6 +4,7 @@ from itertools import combinations
 from ..graph import Graph
 from ..elements import Hyperedge
 from .production import Production
+from .. import tracing
 
 
 class ProductionP1(Production):
@@ -11,6 +12,9 @@ class ProductionP1(Production):
     P1: Oznaczenie krawędzi do zamiany.
     Ustawia R=1 dla krawędzi węzła o etykiecie Q, jeśli R było 1.
     """
+
+    LHS_LABEL = "Q"
+
     def __init__(self):
         pass
 
@@ -18,44 +22,35 @@ class ProductionP1(Production):
         self, graph: Graph, target_id: str | int | None = None
     ) -> list[Hyperedge]:
         candidates: list[Hyperedge] = []
-        for _, data in graph._nx_graph.nodes(data=True):
-            hyperedge_obj = data.get("data")
-            if not isinstance(hyperedge_obj, Hyperedge):
-                continue
-
-            if target_id is not None and hyperedge_obj.uid != target_id:
-                continue
-
-            # 3. It must have label Q
-            if hyperedge_obj.label != "Q":
-                continue
-
-            # 4. It must have R=1
-            if hyperedge_obj.r != 1:
-                continue
-
+        trace = tracing.active()
+        # It must have label Q and R=1
+        for hyperedge_obj in graph.find_hyperedges(label="Q", r=1):
             hyperedge_vertices = graph.get_hyperedge_vertices(hyperedge_obj.uid)
 
             # 5. It must be connected to exactly 4 vertices
             if len(hyperedge_vertices) != 4:
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
                 continue
 
             should_continue = False
             e_labaled_edges = set()
             for vertex in hyperedge_vertices:
-                vertex_neighbors = graph.get_neighbors(vertex.uid)
-                for vertex_neighbor in vertex_neighbors:
+                # Only neighbors among the Q's own vertices matter
+                for vertex_neighbor in hyperedge_vertices:
+                    if vertex_neighbor == vertex:
+                        continue
                     hyperedges = graph.get_hyperedges_between_vertices(
                         vertex_uid1=vertex.uid, vertex_uid2=vertex_neighbor.uid
                     )
-                    if vertex_neighbor not in hyperedge_vertices:
-                        continue
 
                     # Those 4 vertices must be connected by at least one of the following cases:
                     #   Case 1. Q hyperedge between pair of vertices (diagonal case)
                     #   Case 2. Q and E hyperedges between pair of vertices (edge case)
                     if hyperedge_obj not in hyperedges:
                         should_continue = True
+                        if trace is not None:
+                            trace.reject(self, "not_connected")
                         break
 
                     hyperedges.remove(hyperedge_obj)
@@ -65,6 +60,8 @@ class ProductionP1(Production):
                         == 0
                     ):
                         should_continue = True
+                        if trace is not None:
+                            trace.reject(self, "missing_edge")
                         break
                     
                     if len(list(filter(lambda he: he.label == "E", hyperedges))) > 0:
@@ -80,18 +77,31 @@ class ProductionP1(Production):
                 continue
             
             if len(e_labaled_edges) != 4:
+                if trace is not None:
+                    trace.reject(self, "edge_count")
                 continue
             candidates.append(hyperedge_obj)
 
         return candidates
       
+    def footprint(self, graph: Graph, match: Hyperedge):
+        # RHS sets R on the E edges between the Q's vertices, so they are written too
+        reads, writes = super().footprint(graph, match)
+        for vertex1, vertex2 in combinations(graph.get_hyperedge_vertices(match.uid), 2):
+            writes.update(
+                he.uid
+                for he in graph.get_hyperedges_between_vertices(
+                    vertex_uid1=vertex1.uid, vertex_uid2=vertex2.uid, label="E"
+                )
+            )
+        return reads, writes
+
     def apply_rhs(self, graph: Graph, match: Hyperedge):
         # Set R=1 for the edges with label E between the 4 vertices of the matched Q hyperedge
         hyperedge_vertices = graph.get_hyperedge_vertices(match.uid)
         for vertex1, vertex2 in combinations(hyperedge_vertices, 2):
             hyperedges = graph.get_hyperedges_between_vertices(
-                vertex_uid1=vertex1.uid, vertex_uid2=vertex2.uid
+                vertex_uid1=vertex1.uid, vertex_uid2=vertex2.uid, label="E"
             )
             for he in hyperedges:
-                if he.label == "E":
-                    he.r = 1
\ No newline at end of file
+                graph.update_hyperedge(he.uid, r=1)
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import List, Union
 from ..graph import Graph
 from ..elements import Hyperedge
 from .production import Production
+from .. import tracing
 
 class ProductionP13(Production):
     """
@@ -9,42 +10,36 @@ class ProductionP13(Production):
     Dla elementu T z R=1, ustawia R=1 wszystkim jego krawędziom (E).
     """
 
+    LHS_LABEL = "T"
+
     def find_lhs(self, graph: Graph, target_id: Union[int, str] = None) -> List[Hyperedge]:
         candidates = []
-        for node_id, data in graph.nx_graph.nodes(data=True):
-            he = data.get("data")
-
-            if not isinstance(he, Hyperedge):
-                print(f"-> P13: Pomijam węzeł {he.uid}, nie jest Hyperedge.")
-                continue
-
-            if target_id is not None and he.uid != target_id:
-                print(f"-> P13: Pomijam węzeł {he.uid}, nie pasuje do target_id.")
-                continue
-
-            if he.label != "T":
-                print(f"-> P13: Pomijam węzeł {he.uid}, nie ma etykiety 'T'.")
-                continue
-
-            if he.r != 1:
-                print(f"-> P13: Pomijam węzeł {he.uid}, R={he.r} (wymagane R=1).")
-                continue
-
+        trace = tracing.active()
+        for he in graph.find_hyperedges(label="T", r=1):
             vertices = graph.get_hyperedge_vertices(he.uid)
             if len(vertices) != 7:
-                print(f"-> P13: Pomijam węzeł {he.uid}, ma {len(vertices)} wierzchołków (wymagane 7).")
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
                 continue
 
             edges_found = self._get_boundary_edges(graph, vertices)
 
             if len(edges_found) != 7:
-                print(f"-> P13: Pomijam węzeł {he.uid}, znaleziono tylko {len(edges_found)} krawędzi (wymagane 7).")
+                if trace is not None:
+                    trace.reject(self, "edge_count")
                 continue
 
             candidates.append(he)
 
         return candidates
 
+    def footprint(self, graph: Graph, match: Hyperedge):
+        # RHS zmienia R krawędzi elementu - one też są zapisywane
+        reads, writes = super().footprint(graph, match)
+        vertices = graph.get_hyperedge_vertices(match.uid)
+        writes |= {edge.uid for edge in self._get_boundary_edges(graph, vertices)}
+        return reads, writes
+
     def apply_rhs(self, graph: Graph, match_node: Hyperedge):
         vertices = graph.get_hyperedge_vertices(match_node.uid)
         edges_to_mark = self._get_boundary_edges(graph, vertices)
@@ -52,7 +47,6 @@ class ProductionP13(Production):
         for edge in edges_to_mark:
             if edge.r == 0:
                 graph.update_hyperedge(edge.uid, r=1)
-                print(f"-> P13: Oznaczono krawędź {edge.uid} (R=1).")
 
     def _get_boundary_edges(self, graph: Graph, vertices: list) -> List[Hyperedge]:
             found_edges = set()
@@ -61,10 +55,10 @@ class ProductionP13(Production):
                 for j in range(i + 1, len(vertices)):
                     v1, v2 = vertices[i], vertices[j]
 
-                    common_edges = graph.get_hyperedges_between_vertices(v1.uid, v2.uid)
+                    common_edges = graph.get_hyperedges_between_vertices(
+                        v1.uid, v2.uid, label='E'
+                    )
 
-                    for ce in common_edges:
-                        if ce.label == 'E':
-                            found_edges.add(ce)
+                    found_edges.update(common_edges)
 
             return list(found_edges)
\ No newline at end of file
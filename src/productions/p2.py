@@ -1,11 +1,11 @@
 from typing import List, Optional, Tuple, Set
 import networkx as nx
 from itertools import combinations
-import uuid
 
 from ..graph import Graph
 from ..elements import Hyperedge, Vertex
 from .production import Production
+from .. import tracing
 
 
 class ProductionP2(Production):
@@ -16,36 +16,18 @@ class ProductionP2(Production):
     If so, sync the break.
     """
 
+    LHS_LABEL = "E"
+
     def find_lhs(
         self, graph: Graph, target_id: Optional[str | int] = None
     ) -> List[Hyperedge]:
         candidates: List[Hyperedge] = []
+        trace = tracing.active()
         
-        # Iterate over all nodes in the graph to find potential 'E' edges
-        for node_id, data in graph._nx_graph.nodes(data=True):
-            hyperedge_obj = data.get("data")
-            
-            # 1. Must be a Hyperedge
-            if not isinstance(hyperedge_obj, Hyperedge):
-                continue
-            
-            # Optional: Filter by target_id if provided (useful for focused application)
-            if target_id is not None and hyperedge_obj.uid != target_id:
-                continue
-
-            # 2. Label must be 'E'
-            if hyperedge_obj.label != "E":
-                continue
-
-            # 3. Must be marked for refinement (R=1)
-            if hyperedge_obj.r != 1:
-                continue
-
-            # 4. Must NOT be a boundary edge (B=0)
-            # "Shared edge" implies it's internal between elements.
-            if hyperedge_obj.b != 0:
-                continue
-
+        # 1-4. Only 'E' edges marked for refinement (R=1) that are NOT boundary
+        # edges (B=0) are considered - "shared edge" implies it's internal
+        # between elements. The graph's label index yields exactly those.
+        for hyperedge_obj in graph.find_hyperedges(label="E", r=1, b=0):
             # 5. Check structural conditions (Isomorphism)
             # The edge E connects two vertices, say v1 and v2.
             # We need to check if there exists a "neighboring structure" that has already split this connection.
@@ -55,9 +37,16 @@ class ProductionP2(Production):
             vertices = graph.get_hyperedge_vertices(hyperedge_obj.uid)
             if len(vertices) != 2:
                 # Malformed edge E, should have exactly 2 vertices
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
                 continue
             
             v1, v2 = vertices[0], vertices[1]
+
+            # The neighbor may have registered its split in the graph already
+            if graph.get_midpoint(v1.uid, v2.uid) is not None:
+                candidates.append(hyperedge_obj)
+                continue
             
             # Look for a common neighbor v3 that is connected to both v1 and v2 via 'E' edges
             # AND those 'E' edges are NOT the current hyper_edge_obj.
@@ -71,27 +60,14 @@ class ProductionP2(Production):
                 if v3.uid == v2.uid:
                     continue # This is just v2, skipping
                 
-                # Check if v3 is connected to v2
-                v3_neighbors = graph.get_neighbors(v3.uid)
-                # Note: get_neighbors returns Vertex objects. We need to check if v2 is in this list.
-                # However, Vertex objects equality depends on implementation. Best to check UIDs.
-                if not any(n.uid == v2.uid for n in v3_neighbors):
-                    continue
-                
-                # Now we have v1 -- v3 -- v2 connectivity.
-                # We need to check the TYPE of connections.
+                # We need v1 -- v3 -- v2 connectivity through 'E' edges.
+                # Both checks are direct lookups in the graph's vertex-pair index.
                 # Is v1 connected to v3 via an 'E' edge?
-                edges_v1_v3 = graph.get_hyperedges_between_vertices(v1.uid, v3.uid)
-                has_E_v1_v3 = any(h.label == "E" for h in edges_v1_v3)
-                
-                if not has_E_v1_v3:
+                if not graph.get_hyperedges_between_vertices(v1.uid, v3.uid, label="E"):
                     continue
                     
                 # Is v3 connected to v2 via an 'E' edge?
-                edges_v3_v2 = graph.get_hyperedges_between_vertices(v3.uid, v2.uid)
-                has_E_v3_v2 = any(h.label == "E" for h in edges_v3_v2)
-                
-                if not has_E_v3_v2:
+                if not graph.get_hyperedges_between_vertices(v3.uid, v2.uid, label="E"):
                     continue
 
                 # If we found such a v3, then this E(v1, v2) is eligible for P2.
@@ -101,6 +77,8 @@ class ProductionP2(Production):
             
             if matching_neighbor_found:
                 candidates.append(hyperedge_obj)
+            elif trace is not None:
+                trace.reject(self, "not_split_by_neighbor")
 
         return candidates
 
@@ -121,22 +99,16 @@ class ProductionP2(Production):
         # but it's cheap to find again). 
         # Ideally find_lhs could return a tuple/object with matches, but adhering to the interface List[Hyperedge].
         
-        v3 = None
-        v1_neighbors = graph.get_neighbors(v1.uid)
+        v3 = graph.get_midpoint(v1.uid, v2.uid)
+        v1_neighbors = graph.get_neighbors(v1.uid) if v3 is None else []
         for cand_v in v1_neighbors:
             if cand_v.uid == v2.uid: continue
             
-            # Check v2 connection
-            cand_v_neighbors = graph.get_neighbors(cand_v.uid)
-            if not any(n.uid == v2.uid for n in cand_v_neighbors):
+            # Check 'E' connections v1 - cand_v - v2
+            if not graph.get_hyperedges_between_vertices(v1.uid, cand_v.uid, label="E"):
+                continue
+            if not graph.get_hyperedges_between_vertices(cand_v.uid, v2.uid, label="E"):
                 continue
-                
-            # Check edge types
-            edges_v1_c = graph.get_hyperedges_between_vertices(v1.uid, cand_v.uid)
-            if not any(h.label == "E" for h in edges_v1_c): continue
-            
-            edges_c_v2 = graph.get_hyperedges_between_vertices(cand_v.uid, v2.uid)
-            if not any(h.label == "E" for h in edges_c_v2): continue
             
             # Found it
             v3 = cand_v
@@ -144,18 +116,25 @@ class ProductionP2(Production):
             
         if v3 is None:
             # Should not happen if apply_rhs is called on a valid match
-            print(f"[P2] Error: Could not find hanging node v3 for edge {match.uid}")
+            trace = tracing.active()
+            if trace is not None:
+                trace.reject(self, "rhs_missing_hanging_node")
             return
 
         # 2. Create two new E hyperedges
         # Properties: label='E', r=0, b=0 (since matched edge was b=0)
         # We assume b=0 for the new edges because they are internal parts of the split.
         
-        new_h1 = Hyperedge(uid=str(uuid.uuid4()), label="E", r=0, b=0)
-        new_h2 = Hyperedge(uid=str(uuid.uuid4()), label="E", r=0, b=0)
+        new_h1 = Hyperedge(uid=graph.ids.next_hyperedge_uid("E"), label="E", r=0, b=0)
+        new_h2 = Hyperedge(uid=graph.ids.next_hyperedge_uid("E"), label="E", r=0, b=0)
         
         graph.add_hyperedge(new_h1)
         graph.add_hyperedge(new_h2)
+
+        # Lineage: the two halves are children 0 and 1 of the split edge
+        parent_index = graph.uid_index(match.uid)
+        graph.record_lineage(new_h1.uid, parent_index, 0)
+        graph.record_lineage(new_h2.uid, parent_index, 1)
         
         # 3. Connect new edges
         # E1 connects v1 and v3
@@ -170,3 +149,7 @@ class ProductionP2(Production):
         # We need to remove the node from the graph.
         # graph.remove_node handles removing edges connected to it too.
         graph.remove_node(match.uid)
+
+        # 5. Record v3 as the midpoint of (v1, v2) so element productions
+        # can look it up directly instead of walking the topology again
+        graph.register_midpoint(v1.uid, v2.uid, v3.uid)
@@ -2,6 +2,7 @@ from typing import List, Union
 from ..graph import Graph
 from ..elements import Hyperedge, Vertex
 from .production import Production
+from .. import tracing
 
 
 class ProductionP3(Production):
@@ -12,34 +13,19 @@ class ProductionP3(Production):
     Stara krawędź POZOSTAJE (zgodnie z diagramem - 3 krawędzie E po RHS).
     """
 
+    LHS_LABEL = "E"
+
     def find_lhs(self, graph: Graph, target_id: Union[int, str] = None) -> List[Hyperedge]:
         candidates = []
-        for node_id, data in graph.nx_graph.nodes(data=True):
-            he = data.get("data")
-
-            # 1. Musi to być Hyperedge
-            if not isinstance(he, Hyperedge):
-                continue
-
-            # 2. Opcjonalne filtrowanie po ID
-            if target_id is not None and he.uid != target_id:
-                continue
-
-            # 3. Musi mieć etykietę 'E'
-            if he.label != "E":
-                continue
-
-            # 4. Musi mieć R=1 (oznaczona do podziału)
-            if he.r != 1:
-                continue
-
-            # 5. Musi mieć B=0 (krawędź wewnętrzna/współdzielona)
-            if he.b != 0:
-                continue
-
+        trace = tracing.active()
+        # 1-5. Hyperedge 'E' z R=1 (oznaczona do podziału) i B=0
+        # (krawędź wewnętrzna/współdzielona) - wprost z indeksu grafu
+        for he in graph.find_hyperedges(label="E", r=1, b=0):
             # 6. Musi łączyć dokładnie 2 wierzchołki
             vertices = graph.get_hyperedge_vertices(he.uid)
             if len(vertices) != 2:
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
                 continue
 
             candidates.append(he)
@@ -63,28 +49,52 @@ class ProductionP3(Production):
         # 2. Dodajemy nowy wierzchołek (wiszący)
         # Zgodnie z P3, ten wierzchołek powstaje na krawędzi.
         # W kontekście PolyDPG często staje się on hanging node dla sąsiada.
-        new_vertex = Vertex(uid=new_v_uid, x=new_x, y=new_y, hanging=True)
-        graph.add_vertex(new_vertex)
+        # Przy włączonym rejestrze współrzędnych (Graph.enable_vertex_dedup)
+        # używamy wierzchołka, który już leży w środku krawędzi.
+        existing = graph.find_vertex_at(new_x, new_y)
+        if existing is not None:
+            new_v_uid = existing.uid
+        else:
+            new_vertex = Vertex(uid=new_v_uid, x=new_x, y=new_y, hanging=True)
+            graph.add_vertex(new_vertex)
 
         # 3. Aktualizujemy starą krawędź - ZOSTAJE, tylko zmienia R: 1->0
         # Zgodnie z diagramem stara krawędź (1-2) pozostaje z zaktualizowanym R
         graph.update_hyperedge(match_node.uid, r=0)
 
         # 4. Tworzymy dwie nowe krawędzie (R=0, B=0) łączące V z końcami
-        # Te są dodatkowymi połączeniami do nowego wierzchołka V
-        e1 = Hyperedge(uid=new_e1_uid, label="E", r=0, b=0)
-        e2 = Hyperedge(uid=new_e2_uid, label="E", r=0, b=0)
-
-        graph.add_hyperedge(e1)
-        graph.add_hyperedge(e2)
+        # Te są dodatkowymi połączeniami do nowego wierzchołka V. Gdy V pochodzi
+        # z rejestru, połówki, które już istnieją, pomijamy.
+        make_e1 = existing is None or not graph.get_hyperedges_between_vertices(
+            v1.uid, new_v_uid, label="E"
+        )
+        make_e2 = existing is None or not graph.get_hyperedges_between_vertices(
+            new_v_uid, v2.uid, label="E"
+        )
+        if make_e1:
+            graph.add_hyperedge(Hyperedge(uid=new_e1_uid, label="E", r=0, b=0))
+        if make_e2:
+            graph.add_hyperedge(Hyperedge(uid=new_e2_uid, label="E", r=0, b=0))
+
+        # Pochodzenie: dzieci 0, 1 - nowe krawędzie, 2 - nowy wierzchołek
+        parent_index = graph.uid_index(match_node.uid)
+        if make_e1:
+            graph.record_lineage(new_e1_uid, parent_index, 0)
+        if make_e2:
+            graph.record_lineage(new_e2_uid, parent_index, 1)
+        if existing is None:
+            graph.record_lineage(new_v_uid, parent_index, 2)
 
         # 5. Łączymy nowe krawędzie
         # E1 łączy v1 i nowy wierzchołek
-        graph.connect(new_e1_uid, v1.uid)
-        graph.connect(new_e1_uid, new_v_uid)
+        if make_e1:
+            graph.connect(new_e1_uid, v1.uid)
+            graph.connect(new_e1_uid, new_v_uid)
 
         # E2 łączy nowy wierzchołek i v2
-        graph.connect(new_e2_uid, new_v_uid)
-        graph.connect(new_e2_uid, v2.uid)
+        if make_e2:
+            graph.connect(new_e2_uid, new_v_uid)
+            graph.connect(new_e2_uid, v2.uid)
 
-        print(f"-> P3: Zaktualizowano {match_node.uid} (R->0) i dodano V z krawędziami {new_e1_uid}, {new_e2_uid}.")
+        # 6. Rejestrujemy V jako środek krawędzi (v1, v2) - P5/P8/P11/P14 odczytają go w O(1)
+        graph.register_midpoint(v1.uid, v2.uid, new_v_uid)
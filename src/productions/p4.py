@@ -1,6 +1,7 @@
 from typing import List, Union
 
 from .production import Production
+from .. import tracing
 from ..graph import Graph
 from ..elements import Vertex, Hyperedge
 
@@ -12,61 +13,24 @@ class ProductionP4(Production):
     i tworzy dwie nowe krawędzie z B=1 i R=0.
     """
 
-    DEBUG = True
+    LHS_LABEL = "E"
 
     def find_lhs(
         self, graph: Graph, target_id: Union[int, str] = None
     ) -> List[Hyperedge]:
         candidates: List[Hyperedge] = []
+        trace = tracing.active()
         
-        for _, data in graph._nx_graph.nodes(data=True):
-            if self.DEBUG:
-                print(f"[P4] Sprawdzam węzeł: {data}")
-            
-            hyperedge_obj = data.get("data")
-            
-            # 1. Must be a Hyperedge
-            if not isinstance(hyperedge_obj, Hyperedge):
-                if self.DEBUG:
-                    print("[P4] - pomijam, nie jest Hyperedge.")
-                continue
-
-            # 2. If target_id is given, only consider that specific node
-            if target_id is not None and hyperedge_obj.uid != target_id:
-                if self.DEBUG:
-                    print(f"[P4] - pomijam, nie jest celem (target_id={target_id}).")
-                continue
-
-            # 3. Must have label E
-            if hyperedge_obj.label != "E":
-                if self.DEBUG:
-                    print("[P4] - pomijam, nie jest E.")
-                continue
-
-            # 4. Must have R=1
-            if hyperedge_obj.r != 1:
-                if self.DEBUG:
-                    print("[P4] - pomijam, R != 1.")
-                continue
-
-            # 5. Must have B=1 (boundary edge)
-            if hyperedge_obj.b != 1:
-                if self.DEBUG:
-                    print("[P4] - pomijam, B != 1.")
-                continue
-
+        # 1-5. Must be an E hyperedge with R=1 and B=1 (boundary edge)
+        for hyperedge_obj in graph.find_hyperedges(label="E", r=1, b=1):
             # 6. Must be connected to exactly 2 vertices
             hyperedge_vertices = graph.get_hyperedge_vertices(hyperedge_obj.uid)
-            if self.DEBUG:
-                print(f"[P4] - znalezione wierzchołki hiperkrawędzi: {hyperedge_vertices}")
             
             if len(hyperedge_vertices) != 2:
-                if self.DEBUG:
-                    print("[P4] - pomijam, nie ma dokładnie 2 wierzchołków.")
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
                 continue
 
-            if self.DEBUG:
-                print(f"[P4] - znaleziono kandydata: {hyperedge_obj}")
             candidates.append(hyperedge_obj)
 
         return candidates
@@ -76,59 +40,57 @@ class ProductionP4(Production):
         vertices = graph.get_hyperedge_vertices(match_node.uid)
         v1, v2 = vertices[0], vertices[1]
         
-        if self.DEBUG:
-            print(f"[P4] Dzielę krawędź {match_node.uid} między wierzchołkami {v1.uid} i {v2.uid}")
-
         # Calculate midpoint
         mid_x = (v1.x + v2.x) / 2.0
         mid_y = (v1.y + v2.y) / 2.0
         
-        # Generate new vertex ID
-        # Simple approach: use max existing vertex ID + 1
-        max_vertex_id = max(
-            [node_id for node_id, data in graph._nx_graph.nodes(data=True) 
-             if isinstance(data.get("data"), Vertex)],
-            default=0
-        )
-        new_vertex_id = max_vertex_id + 1
+        # With the coordinate registry enabled (Graph.enable_vertex_dedup),
+        # reuse a vertex that already sits at the midpoint
+        existing = graph.find_vertex_at(mid_x, mid_y)
+        if existing is not None:
+            new_vertex_id = existing.uid
+            # The midpoint of a boundary edge is never hanging
+            if existing.hanging:
+                graph.update_vertex(new_vertex_id, hanging=False)
+        else:
+            # Generate new vertex ID from the graph's allocator (max existing ID + 1)
+            new_vertex_id = graph.ids.next_vertex_uid()
+
+            # Create new vertex (not hanging, as it's on a boundary edge)
+            new_vertex = Vertex(uid=new_vertex_id, x=mid_x, y=mid_y, hanging=False)
+            graph.add_vertex(new_vertex)
         
-        # Create new vertex (not hanging, as it's on a boundary edge)
-        new_vertex = Vertex(uid=new_vertex_id, x=mid_x, y=mid_y, hanging=False)
-        graph.add_vertex(new_vertex)
-        
-        if self.DEBUG:
-            print(f"[P4] Utworzono nowy wierzchołek {new_vertex_id} w ({mid_x}, {mid_y})")
-
-        # Generate new edge IDs
-        max_edge_id = max(
-            [int(str(node_id).replace("E", "")) 
-             for node_id, data in graph._nx_graph.nodes(data=True) 
-             if isinstance(data.get("data"), Hyperedge) and str(node_id).startswith("E")],
-            default=0
+        # Generate new edge IDs (E<n>) from the graph's allocator. When the
+        # vertex came from the registry, halves that already exist are skipped.
+        make_e1 = existing is None or not graph.get_hyperedges_between_vertices(
+            v1.uid, new_vertex_id, label="E"
         )
-        edge1_id = f"E{max_edge_id + 1}"
-        edge2_id = f"E{max_edge_id + 2}"
+        make_e2 = existing is None or not graph.get_hyperedges_between_vertices(
+            new_vertex_id, v2.uid, label="E"
+        )
+        parent_index = graph.uid_index(match_node.uid)
 
         # Create two new edges with B=1, R=0
-        edge1 = Hyperedge(uid=edge1_id, label="E", r=0, b=1)
-        edge2 = Hyperedge(uid=edge2_id, label="E", r=0, b=1)
-        
-        graph.add_hyperedge(edge1)
-        graph.connect(edge1_id, v1.uid)
-        graph.connect(edge1_id, new_vertex_id)
-        
-        graph.add_hyperedge(edge2)
-        graph.connect(edge2_id, new_vertex_id)
-        graph.connect(edge2_id, v2.uid)
+        # Lineage: children 0 and 1 are the new edges, 2 is the new vertex
+        if make_e1:
+            edge1_id = graph.ids.next_hyperedge_uid("E")
+            graph.add_hyperedge(Hyperedge(uid=edge1_id, label="E", r=0, b=1))
+            graph.connect(edge1_id, v1.uid)
+            graph.connect(edge1_id, new_vertex_id)
+            graph.record_lineage(edge1_id, parent_index, 0)
+
+        if make_e2:
+            edge2_id = graph.ids.next_hyperedge_uid("E")
+            graph.add_hyperedge(Hyperedge(uid=edge2_id, label="E", r=0, b=1))
+            graph.connect(edge2_id, new_vertex_id)
+            graph.connect(edge2_id, v2.uid)
+            graph.record_lineage(edge2_id, parent_index, 1)
+
+        if existing is None:
+            graph.record_lineage(new_vertex_id, parent_index, 2)
         
-        if self.DEBUG:
-            print(f"[P4] Utworzono krawędź {edge1_id}: {v1.uid} -> {new_vertex_id}")
-            print(f"[P4] Utworzono krawędź {edge2_id}: {new_vertex_id} -> {v2.uid}")
+        # Record the split so element productions can look the midpoint up directly
+        graph.register_midpoint(v1.uid, v2.uid, new_vertex_id)
 
         # Remove the old edge
-        graph.remove_node(match_node.uid)
-        
-        if self.DEBUG:
-            print(f"[P4] Usunięto starą krawędź {match_node.uid}")
-
-        print(f"-> P4: Podzielono krawędź brzegową {match_node.uid}, utworzono wierzchołek {new_vertex_id} i krawędzie {edge1_id}, {edge2_id}.")
\ No newline at end of file
+        graph.remove_node(match_node.uid)
\ No newline at end of file
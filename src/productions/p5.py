@@ -1,160 +1,11 @@
-import math
-from typing import List, Union, Optional, Tuple
-from ..graph import Graph
-from ..elements import Hyperedge, Vertex
-from .production import Production
+from .polygon_split import PolygonSplit
 
 
-class ProductionP5(Production):
+class ProductionP5(PolygonSplit):
     """
     P5: Podział elementu czworokątnego (Q, R=1), jeśli wszystkie jego krawędzie
     zostały wcześniej podzielone (istnieją węzły wiszące na każdym boku).
     """
 
-    def find_lhs(self, graph: Graph, target_id: Union[int, str] = None) -> List[Hyperedge]:
-        candidates = []
-        for node_id, data in graph.nx_graph.nodes(data=True):
-            he = data.get("data")
-
-            # 1. Musi to być Hyperedge typu 'Q' z R=1
-            if not isinstance(he, Hyperedge) or he.label != 'Q' or he.r != 1:
-                continue
-
-            # 2. Opcjonalne filtrowanie po ID
-            if target_id is not None and he.uid != target_id:
-                continue
-
-            # 3. Musi mieć dokładnie 4 narożniki (wierzchołki)
-            corners = graph.get_hyperedge_vertices(he.uid)
-            if len(corners) != 4:
-                continue
-
-            # 4. Sortujemy narożniki geometrycznie (przeciwnie do wskazówek zegara),
-            # Jest to niezbędne, aby sprawdzić sąsiedztwo na bokach
-            sorted_corners = self._sort_vertices_counter_clockwise(corners)
-
-            # 5. Sprawdzamy warunek "all edges are broken"
-            # Pomiędzy każdą parą sąsiednich narożników musi istnieć "midpoint" (węzeł wiszący)
-            # połączony krawędziami E.
-            is_broken = True
-            for i in range(4):
-                v_curr = sorted_corners[i]
-                v_next = sorted_corners[(i + 1) % 4]
-
-                midpoint = self._find_midpoint_between(graph, v_curr, v_next)
-                if midpoint is None:
-                    is_broken = False
-                    break
-
-            if is_broken:
-                candidates.append(he)
-
-        return candidates
-
-    def apply_rhs(self, graph: Graph, match_node: Hyperedge):
-        # 1. Pobieramy i sortujemy narożniki starego Q
-        corners = graph.get_hyperedge_vertices(match_node.uid)
-        corners = self._sort_vertices_counter_clockwise(corners)
-
-        # c1..c4 to narożniki 1, 2, 3, 4 z diagramu
-        c1, c2, c3, c4 = corners[0], corners[1], corners[2], corners[3]
-
-        # 2. Znajdujemy istniejące węzły środkowe (5, 6, 7, 8 z diagramu).
-        # Zakładamy, że find_lhs już zweryfikował ich istnienie
-        m1 = self._find_midpoint_between(graph, c1, c2)  # między 1 a 2
-        m2 = self._find_midpoint_between(graph, c2, c3)  # między 2 a 3
-        m3 = self._find_midpoint_between(graph, c3, c4)  # między 3 a 4
-        m4 = self._find_midpoint_between(graph, c4, c1)  # między 4 a 1
-
-        # 3. Obliczamy współrzędne nowego centrum (węzeł 9 - nieoznaczony, środek krzyża)
-        center_x = (c1.x + c2.x + c3.x + c4.x) / 4.0
-        center_y = (c1.y + c2.y + c3.y + c4.y) / 4.0
-
-        center_uid = f"{match_node.uid}_center"
-        center_vertex = Vertex(uid=center_uid, x=center_x, y=center_y, hanging=False)
-        graph.add_vertex(center_vertex)
-
-        # 4. Usuwamy stary element Q (tylko hyperedge, wierzchołki zostają)
-        graph.remove_node(match_node.uid)
-
-        # 5. Tworzymy 4 nowe elementy Q (ćwiartki) z R=0
-        # Nazewnictwo ID: Q_old_0, Q_old_1...
-        new_q_ids = [f"{match_node.uid}_sub_Q{i}" for i in range(4)]
-
-        # Definiujemy grupy wierzchołków dla nowych Q (zgodnie z ruchem wskazówek zegara lub CCW)
-        # Ważne, aby zachować spójność topologiczną.
-        # Q1: c1 - m1 - center - m4
-        q1_nodes = [c1, m1, center_vertex, m4]
-        # Q2: m1 - c2 - m2 - center
-        q2_nodes = [m1, c2, m2, center_vertex]
-        # Q3: center - m2 - c3 - m3
-        q3_nodes = [center_vertex, m2, c3, m3]
-        # Q4: m4 - center - m3 - c4
-        q4_nodes = [m4, center_vertex, m3, c4]
-
-        quads_nodes = [q1_nodes, q2_nodes, q3_nodes, q4_nodes]
-
-        for q_id, nodes in zip(new_q_ids, quads_nodes):
-            new_q = Hyperedge(uid=q_id, label='Q', r=0, b=0)  # R=0 po podziale
-            graph.add_hyperedge(new_q)
-            for node in nodes:
-                graph.connect(q_id, node.uid)
-
-        # 6. Tworzymy 4 nowe krawędzie wewnętrzne E (R=0, B=0)
-        # Łączą one węzły środkowe (m1..m4) z nowym centrum
-        midpoints = [m1, m2, m3, m4]
-        for i, mid_node in enumerate(midpoints):
-            e_id = f"{match_node.uid}_inner_E{i}"
-            new_e = Hyperedge(uid=e_id, label='E', r=0, b=0)  # B=0 bo wewnętrzne
-            graph.add_hyperedge(new_e)
-            graph.connect(e_id, mid_node.uid)
-            graph.connect(e_id, center_vertex.uid)
-
-        print(f"-> P5: Podzielono Q {match_node.uid} na 4 mniejsze i dodano centrum {center_uid}.")
-
-    # --- Metody pomocnicze ---
-
-    def _sort_vertices_counter_clockwise(self, vertices: List[Vertex]) -> List[Vertex]:
-        """Sortuje wierzchołki geometrycznie wokół ich środka ciężkości."""
-        if not vertices:
-            return []
-
-        # Środek ciężkości
-        cx = sum(v.x for v in vertices) / len(vertices)
-        cy = sum(v.y for v in vertices) / len(vertices)
-
-        def angle_from_center(v):
-            return math.atan2(v.y - cy, v.x - cx)
-
-        return sorted(vertices, key=angle_from_center)
-
-    def _find_midpoint_between(self, graph: Graph, v1: Vertex, v2: Vertex) -> Optional[Vertex]:
-        """
-        Znajduje wierzchołek leżący "pomiędzy" v1 i v2.
-        Definicja "pomiędzy": Istnieje ścieżka v1 --(E)-- v_mid --(E)-- v2.
-        """
-        # Pobieramy krawędzie (Hyperedges typu E) podłączone do v1
-        v1_edges = [he for he in graph.get_vertex_hyperedges(v1.uid) if he.label == 'E']
-
-        # Pobieramy krawędzie podłączone do v2
-        v2_edges = [he for he in graph.get_vertex_hyperedges(v2.uid) if he.label == 'E']
-
-        # Szukamy wspólnego sąsiada (wierzchołka) dla tych krawędzi
-        for e1 in v1_edges:
-            neighbors_e1 = graph.get_hyperedge_vertices(e1.uid)
-            for potential_mid in neighbors_e1:
-                # POPRAWKA: Punkt środkowy nie może być żadnym z narożników!
-                if potential_mid == v1 or potential_mid == v2:
-                    continue
-
-                # Dodatkowo możemy sprawdzić, czy jest wiszący (opcjonalne, ale zgodne z teorią)
-                if not potential_mid.hanging:
-                    continue
-
-                # Sprawdzamy, czy ten potential_mid łączy się z v2 przez inną krawędź
-                for e2 in v2_edges:
-                    if potential_mid in graph.get_hyperedge_vertices(e2.uid):
-                        # Znaleziono strukturę V1-E-Mid-E-V2
-                        return potential_mid
-
-        return None
+    ARITY = 4
+    LHS_LABEL = "Q"
@@ -3,6 +3,7 @@ from typing import List, Optional, Any
 from ..graph import Graph
 from ..elements import Hyperedge
 from .production import Production
+from .. import tracing
 
 
 class ProductionP6(Production):
@@ -13,36 +14,24 @@ class ProductionP6(Production):
     Preconditions: R=0, Refinement Criterion (RFC) met. (RFC assumed true)
     """
 
+    LHS_LABEL = "P"
+
     def find_lhs(
         self, graph: Graph, target_id: Optional[str | int] = None
     ) -> List[Hyperedge]:
         candidates: List[Hyperedge] = []
+        trace = tracing.active()
 
-        # Iterate over all nodes in the graph
-        for _, data in graph._nx_graph.nodes(data=True):
-            hyperedge_obj = data.get("data")
-            
-            # 1. Must be a Hyperedge
-            if not isinstance(hyperedge_obj, Hyperedge):
-                continue
-                
-            # Optional target filter
-            if target_id is not None and hyperedge_obj.uid != target_id:
-                continue
-
-            # 2. Label must be 'P' (Pentagon)
-            if hyperedge_obj.label != "P":
-                continue
-
-            # 3. Must be unrefined (R=0)
-            if hyperedge_obj.r != 0:
-                continue
-
+        # 1-3. Only unrefined (R=0) hyperedges labeled 'P' (Pentagon),
+        # taken straight from the graph's label index
+        for hyperedge_obj in graph.find_hyperedges(label="P", r=0):
             # 4. Check connectivity (Must be a pentagon - 5 vertices)
             # This is technically implicit in label 'P', but good to verify structure.
             vertices = graph.get_hyperedge_vertices(hyperedge_obj.uid)
             if len(vertices) != 5:
                 # Malformed P hyperedge
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
                 continue
 
             # RFC check is assumed True for now (or passed via kwargs if implemented)
@@ -2,6 +2,7 @@ from typing import List, Union
 from ..graph import Graph
 from ..elements import Hyperedge
 from .production import Production
+from .. import tracing
 
 
 class ProductionP7(Production):
@@ -10,30 +11,18 @@ class ProductionP7(Production):
     Dla elementu P z R=1, ustawia R=1 wszystkim jego krawędziom (E).
     """
 
+    LHS_LABEL = "P"
+
     def find_lhs(self, graph: Graph, target_id: Union[int, str] = None) -> List[Hyperedge]:
         candidates = []
-        for node_id, data in graph.nx_graph.nodes(data=True):
-            he = data.get("data")
-
-            # 1. Musi to być Hyperedge
-            if not isinstance(he, Hyperedge):
-                continue
-
-            # 2. Opcjonalne filtrowanie po ID
-            if target_id is not None and he.uid != target_id:
-                continue
-
-            # 3. Musi mieć etykietę 'P' (Pentagon)
-            if he.label != "P":
-                continue
-
-            # 4. Musi mieć R=1 (oznaczony do podziału)
-            if he.r != 1:
-                continue
-
+        trace = tracing.active()
+        # 1-4. Hyperedge z etykietą 'P' (Pentagon) i R=1 (oznaczony do podziału)
+        for he in graph.find_hyperedges(label="P", r=1):
             # 5. Sprawdzenie topologii: Musi mieć 5 wierzchołków
             vertices = graph.get_hyperedge_vertices(he.uid)
             if len(vertices) != 5:
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
                 continue
 
             # Sprawdzamy czy wierzchołki są połączone krawędziami typu E
@@ -42,12 +31,21 @@ class ProductionP7(Production):
 
             # Wymagamy, aby element był otoczony krawędziami (powinien mieć 5 krawędzi)
             if len(edges_found) != 5:
+                if trace is not None:
+                    trace.reject(self, "edge_count")
                 continue
 
             candidates.append(he)
 
         return candidates
 
+    def footprint(self, graph: Graph, match: Hyperedge):
+        # RHS zmienia R krawędzi elementu - one też są zapisywane
+        reads, writes = super().footprint(graph, match)
+        vertices = graph.get_hyperedge_vertices(match.uid)
+        writes |= {edge.uid for edge in self._get_boundary_edges(graph, vertices)}
+        return reads, writes
+
     def apply_rhs(self, graph: Graph, match_node: Hyperedge):
         vertices = graph.get_hyperedge_vertices(match_node.uid)
         edges_to_mark = self._get_boundary_edges(graph, vertices)
@@ -55,7 +53,6 @@ class ProductionP7(Production):
         for edge in edges_to_mark:
             if edge.r == 0:
                 graph.update_hyperedge(edge.uid, r=1)
-                print(f"-> P7: Oznaczono krawędź {edge.uid} (R=1).")
 
     def _get_boundary_edges(self, graph: Graph, vertices: list) -> List[Hyperedge]:
         """
@@ -70,12 +67,10 @@ class ProductionP7(Production):
             for j in range(i + 1, len(vertices)):
                 v1, v2 = vertices[i], vertices[j]
 
-                # Pobierz hiperkrawędzie między v1 a v2
-                common_edges = graph.get_hyperedges_between_vertices(v1.uid, v2.uid)
-
-                # Szukamy takich, które są typu 'E'
-                for ce in common_edges:
-                    if ce.label == 'E':
-                        found_edges.add(ce)
+                # Pobierz hiperkrawędzie typu 'E' między v1 a v2 (z indeksu par)
+                common_edges = graph.get_hyperedges_between_vertices(
+                    v1.uid, v2.uid, label='E'
+                )
+                found_edges.update(common_edges)
 
         return list(found_edges)
@@ -0,0 +1,165 @@
+from typing import List, Optional, Tuple, Union
+
+from ..elements import Hyperedge, Vertex
+from ..graph import Graph
+from .production import BatchStats, Production
+from .. import tracing
+
+# Plan podziału jednego elementu: (element, narożniki CCW, środki boków)
+SplitPlan = Tuple[Hyperedge, List[Vertex], List[Vertex]]
+
+
+class PolygonSplit(Production):
+    """
+    Podział elementu o ARITY narożnikach (etykieta LHS_LABEL, R=1) na ARITY
+    czworokątów Q wokół nowego wierzchołka w środku ciężkości - jeśli wszystkie
+    boki elementu są już podzielone. Wspólna implementacja P5 (Q, 4),
+    P8 (P, 5), P11 (Q, 6) i P14 (Q, 7); można też tworzyć ją bezpośrednio,
+    np. PolygonSplit(arity=8, label="S").
+
+    Narożniki c[0..n-1] są posortowane przeciwnie do ruchu wskazówek zegara,
+    m[i] to środek boku c[i]-c[i+1]. Nowy element Q nr i ma wierzchołki c[i],
+    m[i], centrum i m[i-1]; krawędź wewnętrzna E nr i łączy m[i] z centrum.
+    Pochodzenie: Q - dzieci 0..n-1, centrum - n, krawędzie E - n+1..2n.
+
+    Wszystkie dopasowania rundy można podzielić naraz (apply_batched): środki
+    ciężkości liczone są jednym zapytaniem wektorowym, nowe węzły trafiają do
+    grafu hurtowo. Kolejność narożników pochodzi z Graph.corner_cycles.
+    """
+
+    ARITY = 4
+    LHS_LABEL = "Q"
+    # Czy środek boku musi być wierzchołkiem wiszącym (P8 tego nie wymaga)
+    HANGING_MIDPOINTS = True
+    BATCH_APPLY = True
+
+    def __init__(
+        self,
+        arity: Optional[int] = None,
+        label: Optional[str] = None,
+        hanging_midpoints: Optional[bool] = None,
+    ):
+        if arity is not None:
+            if arity < 3:
+                raise ValueError(f"Element musi mieć co najmniej 3 narożniki (podano {arity}).")
+            self.ARITY = arity
+        if label is not None:
+            self.LHS_LABEL = label
+        if hanging_midpoints is not None:
+            self.HANGING_MIDPOINTS = hanging_midpoints
+
+    def find_lhs(self, graph: Graph, target_id: Union[int, str] = None) -> List[Hyperedge]:
+        candidates = graph.find_hyperedges(label=self.LHS_LABEL, r=1)
+        return [he for he, _, _ in self._plan(graph, candidates)]
+
+    def apply_rhs(self, graph: Graph, match: Hyperedge):
+        self._split(graph, self._plan(graph, [match]))
+
+    def apply_batched(self, graph: Graph, matches: List[Hyperedge]) -> BatchStats:
+        """
+        Dzieli wszystkie elementy naraz, w jednej transakcji. Podziały są
+        niezależne (każdy zapisuje tylko swój element), więc nie ma
+        ponownego sprawdzania - pomijane są tylko dopasowania już nieaktualne.
+        """
+        live = [he for he in matches if he.uid in graph]
+        plans = self._plan(graph, live)
+        self._split(graph, plans)
+        return BatchStats(
+            groups=1 if plans else 0, applied=len(plans), dropped=len(matches) - len(plans)
+        )
+
+    def _plan(self, graph: Graph, hyperedges: List[Hyperedge]) -> List[SplitPlan]:
+        """Elementy spełniające LHS wraz z posortowanymi narożnikami i środkami boków."""
+        trace = tracing.active()
+        n = self.ARITY
+        # Narożniki w kolejności przeciwnej do ruchu wskazówek zegara - z cyklu
+        # zapisanego w grafie przy tworzeniu elementu (bez sortowania)
+        cycles = graph.corner_cycles(he.uid for he in hyperedges)
+
+        plans: List[SplitPlan] = []
+        for he, cycle in zip(hyperedges, cycles):
+            if len(cycle) != n:
+                if trace is not None:
+                    trace.reject(self, "vertex_count")
+                continue
+            corners = [graph.get_vertex(uid) for uid in cycle]
+            midpoints = []
+            for i in range(n):
+                midpoint = self._find_midpoint_between(graph, corners[i], corners[(i + 1) % n])
+                if midpoint is None:
+                    break
+                midpoints.append(midpoint)
+            if len(midpoints) == n:
+                plans.append((he, corners, midpoints))
+            elif trace is not None:
+                trace.reject(self, "unbroken_edge")
+        return plans
+
+    def _split(self, graph: Graph, plans: List[SplitPlan]) -> None:
+        if not plans:
+            return
+        n = self.ARITY
+        corner_uids = [v.uid for _, corners, _ in plans for v in corners]
+        centers_xy = graph.coords[graph.vertex_indices(corner_uids).reshape(-1, n)].mean(axis=1)
+        parents = [graph.uid_index(he.uid) for he, _, _ in plans]
+
+        with graph.transaction():
+            centers = [
+                Vertex(uid=graph.ids.next_vertex_uid(), x=x, y=y, hanging=False)
+                for x, y in centers_xy.tolist()
+            ]
+            graph.add_vertices(centers, centers_xy)
+
+            items = []
+            lineage = []
+            for (he, corners, midpoints), center, parent in zip(plans, centers, parents):
+                graph.remove_node(he.uid)
+                lineage.append((center.uid, parent, n))
+                for i in range(n):
+                    q = Hyperedge(uid=graph.ids.next_hyperedge_uid("Q"), label="Q", r=0, b=0)
+                    vertices = (corners[i], midpoints[i], center, midpoints[i - 1])
+                    items.append((q, [v.uid for v in vertices]))
+                    lineage.append((q.uid, parent, i))
+                for i in range(n):
+                    # B=0 - krawędzie wewnętrzne
+                    e = Hyperedge(uid=graph.ids.next_hyperedge_uid("E"), label="E", r=0, b=0)
+                    items.append((e, (midpoints[i].uid, center.uid)))
+                    lineage.append((e.uid, parent, n + 1 + i))
+            # Wierzchołki nowych Q są podane przeciwnie do ruchu wskazówek zegara
+            graph.add_hyperedges(items, ordered=True)
+
+            for uid, parent, slot in lineage:
+                graph.record_lineage(uid, parent, slot)
+
+            # Środki znalezione bez rejestru (ścieżką krawędzi E) trafiają do niego
+            # przy podziale, tak jak w P2/P3/P4 - kolejne zapytania ich nie szukają
+            for _, corners, midpoints in plans:
+                for i in range(n):
+                    v1, v2 = corners[i].uid, corners[(i + 1) % n].uid
+                    midpoint = graph.get_midpoint(v1, v2)
+                    if midpoint is None or midpoint.uid != midpoints[i].uid:
+                        graph.register_midpoint(v1, v2, midpoints[i].uid)
+
+    def _find_midpoint_between(self, graph: Graph, v1: Vertex, v2: Vertex) -> Optional[Vertex]:
+        """
+        Znajduje wierzchołek leżący "pomiędzy" v1 i v2: istnieje ścieżka
+        v1 --(E)-- środek --(E)-- v2.
+        """
+        # Najpierw rejestr podzielonych krawędzi w grafie (O(1)), wypełniany przez P2/P3/P4
+        midpoint = graph.get_midpoint(v1.uid, v2.uid)
+        if midpoint is not None and (midpoint.hanging or not self.HANGING_MIDPOINTS):
+            return midpoint
+
+        for e1 in graph.get_vertex_hyperedges(v1.uid):
+            if e1.label != "E":
+                continue
+            for candidate in graph.get_hyperedge_vertices(e1.uid):
+                if candidate == v1 or candidate == v2:
+                    continue
+                if self.HANGING_MIDPOINTS and not candidate.hanging:
+                    continue
+                if graph.get_hyperedges_between_vertices(candidate.uid, v2.uid, label="E"):
+                    # Bez zapisu do rejestru - find_lhs nie zmienia grafu (robi to _split)
+                    return candidate
+
+        return None
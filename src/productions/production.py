@@ -1,15 +1,153 @@
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import List, Any
+from dataclasses import dataclass
+from typing import Callable, List, Any, Optional, Set, Tuple, Union
 
+from .. import profiling, tracing
+from ..elements import Hyperedge
+from ..events import touched_uids
 from ..graph import Graph
 
+NodeId = Union[int, str]
+Footprint = Tuple[Set[NodeId], Set[NodeId]]
+TargetId = Union[NodeId, List[NodeId], Tuple[NodeId, ...], Set[NodeId]]
+
+
+def _targeted(find_lhs: Callable[..., List[Any]]) -> Callable[..., List[Any]]:
+    """
+    Szybka ścieżka target_id dla find_lhs produkcji. Zamiast skanować wszystkie
+    hiperkrawędzie i porównywać uid z celem, zawęża źródło kandydatów
+    (Graph.find_hyperedges) do podanych uid przez Graph.candidate_scope - koszt
+    zależy od liczby celów, a nie od rozmiaru grafu. target_id można podać
+    pozycyjnie, jak w sygnaturach find_lhs produkcji (np. apply(graph, "Q1")).
+    """
+
+    @functools.wraps(find_lhs)
+    def wrapper(self, graph: Graph, target_id: Optional[TargetId] = None, **kwargs):
+        if target_id is None:
+            return find_lhs(self, graph, **kwargs)
+        if isinstance(target_id, (list, tuple, set, frozenset)):
+            targets = list(target_id)
+        else:
+            targets = [target_id]
+        with graph.candidate_scope(targets):
+            return find_lhs(self, graph, **kwargs)
+
+    return wrapper
+
+
+def _traced_find_lhs(find_lhs: Callable[..., List[Any]]) -> Callable[..., List[Any]]:
+    """Zlicza wywołania i dopasowania find_lhs w aktywnym Tracer (zob. src/tracing.py)."""
+
+    @functools.wraps(find_lhs)
+    def wrapper(self, graph: Graph, *args, **kwargs):
+        matches = find_lhs(self, graph, *args, **kwargs)
+        trace = tracing.active()
+        if trace is not None:
+            trace.matched(self, len(matches))
+        return matches
+
+    return wrapper
+
+
+def _traced_apply_rhs(apply_rhs: Callable[..., Any]) -> Callable[..., Any]:
+    """Mierzy czas apply_rhs, gdy śledzenie jest włączone."""
+
+    @functools.wraps(apply_rhs)
+    def wrapper(self, graph: Graph, match: Any):
+        trace = tracing.active()
+        if trace is None:
+            return apply_rhs(self, graph, match)
+        start = time.perf_counter()
+        try:
+            return apply_rhs(self, graph, match)
+        finally:
+            trace.rhs(self, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _traced_apply_batched(apply_batched: Callable[..., "BatchStats"]) -> Callable[..., "BatchStats"]:
+    """Jeden pomiar na apply_batched (liczba dopasowań i zastosowanych RHS, czas)."""
+
+    @functools.wraps(apply_batched)
+    def wrapper(self, graph: Graph, matches: List[Any]) -> "BatchStats":
+        trace = tracing.active()
+        if trace is None:
+            return apply_batched(self, graph, matches)
+        start = time.perf_counter()
+        stats = apply_batched(self, graph, matches)
+        trace.batch(self, len(matches), stats.applied, time.perf_counter() - start)
+        return stats
+
+    return wrapper
+
+
+def _profiled(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Mierzy metodę w Profiler zainstalowanym przez profiling() (zob.
+    src/profiling.py). Nazwa w raporcie pochodzi z klasy obiektu, bo podklasy
+    mogą dzielić implementację (np. PolygonSplit).
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = profiling.production_profiler()
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        name = f"{type(self).__name__}.{method.__name__}"
+        return profiler.call(name, "production", method, self, *args, **kwargs)
+
+    return wrapper
+
+
+@dataclass
+class BatchStats:
+    """Wynik Production.apply_batched."""
+
+    groups: int = 0  # liczba zbiorów niezależnych dopasowań
+    applied: int = 0  # zastosowane RHS
+    revalidated: int = 0  # dopasowania sprawdzone ponownie (find_lhs z target_id)
+    dropped: int = 0  # dopasowania unieważnione przez wcześniejsze RHS
+
 
 class Production(ABC):
-    def apply(self, graph: Graph, *args, **kwargs) -> Graph:
+    # Etykieta hiperkrawędzi, od której zaczyna się dopasowanie LHS (np. "Q" dla P5).
+    # Silnik worklisty (src/engine.py) sprawdza produkcję tylko dla węzłów o tej
+    # etykiecie; None oznacza dowolną hiperkrawędź.
+    LHS_LABEL: Optional[str] = None
+    # True: dopasowania jednej rundy są od siebie niezależne i silnik stosuje je
+    # wszystkie jednym apply_batched (np. podział elementów, zob. PolygonSplit)
+    BATCH_APPLY = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Każde find_lhs podklasy obsługuje target_id przez szybką ścieżkę, a przy
+        # włączonym śledzeniu (src/tracing.py) i profilowaniu (src/profiling.py)
+        # find_lhs, apply_rhs i apply_batched są mierzone
+        if "find_lhs" in cls.__dict__:
+            cls.find_lhs = _profiled(_traced_find_lhs(_targeted(cls.__dict__["find_lhs"])))
+        if "apply_rhs" in cls.__dict__:
+            cls.apply_rhs = _profiled(_traced_apply_rhs(cls.__dict__["apply_rhs"]))
+        if "apply_batched" in cls.__dict__:
+            cls.apply_batched = _profiled(_traced_apply_batched(cls.__dict__["apply_batched"]))
+
+    def apply(
+        self, graph: Graph, *args, batched: bool = False, atomic: bool = False, **kwargs
+    ) -> Graph:
         """
         Metoda szablonowa.
-        Przyjmuje *args i **kwargs, aby przekazać np. target_id do P0.
+        Przyjmuje *args i **kwargs, aby przekazać np. target_id do P0
+        (uid albo lista uid - sprawdzane są tylko te węzły).
+        batched=True stosuje dopasowania grupami niezależnych (apply_batched);
+        produkcje z BATCH_APPLY robią to zawsze.
+        atomic=True: całe zastosowanie w transakcji atomowej grafu - wyjątek
+        w którymkolwiek RHS cofa wszystkie zmiany tego wywołania.
         """
+        if atomic:
+            with graph.transaction(atomic=True):
+                return self.apply(graph, *args, batched=batched, **kwargs)
 
         # 1. Znajdź wszystkie wystąpienia lewej strony (LHS)
         matches = self.find_lhs(graph, *args, **kwargs)
@@ -17,20 +155,104 @@ class Production(ABC):
         if not matches:
             return graph
 
-        print(
-            f"[{self.__class__.__name__}] Znaleziono {len(matches)} dopasowań. Aplikuję RHS."
-        )
-
         # 2. Dla każdego dopasowania zastosuj prawą stronę (RHS)
+        if batched or self.BATCH_APPLY:
+            self.apply_batched(graph, matches)
+            return graph
+
         for match in matches:
             self.apply_rhs(graph, match)
 
         return graph
 
+    @_profiled
+    @_traced_apply_batched
+    def apply_batched(self, graph: Graph, matches: List[Any]) -> BatchStats:
+        """
+        Dzieli dopasowania na zbiory niezależne (żadne nie zapisuje węzła, który
+        inne z tego samego zbioru czyta lub zapisuje - zob. footprint) i stosuje
+        każdy zbiór w jednej transakcji grafu. Dopasowanie z kolejnego zbioru jest
+        sprawdzane ponownie (find_lhs z target_id) tylko wtedy, gdy wcześniejsze
+        RHS dotknęły któregoś z czytanych przez nie węzłów.
+        """
+        stats = BatchStats()
+        groups: List[List[Tuple[Any, Set[NodeId], Set[NodeId]]]] = []
+        group_reads: List[Set[NodeId]] = []
+        group_writes: List[Set[NodeId]] = []
+        for match in matches:
+            reads, writes = self.footprint(graph, match)
+            for i in range(len(groups)):
+                if writes & (group_reads[i] | group_writes[i]) or group_writes[i] & reads:
+                    continue
+                groups[i].append((match, reads, writes))
+                group_reads[i] |= reads
+                group_writes[i] |= writes
+                break
+            else:
+                groups.append([(match, reads, writes)])
+                group_reads.append(set(reads))
+                group_writes.append(set(writes))
+        stats.groups = len(groups)
+
+        touched: Set[NodeId] = set()
+
+        def collect(event):
+            touched.update(touched_uids(event))
+
+        graph.subscribe(collect)
+        try:
+            for group in groups:
+                with graph.transaction():
+                    for match, reads, _ in group:
+                        if touched & reads:
+                            stats.revalidated += 1
+                            match = self._revalidate(graph, match)
+                            if match is None:
+                                stats.dropped += 1
+                                continue
+                        self.apply_rhs(graph, match)
+                        stats.applied += 1
+        finally:
+            graph.unsubscribe(collect)
+
+        return stats
+
+    def match_node(self, match: Any) -> Hyperedge:
+        """Hiperkrawędź, od której zaczyna się dopasowanie (dla dopasowań-słowników nadpisz)."""
+        return match
+
+    def footprint(self, graph: Graph, match: Any) -> Footprint:
+        """
+        Zwraca (czytane, zapisywane) uid węzłów dopasowania. Domyślnie RHS zapisuje
+        (zmienia lub usuwa) tylko węzeł dopasowania, a LHS czyta jego wierzchołki
+        i krawędzie E incydentne z nimi. Produkcje zmieniające inne istniejące
+        węzły nadpisują tę metodę. Nowe węzły i połączenia nie są konfliktem.
+        """
+        root = self.match_node(match)
+        vertices = graph.get_hyperedge_vertices(root.uid)
+        reads = {root.uid}
+        for v in vertices:
+            reads.add(v.uid)
+            reads.update(
+                he.uid for he in graph.get_vertex_hyperedges(v.uid) if he.label == "E"
+            )
+        return reads, {root.uid}
+
+    def _revalidate(self, graph: Graph, match: Any) -> Optional[Any]:
+        root_uid = self.match_node(match).uid
+        if root_uid not in graph:
+            return None
+        for fresh in self.find_lhs(graph, target_id=root_uid):
+            if self.match_node(fresh).uid == root_uid:
+                return fresh
+        return None
+
     @abstractmethod
     def find_lhs(self, graph: Graph, *args, **kwargs) -> List[Any]:
         """
-        Zwraca listę dopasowań.
+        Zwraca listę dopasowań. Argument target_id (uid lub lista uid) obsługuje
+        klasa bazowa (zob. _targeted) - implementacja skanuje find_hyperedges,
+        które wtedy zwraca tylko cele.
         """
         pass
 
@@ -0,0 +1,224 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO, Tuple, Union
+
+import numpy as np
+
+from .graph import Graph
+
+# Gorące metody Graph mierzone domyślnie
+GRAPH_METHODS: Tuple[str, ...] = (
+    "get_neighbors",
+    "get_hyperedge_vertices",
+    "get_vertex_hyperedges",
+    "get_hyperedges_between_vertices",
+)
+
+# Aktywny Profiler (None = profilowanie wyłączone)
+_active: Optional["Profiler"] = None
+# Profiler mierzący produkcje - ustawiany przez install() przy productions=True.
+# Metody produkcji są opakowane raz, przy tworzeniu klasy (zob.
+# Production.__init_subclass__), i sprawdzają go przy każdym wywołaniu, więc
+# mierzone są także produkcje zdefiniowane już po wejściu do bloku.
+_productions: Optional["Profiler"] = None
+
+
+def active() -> Optional["Profiler"]:
+    """Zwraca aktywny Profiler albo None."""
+    return _active
+
+
+def production_profiler() -> Optional["Profiler"]:
+    """Zwraca Profiler mierzący teraz metody produkcji albo None."""
+    return _productions
+
+
+@contextmanager
+def profiling(profiler: Optional["Profiler"] = None):
+    """
+    Mierzy find_lhs / apply_rhs produkcji i gorące metody Graph w bloku with:
+
+        with profiling() as prof:
+            RefinementEngine().run(graph)
+        print(prof.table())
+        prof.dump_chrome_trace("trace.json")  # chrome://tracing, Perfetto, speedscope
+    """
+    global _active
+    previous = _active
+    _active = profiler if profiler is not None else Profiler()
+    _active.install()
+    try:
+        yield _active
+    finally:
+        _active.uninstall()
+        _active = previous
+
+
+@dataclass
+class FunctionStats:
+    """Czasy jednej mierzonej funkcji (w sekundach)."""
+
+    calls: int = 0
+    total: float = 0.0  # czas łączny (z wywołaniami mierzonych funkcji w środku)
+    self_time: float = 0.0  # czas łączny bez mierzonych wywołań zagnieżdżonych
+    durations: List[float] = field(default_factory=list)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.durations, q)) if self.durations else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_s": self.total,
+            "self_s": self.self_time,
+            "p50_s": self.percentile(50),
+            "p99_s": self.percentile(99),
+        }
+
+
+class Profiler:
+    """
+    Profiler produkcji i zapytań grafu. Na czas install() (zob. profiling())
+    podmienia wybrane metody Graph na wersje mierzące czas i rejestruje się
+    jako production_profiler(), przez który mierzone są find_lhs / apply_rhs /
+    apply_batched wszystkich produkcji; uninstall() przywraca oryginały. Poza
+    profilowaniem metody produkcji kosztuje to jedno sprawdzenie na wywołanie.
+
+    Dla każdej funkcji zapisuje liczbę wywołań, czas łączny, czas własny (bez
+    zagnieżdżonych mierzonych wywołań) i rozkład czasów (p50/p99). Przy
+    events=True zapamiętuje też każde wywołanie dla dump_chrome_trace.
+    """
+
+    def __init__(
+        self,
+        graph_methods: Sequence[str] = GRAPH_METHODS,
+        productions: bool = True,
+        events: bool = True,
+    ):
+        for name in graph_methods:
+            if not callable(getattr(Graph, name, None)):
+                raise ValueError(f"Graph nie ma metody {name}.")
+        self.graph_methods = tuple(graph_methods)
+        self.productions = productions
+        self.record_events = events
+        self.stats: Dict[str, FunctionStats] = {}
+        self.events: List[Tuple[str, str, float, float]] = []  # (nazwa, kategoria, start, czas)
+        self._stack: List[List[float]] = []  # czas mierzonych wywołań zagnieżdżonych
+        self._origin = time.perf_counter()
+        self._patched: List[Tuple[type, str, Callable]] = []
+
+    def _stats(self, name: str) -> FunctionStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = FunctionStats()
+        return stats
+
+    def call(self, name: str, category: str, fn: Callable, *args, **kwargs) -> Any:
+        """Wywołuje fn(*args, **kwargs), zapisując czas pod nazwą name."""
+        stack = self._stack
+        children = [0.0]
+        stack.append(children)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            stats = self._stats(name)
+            stats.calls += 1
+            stats.total += elapsed
+            stats.self_time += elapsed - children[0]
+            stats.durations.append(elapsed)
+            if self.record_events:
+                self.events.append((name, category, start, elapsed))
+
+    def _patch(self, cls: type, attr: str, name: str, category: str) -> None:
+        original = cls.__dict__[attr]
+        self._patched.append((cls, attr, original))
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            return self.call(name, category, original, *args, **kwargs)
+
+        setattr(cls, attr, wrapper)
+
+    def install(self) -> None:
+        global _productions
+        if self._patched or _productions is self:
+            raise ValueError("Profiler jest już zainstalowany.")
+        if self.productions and _productions is not None:
+            raise ValueError("Inny Profiler mierzy już produkcje.")
+        for attr in self.graph_methods:
+            self._patch(Graph, attr, f"Graph.{attr}", "graph")
+        if self.productions:
+            _productions = self
+
+    def uninstall(self) -> None:
+        global _productions
+        for cls, attr, original in reversed(self._patched):
+            setattr(cls, attr, original)
+        self._patched.clear()
+        if _productions is self:
+            _productions = None
+
+    def reset(self) -> None:
+        for stats in self.stats.values():
+            stats.calls, stats.total, stats.self_time = 0, 0.0, 0.0
+            stats.durations.clear()
+        self.events.clear()
+        self._origin = time.perf_counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            name: stats.to_dict()
+            for name, stats in sorted(self.stats.items())
+            if stats.calls
+        }
+
+    def table(self, sort: str = "self_s", limit: Optional[int] = None) -> str:
+        """Tabela tekstowa posortowana malejąco po kolumnie sort (np. "total_s", "calls")."""
+        rows = sorted(self.to_dict().items(), key=lambda item: item[1][sort], reverse=True)
+        if limit is not None:
+            rows = rows[:limit]
+        width = max([len("funkcja")] + [len(name) for name, _ in rows])
+        lines = [
+            f"{'funkcja':<{width}}{'wywołania':>11}{'łącznie [ms]':>14}"
+            f"{'własny [ms]':>13}{'p50 [µs]':>11}{'p99 [µs]':>11}"
+        ]
+        for name, row in rows:
+            lines.append(
+                f"{name:<{width}}{row['calls']:>11}{row['total_s'] * 1e3:>14.2f}"
+                f"{row['self_s'] * 1e3:>13.2f}{row['p50_s'] * 1e6:>11.1f}{row['p99_s'] * 1e6:>11.1f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Zdarzenia w formacie Chrome Trace Event (zdarzenia "X", czasy w µs)."""
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": elapsed * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                }
+                for name, category, start, elapsed in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def dump_chrome_trace(self, target: Union[str, TextIO]) -> None:
+        """Zapisuje chrome_trace() do pliku (ścieżka) lub otwartego strumienia."""
+        if isinstance(target, str):
+            with open(target, "w", encoding="utf-8") as f:
+                json.dump(self.chrome_trace(), f)
+        else:
+            json.dump(self.chrome_trace(), target)
@@ -0,0 +1,133 @@
+import json
+import os
+import struct
+import sys
+from typing import Dict, Tuple, Union
+
+import numpy as np
+
+from .graph import Graph
+from .ids import VERTEX_NAMESPACE
+from .packed import PACKED_DTYPES, PackedGraph
+from .storage import BACKEND_NETWORKX
+
+PathLike = Union[str, os.PathLike]
+
+# Plik: MAGIC, nagłówek stałej długości (wersja, długość nagłówka JSON),
+# nagłówek JSON i - od przesunięcia wyrównanego do 8 bajtów - tablice
+# PackedGraph w układzie PackedGraph.layout()
+MAGIC = b"GGMESH\x00\x00"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sII")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // 8) * 8
+
+
+def _encode(graph: Graph) -> Tuple[bytes, PackedGraph, Dict, int]:
+    """Prefiks z nagłówkiem (wyrównany do 8 bajtów), tablice, ich układ i rozmiar."""
+    packed = PackedGraph.from_graph(graph)
+    layout, size = packed.layout()
+    header = json.dumps(
+        {
+            "byteorder": sys.byteorder,
+            "labels": packed.labels,
+            "layout": {name: [offset, list(shape)] for name, (offset, shape) in layout.items()},
+            "size": size,
+            "counters": graph.ids.counters,
+        }
+    ).encode()
+    prefix = _PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)) + header
+    prefix += bytes(_align(len(prefix)) - len(prefix))
+    return prefix, packed, layout, size
+
+
+def save_graph(graph: Graph, path: PathLike) -> int:
+    """
+    Zapisuje graf w formacie binarnym: tablice PackedGraph (współrzędne,
+    etykiety i flagi R/B, sąsiedztwo CSR, tablica uid, rejestr środków
+    krawędzi) oraz liczniki identyfikatorów. Tablice trafiają do pliku
+    bezpośrednio przez mapowanie pamięci. Pochodzenie elementów (lineage),
+    rejestr enable_vertex_dedup ani pamięć podręczna cykli narożników nie są
+    zapisywane. Zwraca rozmiar pliku w bajtach.
+    """
+    prefix, packed, layout, size = _encode(graph)
+    total = len(prefix) + size
+    mm = np.memmap(path, dtype=np.uint8, mode="w+", shape=(total,))
+    try:
+        mm[: len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+        packed.write_into(mm[len(prefix) :], layout)
+        mm.flush()
+    finally:
+        del mm
+    return total
+
+
+def graph_to_bytes(graph: Graph) -> bytes:
+    """Zawartość pliku save_graph jako bajty (np. klatka kluczowa w src/changelog.py)."""
+    prefix, packed, layout, size = _encode(graph)
+    buffer = bytearray(len(prefix) + size)
+    buffer[: len(prefix)] = prefix
+    packed.write_into(memoryview(buffer)[len(prefix) :], layout)
+    return bytes(buffer)
+
+
+def load_packed(path: PathLike) -> PackedGraph:
+    """
+    Mapuje plik zapisany przez save_graph do pamięci i zwraca PackedGraph,
+    którego tablice są widokami (tylko do odczytu) na plik - bez kopiowania
+    i bez wczytywania całego pliku.
+    """
+    return _decode(np.memmap(path, dtype=np.uint8, mode="r"), path)[0]
+
+
+def _decode(buffer, source) -> Tuple[PackedGraph, Dict[str, int]]:
+    """Tablice (widoki na buffer) i liczniki z zawartości pliku grafu."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if data.shape[0] < _PREFIX.size:
+        raise ValueError(f"Plik {source} jest za krótki na plik grafu.")
+    magic, version, header_size = _PREFIX.unpack(data[: _PREFIX.size].tobytes())
+    if magic != MAGIC:
+        raise ValueError(f"Plik {source} nie jest plikiem grafu (zła sygnatura).")
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f"Nieobsługiwana wersja formatu grafu: {version} (obsługiwana: {FORMAT_VERSION})."
+        )
+    header = json.loads(data[_PREFIX.size : _PREFIX.size + header_size].tobytes())
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError(
+            f"Plik {source} zapisano z kolejnością bajtów {header['byteorder']}, "
+            f"a ta maszyna używa {sys.byteorder}."
+        )
+    layout = {name: (offset, tuple(shape)) for name, (offset, shape) in header["layout"].items()}
+    if set(layout) != set(PACKED_DTYPES):
+        raise ValueError(f"Plik {source} ma niezgodny zestaw tablic grafu.")
+    data_start = _align(_PREFIX.size + header_size)
+    if data.shape[0] < data_start + header["size"]:
+        raise ValueError(f"Plik {source} jest ucięty.")
+
+    packed = PackedGraph.from_buffer(data[data_start:], layout, header["labels"])
+    return packed, header["counters"]
+
+
+def _build(packed: PackedGraph, counters: Dict[str, int], backend: str) -> Graph:
+    graph = packed.to_graph(backend=backend)
+    for namespace, value in counters.items():
+        graph.ids.observe(value if namespace == VERTEX_NAMESPACE else f"{namespace}{value}")
+    return graph
+
+
+def load_graph(path: PathLike, backend: str = BACKEND_NETWORKX) -> Graph:
+    """
+    Wczytuje graf zapisany przez save_graph: tablice są mapowane z pliku
+    (load_packed), a graf budowany zbiorczo (PackedGraph.to_graph). Kolejność
+    węzłów i liczniki identyfikatorów są takie jak w zapisanym grafie, więc
+    kolejne produkcje nadają te same uid co na grafie oryginalnym.
+    """
+    return _build(*_decode(np.memmap(path, dtype=np.uint8, mode="r"), path), backend)
+
+
+def graph_from_bytes(data: bytes, backend: str = BACKEND_NETWORKX) -> Graph:
+    """Odwrotność graph_to_bytes."""
+    return _build(*_decode(data, "(bajty)"), backend)
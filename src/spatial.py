@@ -0,0 +1,287 @@
+import contextlib
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .elements import Hyperedge, Vertex
+from .events import GraphEvent, NodeRemoved, touched_uids
+from .graph import Graph
+
+NodeId = Union[int, str]
+Cell = Tuple[int, int]
+BBox = Tuple[float, float, float, float]  # xmin, ymin, xmax, ymax
+
+
+class SpatialIndex:
+    """
+    Indeks przestrzenny grafu na jednorodnej siatce komórek: wierzchołki po
+    współrzędnych, elementy (hiperkrawędzie inne niż E) po prostokątach
+    otaczających ich wierzchołki. Zapytania (zakres, najbliższy wierzchołek,
+    element zawierający punkt) sprawdzają tylko komórki w pobliżu - średnio
+    stały koszt zamiast pełnego skanu grafu.
+
+    Indeks śledzi zdarzenia grafu (subscribe): add_vertex / update_vertex /
+    remove_node / connect, więc także elementy tworzone przez produkcje.
+    Zmienione węzły są tylko zapamiętywane, a wpisy odświeżane przy
+    najbliższym zapytaniu. Zmiany wewnątrz otwartej transakcji są widoczne
+    dopiero po jej zakończeniu; bezpośredni zapis v.x / v.y (bez
+    update_vertex) nie jest śledzony. Po kilkukrotnym wzroście liczby
+    wierzchołków siatka jest budowana od nowa z mniejszymi komórkami.
+    Używać jako menedżera kontekstu albo wywołać close().
+    """
+
+    # Przebudowa siatki, gdy liczba wierzchołków wzrośnie tyle razy od ostatniej budowy
+    REBUILD_GROWTH = 4
+
+    def __init__(self, graph: Graph, cell_size: Optional[float] = None):
+        if cell_size is not None and cell_size <= 0:
+            raise ValueError(f"Rozmiar komórki musi być dodatni (podano {cell_size}).")
+        self.graph = graph
+        self._fixed_cell_size = cell_size
+        self._dirty: Set[NodeId] = set()
+        graph.subscribe(self._on_graph_event)
+        self.rebuild()
+
+    def __enter__(self) -> "SpatialIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Przestaje śledzić graf."""
+        with contextlib.suppress(ValueError):
+            self.graph.unsubscribe(self._on_graph_event)
+
+    def _on_graph_event(self, event: GraphEvent) -> None:
+        self._dirty.update(touched_uids(event))
+        if isinstance(event, NodeRemoved):
+            self._dirty.add(event.uid)
+
+    # --- budowa i odświeżanie ---
+
+    def rebuild(self, cell_size: Optional[float] = None) -> None:
+        """Buduje indeks od nowa (cell_size=None: rozmiar dobrany do grafu)."""
+        graph = self.graph
+        if cell_size is not None:
+            self._fixed_cell_size = cell_size
+        self.cell_size = self._fixed_cell_size or self._auto_cell_size()
+        self._vertex_cells: Dict[Cell, Set[NodeId]] = {}
+        self._vertex_cell: Dict[NodeId, Cell] = {}
+        self._element_cells: Dict[Cell, Set[NodeId]] = {}
+        self._element_bbox: Dict[NodeId, BBox] = {}
+        # Zakres komórek, w których bywały wierzchołki (tylko rośnie do przebudowy)
+        self._bounds = (math.inf, math.inf, -math.inf, -math.inf)
+        self._dirty.clear()
+
+        cells = np.floor(graph.coords / self.cell_size).astype(np.int64).tolist()
+        for i, cell in enumerate(cells):
+            self._insert_vertex(graph.vertex_at_index(i).uid, (cell[0], cell[1]))
+        for h in graph.find_hyperedges():
+            if h.label != "E":
+                self._insert_element(h.uid)
+        self._built_size = max(len(self._vertex_cell), 1)
+
+    def _auto_cell_size(self) -> float:
+        """Mediana rozmiaru elementu, a bez elementów - ok. jeden wierzchołek na komórkę."""
+        graph = self.graph
+        sizes = []
+        for h in graph.find_hyperedges():
+            if h.label == "E":
+                continue
+            bbox = self._bbox(h.uid)
+            if bbox is not None:
+                sizes.append(max(bbox[2] - bbox[0], bbox[3] - bbox[1]))
+        sizes = [s for s in sizes if s > 0]
+        if sizes:
+            return float(np.median(sizes))
+        xy = graph.coords
+        if len(xy) > 1:
+            extent = float((xy.max(axis=0) - xy.min(axis=0)).max())
+            if extent > 0:
+                return extent / math.sqrt(len(xy))
+        return 1.0
+
+    def _flush(self) -> None:
+        if not self._dirty:
+            return
+        graph = self.graph
+        storage = graph._storage
+        dirty, self._dirty = self._dirty, set()
+        elements: Set[NodeId] = set()
+        for uid in dirty:
+            node = storage.get(uid) if uid in storage else None
+            if uid in self._vertex_cell or isinstance(node, Vertex):
+                self._remove_vertex(uid)
+                if isinstance(node, Vertex):
+                    self._insert_vertex(uid, self._cell(node.x, node.y))
+                    # Przesunięcie wierzchołka zmienia prostokąty jego elementów
+                    elements.update(
+                        n for n in storage.neighbors(uid) if isinstance(storage.get(n), Hyperedge)
+                    )
+            else:
+                elements.add(uid)
+        for uid in elements:
+            self._remove_element(uid)
+            if uid in storage:
+                node = storage.get(uid)
+                if isinstance(node, Hyperedge) and node.label != "E":
+                    self._insert_element(uid)
+
+        if len(self._vertex_cell) > self.REBUILD_GROWTH * self._built_size:
+            self.rebuild()
+
+    def _cell(self, x: float, y: float) -> Cell:
+        size = self.cell_size
+        return math.floor(x / size), math.floor(y / size)
+
+    def _cells(self, xmin: float, ymin: float, xmax: float, ymax: float) -> Iterator[Cell]:
+        cx0, cy0 = self._cell(xmin, ymin)
+        cx1, cy1 = self._cell(xmax, ymax)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                yield cx, cy
+
+    def _insert_vertex(self, uid: NodeId, cell: Cell) -> None:
+        x0, y0, x1, y1 = self._bounds
+        self._bounds = (min(x0, cell[0]), min(y0, cell[1]), max(x1, cell[0]), max(y1, cell[1]))
+        self._vertex_cell[uid] = cell
+        self._vertex_cells.setdefault(cell, set()).add(uid)
+
+    def _remove_vertex(self, uid: NodeId) -> None:
+        cell = self._vertex_cell.pop(uid, None)
+        if cell is not None:
+            bucket = self._vertex_cells[cell]
+            bucket.discard(uid)
+            if not bucket:
+                del self._vertex_cells[cell]
+
+    def _bbox(self, uid: NodeId) -> Optional[BBox]:
+        graph = self.graph
+        vertex_ids = graph._hyperedge_vertex_ids(uid)
+        if not vertex_ids:
+            return None
+        xy = graph.coords[graph.vertex_indices(vertex_ids)]
+        (xmin, ymin), (xmax, ymax) = xy.min(axis=0).tolist(), xy.max(axis=0).tolist()
+        return xmin, ymin, xmax, ymax
+
+    def _insert_element(self, uid: NodeId) -> None:
+        bbox = self._bbox(uid)
+        if bbox is None:
+            return
+        self._element_bbox[uid] = bbox
+        for cell in self._cells(*bbox):
+            self._element_cells.setdefault(cell, set()).add(uid)
+
+    def _remove_element(self, uid: NodeId) -> None:
+        bbox = self._element_bbox.pop(uid, None)
+        if bbox is None:
+            return
+        for cell in self._cells(*bbox):
+            bucket = self._element_cells.get(cell)
+            if bucket is not None:
+                bucket.discard(uid)
+                if not bucket:
+                    del self._element_cells[cell]
+
+    def _sorted(self, uids: Iterable[NodeId]) -> List[NodeId]:
+        return sorted(uids, key=self.graph.uid_index)
+
+    # --- zapytania ---
+
+    def vertices_in_box(self, xmin: float, ymin: float, xmax: float, ymax: float) -> List[Vertex]:
+        """Wierzchołki w prostokącie (z brzegiem), w kolejności dodania do grafu."""
+        self._flush()
+        graph = self.graph
+        found = []
+        for cell in self._cells(xmin, ymin, xmax, ymax):
+            for uid in self._vertex_cells.get(cell, ()):
+                v = graph.get_vertex(uid)
+                if xmin <= v.x <= xmax and ymin <= v.y <= ymax:
+                    found.append(uid)
+        return [graph.get_vertex(uid) for uid in self._sorted(found)]
+
+    def elements_in_box(self, xmin: float, ymin: float, xmax: float, ymax: float) -> List[Hyperedge]:
+        """Elementy, których prostokąt otaczający przecina prostokąt zapytania."""
+        self._flush()
+        found = set()
+        for cell in self._cells(xmin, ymin, xmax, ymax):
+            for uid in self._element_cells.get(cell, ()):
+                bx0, by0, bx1, by1 = self._element_bbox[uid]
+                if bx0 <= xmax and bx1 >= xmin and by0 <= ymax and by1 >= ymin:
+                    found.add(uid)
+        return [self.graph.get_hyperedge(uid) for uid in self._sorted(found)]
+
+    def nearest_vertex(self, x: float, y: float) -> Optional[Vertex]:
+        """
+        Najbliższy wierzchołek (przy równych odległościach - wcześniej dodany).
+        Przeszukuje kolejne pierścienie komórek wokół punktu.
+        """
+        self._flush()
+        if not self._vertex_cell:
+            return None
+        graph = self.graph
+        cx, cy = self._cell(x, y)
+        x0, y0, x1, y1 = self._bounds
+        max_ring = max(cx - x0, x1 - cx, cy - y0, y1 - cy, 0)
+        best: Optional[Tuple[float, int]] = None
+        best_uid = None
+        for ring in range(max_ring + 1):
+            for cell in self._ring(cx, cy, ring):
+                for uid in self._vertex_cells.get(cell, ()):
+                    v = graph.get_vertex(uid)
+                    key = ((v.x - x) ** 2 + (v.y - y) ** 2, graph.uid_index(uid))
+                    if best is None or key < best:
+                        best, best_uid = key, uid
+            # Wierzchołki z dalszych pierścieni są co najmniej ring * cell_size od punktu
+            if best is not None and best[0] < (ring * self.cell_size) ** 2:
+                break
+        return graph.get_vertex(best_uid)
+
+    def vertex_at(self, x: float, y: float, tolerance: float = 1e-9) -> Optional[Vertex]:
+        """Wierzchołek w punkcie (x, y) z dokładnością tolerance albo None."""
+        found = self.vertices_in_box(x - tolerance, y - tolerance, x + tolerance, y + tolerance)
+        found = [v for v in found if (v.x - x) ** 2 + (v.y - y) ** 2 <= tolerance * tolerance]
+        return found[0] if found else None
+
+    def elements_at(self, x: float, y: float) -> List[Hyperedge]:
+        """
+        Elementy zawierające punkt (z brzegiem - punkt na wspólnym boku należy
+        do obu elementów). Wielokąt elementu: Graph.corner_cycle.
+        """
+        self._flush()
+        graph = self.graph
+        found = []
+        for uid in self._element_cells.get(self._cell(x, y), ()):
+            bx0, by0, bx1, by1 = self._element_bbox[uid]
+            if not (bx0 <= x <= bx1 and by0 <= y <= by1):
+                continue
+            if self._contains(uid, x, y):
+                found.append(uid)
+        return [graph.get_hyperedge(uid) for uid in self._sorted(found)]
+
+    def locate(self, x: float, y: float) -> Optional[Hyperedge]:
+        """Element zawierający punkt (na wspólnym boku - wcześniej dodany) albo None."""
+        found = self.elements_at(x, y)
+        return found[0] if found else None
+
+    def _contains(self, uid: NodeId, x: float, y: float) -> bool:
+        polygon = self.graph.coords[self.graph.vertex_indices(self.graph.corner_cycle(uid))]
+        edges = np.roll(polygon, -1, axis=0) - polygon
+        to_point = np.array((x, y)) - polygon
+        cross = edges[:, 0] * to_point[:, 1] - edges[:, 1] * to_point[:, 0]
+        scale = np.abs(edges).max() if len(edges) else 1.0
+        return bool((cross >= -1e-12 * scale * scale).all())
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int) -> Iterator[Cell]:
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
@@ -0,0 +1,345 @@
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Set, Tuple, Union
+
+import networkx as nx
+
+from .elements import Vertex, Hyperedge
+
+NodeId = Union[int, str]
+Element = Union[Vertex, Hyperedge]
+
+BACKEND_NETWORKX = "networkx"
+BACKEND_SETS = "sets"
+
+
+class NetworkxStorage:
+    """
+    Przechowywanie grafu w nx.Graph (domyślne).
+    Obiekt trzymany jest w atrybucie `data`, a x/y/label/R/B są kopiowane
+    do atrybutów węzła, żeby funkcje networkx (np. wizualizacja) je widziały.
+    """
+
+    def __init__(self):
+        self.nx_graph = nx.Graph()
+
+    def __contains__(self, uid: NodeId) -> bool:
+        return uid in self.nx_graph
+
+    def __len__(self) -> int:
+        return self.nx_graph.number_of_nodes()
+
+    def add_node(self, obj: Element) -> None:
+        if isinstance(obj, Vertex):
+            self.nx_graph.add_node(obj.uid, type="vertex", data=obj, x=obj.x, y=obj.y)
+        else:
+            self.nx_graph.add_node(
+                obj.uid, type="hyperedge", label=obj.label, R=obj.r, B=obj.b, data=obj
+            )
+
+    def set_attrs(self, uid: NodeId, **attrs) -> None:
+        self.nx_graph.nodes[uid].update(attrs)
+
+    def get(self, uid: NodeId) -> Element:
+        return self.nx_graph.nodes[uid]["data"]
+
+    # Odczyt bez kopiowania obiektu (w OverlayStorage kopię do zapisu daje own)
+    peek = get
+
+    def remove_node(self, uid: NodeId) -> None:
+        self.nx_graph.remove_node(uid)
+
+    def add_edge(self, uid1: NodeId, uid2: NodeId) -> None:
+        self.nx_graph.add_edge(uid1, uid2)
+
+    def remove_edge(self, uid1: NodeId, uid2: NodeId) -> None:
+        self.nx_graph.remove_edge(uid1, uid2)
+
+    def has_edge(self, uid1: NodeId, uid2: NodeId) -> bool:
+        return self.nx_graph.has_edge(uid1, uid2)
+
+    def neighbors(self, uid: NodeId) -> Iterable[NodeId]:
+        return self.nx_graph.neighbors(uid)
+
+    def nodes(self) -> Iterator[Tuple[NodeId, Element]]:
+        for uid, data in self.nx_graph.nodes(data=True):
+            yield uid, data["data"]
+
+    def to_networkx(self) -> nx.Graph:
+        return self.nx_graph
+
+
+class SetStorage:
+    """
+    Lekkie przechowywanie grafu: słownik uid -> obiekt i listy sąsiedztwa.
+    Jedynym źródłem atrybutów są same obiekty Vertex/Hyperedge - nic nie jest
+    duplikowane. Zbiory sąsiadów to słowniki z wartościami None (uporządkowane
+    zbiory), dzięki czemu kolejność iteracji jest deterministyczna, jak w networkx.
+    """
+
+    def __init__(self):
+        self._objects: Dict[NodeId, Element] = {}
+        self._adj: Dict[NodeId, Dict[NodeId, None]] = {}
+
+    def __contains__(self, uid: NodeId) -> bool:
+        return uid in self._objects
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def add_node(self, obj: Element) -> None:
+        self._objects[obj.uid] = obj
+        self._adj.setdefault(obj.uid, {})
+
+    def set_attrs(self, uid: NodeId, **attrs) -> None:
+        # Atrybuty żyją wyłącznie w obiektach - nie ma czego synchronizować
+        pass
+
+    def get(self, uid: NodeId) -> Element:
+        return self._objects[uid]
+
+    peek = get
+
+    def remove_node(self, uid: NodeId) -> None:
+        for neighbor_id in self._adj.pop(uid):
+            del self._adj[neighbor_id][uid]
+        del self._objects[uid]
+
+    def add_edge(self, uid1: NodeId, uid2: NodeId) -> None:
+        self._adj[uid1][uid2] = None
+        self._adj[uid2][uid1] = None
+
+    def remove_edge(self, uid1: NodeId, uid2: NodeId) -> None:
+        del self._adj[uid1][uid2]
+        del self._adj[uid2][uid1]
+
+    def has_edge(self, uid1: NodeId, uid2: NodeId) -> bool:
+        return uid2 in self._adj.get(uid1, ())
+
+    def neighbors(self, uid: NodeId) -> Iterable[NodeId]:
+        return iter(self._adj[uid])
+
+    def nodes(self) -> Iterator[Tuple[NodeId, Element]]:
+        return iter(self._objects.items())
+
+    def to_networkx(self) -> nx.Graph:
+        """Buduje (na żądanie) widok nx.Graph, np. do wizualizacji. Zmiany w nim nie wracają do grafu."""
+        view = NetworkxStorage()
+        for obj in self._objects.values():
+            view.add_node(obj)
+        for uid, neighbors in self._adj.items():
+            for neighbor_id in neighbors:
+                view.add_edge(uid, neighbor_id)
+        return view.nx_graph
+
+
+_MISSING = object()
+
+
+class CowDict(MutableMapping):
+    """
+    Słownik kopiowany przy zapisie: czyta z bazowego słownika (którego nie
+    zmienia), a własne zmiany trzyma lokalnie. Kolejność iteracji jak w dict
+    po tych samych operacjach: klucze bazy (bez usuniętych), potem nowe.
+    wrap: kopia wartości z bazy robiona przy pierwszym odczycie (dla wartości
+    zmienianych w miejscu, np. kubełków indeksu); bez wrap wartości są wspólne.
+    """
+
+    __slots__ = ("_base", "_local", "_hidden", "_extra", "_wrap")
+
+    def __init__(self, base: Mapping, wrap: Optional[Callable[[Any], Any]] = None):
+        self._base = base
+        self._local: Dict[Any, Any] = {}  # nadpisane klucze bazy i nowe klucze
+        self._hidden: Set[Any] = set()  # klucze bazy usunięte (lub dodane ponownie na końcu)
+        self._extra = 0  # liczba kluczy spoza bazy
+        self._wrap = wrap
+
+    def _in_base(self, key) -> bool:
+        return key in self._base and key not in self._hidden
+
+    def __contains__(self, key) -> bool:
+        return key in self._local or self._in_base(key)
+
+    def __getitem__(self, key):
+        value = self._local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self._hidden:
+            raise KeyError(key)
+        value = self._base[key]
+        if self._wrap is not None:
+            value = self._local[key] = self._wrap(value)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def peek(self, key, default=None):
+        """Odczyt bez kopii wartości z bazy (wrap) - wyniku nie wolno zmieniać."""
+        value = self._local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self._hidden:
+            return default
+        return self._base.get(key, default)
+
+    def values(self):
+        # Bez własnych zmian i kopiowania wartości - wprost widok bazy
+        if not self._local and not self._hidden and self._wrap is None:
+            return self._base.values()
+        return super().values()
+
+    def __setitem__(self, key, value) -> None:
+        if key not in self._local and not self._in_base(key):
+            self._extra += 1
+        self._local[key] = value
+
+    def __delitem__(self, key) -> None:
+        if self._in_base(key):
+            self._local.pop(key, None)
+            self._hidden.add(key)
+        elif key in self._local:
+            del self._local[key]
+            self._extra -= 1
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator:
+        hidden = self._hidden
+        for key in self._base:
+            if key not in hidden:
+                yield key
+        base = self._base
+        for key in list(self._local):
+            if key in hidden or key not in base:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._hidden) + self._extra
+
+    def __bool__(self) -> bool:
+        return self._extra > 0 or len(self._base) > len(self._hidden)
+
+
+class OverlayStorage:
+    """
+    Magazyn migawki grafu (Graph.snapshot): czyta węzły i sąsiedztwo z magazynu
+    rodzica, którego nie zmienia. Lista sąsiadów węzła jest kopiowana przy
+    pierwszej zmianie jego połączeń, a obiekt węzła - przy pierwszym own
+    (zapis; adopt tworzy kopię należącą do migawki). get / peek / nodes
+    zwracają bez kopiowania obiekty rodzica dla węzłów jeszcze niezmienionych.
+    """
+
+    def __init__(self, base, adopt: Callable[[Element], Element]):
+        self._base = base
+        self._adopt = adopt
+        self._objects: Dict[NodeId, Element] = {}  # węzły przejęte i nowe
+        self._added: Dict[NodeId, None] = {}  # nowe węzły w kolejności dodania
+        self._removed: Set[NodeId] = set()  # usunięte węzły bazy
+        self._adj: Dict[NodeId, Dict[NodeId, None]] = {}  # skopiowane listy sąsiadów
+
+    def _in_base(self, uid: NodeId) -> bool:
+        return uid not in self._removed and uid in self._base
+
+    def __contains__(self, uid: NodeId) -> bool:
+        return uid in self._added or self._in_base(uid)
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._removed) + len(self._added)
+
+    def add_node(self, obj: Element) -> None:
+        self._objects[obj.uid] = obj
+        self._added[obj.uid] = None
+        self._adj.setdefault(obj.uid, {})
+
+    def set_attrs(self, uid: NodeId, **attrs) -> None:
+        pass
+
+    def own(self, uid: NodeId) -> Element:
+        """Obiekt węzła należący do migawki - kopiowany z rodzica przy pierwszym zapisie."""
+        obj = self._objects.get(uid)
+        if obj is None:
+            obj = self._objects[uid] = self._adopt(self.peek(uid))
+        return obj
+
+    def peek(self, uid: NodeId) -> Element:
+        obj = self._objects.get(uid)
+        if obj is not None:
+            return obj
+        if uid in self._removed:
+            raise KeyError(uid)
+        return self._base.peek(uid)
+
+    get = peek
+
+    def _bucket(self, uid: NodeId) -> Dict[NodeId, None]:
+        bucket = self._adj.get(uid)
+        if bucket is None:
+            bucket = self._adj[uid] = dict.fromkeys(self._base.neighbors(uid))
+        return bucket
+
+    def remove_node(self, uid: NodeId) -> None:
+        for neighbor_id in self._bucket(uid):
+            del self._bucket(neighbor_id)[uid]
+        del self._adj[uid]
+        self._objects.pop(uid, None)
+        if uid in self._added:
+            del self._added[uid]
+        else:
+            self._removed.add(uid)
+
+    def add_edge(self, uid1: NodeId, uid2: NodeId) -> None:
+        self._bucket(uid1)[uid2] = None
+        self._bucket(uid2)[uid1] = None
+
+    def remove_edge(self, uid1: NodeId, uid2: NodeId) -> None:
+        del self._bucket(uid1)[uid2]
+        del self._bucket(uid2)[uid1]
+
+    def has_edge(self, uid1: NodeId, uid2: NodeId) -> bool:
+        if uid1 not in self:
+            return False
+        bucket = self._adj.get(uid1)
+        if bucket is None:
+            return self._base.has_edge(uid1, uid2)
+        return uid2 in bucket
+
+    def neighbors(self, uid: NodeId) -> Iterable[NodeId]:
+        bucket = self._adj.get(uid)
+        if bucket is None:
+            return self._base.neighbors(uid)
+        return iter(bucket)
+
+    def nodes(self) -> Iterator[Tuple[NodeId, Element]]:
+        removed = self._removed
+        for uid, _ in self._base.nodes():
+            if uid not in removed:
+                yield uid, self.peek(uid)
+        for uid in list(self._added):
+            yield uid, self._objects[uid]
+
+    def to_networkx(self) -> nx.Graph:
+        """Widok nx.Graph budowany na żądanie, jak w SetStorage."""
+        view = NetworkxStorage()
+        for _, obj in self.nodes():
+            view.add_node(obj)
+        for uid, _ in self.nodes():
+            for neighbor_id in self.neighbors(uid):
+                view.add_edge(uid, neighbor_id)
+        return view.nx_graph
+
+
+STORAGE_BACKENDS = {
+    BACKEND_NETWORKX: NetworkxStorage,
+    BACKEND_SETS: SetStorage,
+}
+
+
+def create_storage(backend: str):
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(
+            f"Nieznany backend grafu: {backend}. Dostępne: {', '.join(STORAGE_BACKENDS)}."
+        )
+    return STORAGE_BACKENDS[backend]()
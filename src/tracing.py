@@ -0,0 +1,130 @@
+import json
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, TextIO, Union
+
+# Aktywny zbieracz śladów (None = śledzenie wyłączone). Produkcje sprawdzają go
+# raz na wywołanie find_lhs / apply_rhs; bez aktywnego zbieracza nie powstają
+# żadne napisy ani pomiary czasu.
+_active: Optional["Tracer"] = None
+
+
+def active() -> Optional["Tracer"]:
+    """Zwraca aktywny Tracer albo None, gdy śledzenie jest wyłączone."""
+    return _active
+
+
+@contextmanager
+def tracing(tracer: Optional["Tracer"] = None):
+    """
+    Włącza śledzenie produkcji w bloku with:
+
+        with tracing() as trace:
+            ProductionP0().apply(graph)
+        trace.dump_json("trace.json")
+    """
+    global _active
+    previous = _active
+    _active = tracer if tracer is not None else Tracer()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+@dataclass
+class ProductionTrace:
+    """Statystyki jednej produkcji."""
+
+    find_lhs_calls: int = 0
+    matches: int = 0
+    rejections: Counter = field(default_factory=Counter)  # powód -> liczba odrzuconych kandydatów
+    rhs_calls: int = 0
+    rhs_time: float = 0.0  # sekundy, suma
+    rhs_max: float = 0.0
+    # apply_batched (np. PolygonSplit) stosuje RHS z pominięciem apply_rhs -
+    # jeden pomiar na wywołanie, z liczbą przekazanych i zastosowanych dopasowań
+    batch_calls: int = 0
+    batch_matches: int = 0
+    batch_applied: int = 0
+    batch_time: float = 0.0  # sekundy, suma
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "find_lhs_calls": self.find_lhs_calls,
+            "matches": self.matches,
+            "rejections": dict(sorted(self.rejections.items())),
+            "rhs": {
+                "calls": self.rhs_calls,
+                "total_s": self.rhs_time,
+                "mean_s": self.rhs_time / self.rhs_calls if self.rhs_calls else 0.0,
+                "max_s": self.rhs_max,
+            },
+            "batch": {
+                "calls": self.batch_calls,
+                "matches": self.batch_matches,
+                "applied": self.batch_applied,
+                "total_s": self.batch_time,
+            },
+        }
+
+
+class Tracer:
+    """
+    Zbiera w pamięci ustrukturyzowany ślad działania produkcji: liczniki powodów
+    odrzucenia kandydatów LHS, liczby dopasowań, czasy apply_rhs oraz
+    wywołania apply_batched - osobno dla każdej produkcji (po nazwie klasy).
+    """
+
+    def __init__(self):
+        self.productions: Dict[str, ProductionTrace] = {}
+
+    def _get(self, production: Any) -> ProductionTrace:
+        name = production if isinstance(production, str) else type(production).__name__
+        trace = self.productions.get(name)
+        if trace is None:
+            trace = self.productions[name] = ProductionTrace()
+        return trace
+
+    def reject(self, production: Any, reason: str) -> None:
+        """Kandydat LHS odrzucony z podanego powodu (krótki, stały identyfikator)."""
+        self._get(production).rejections[reason] += 1
+
+    def matched(self, production: Any, count: int) -> None:
+        trace = self._get(production)
+        trace.find_lhs_calls += 1
+        trace.matches += count
+
+    def rhs(self, production: Any, seconds: float) -> None:
+        trace = self._get(production)
+        trace.rhs_calls += 1
+        trace.rhs_time += seconds
+        if seconds > trace.rhs_max:
+            trace.rhs_max = seconds
+
+    def batch(self, production: Any, matches: int, applied: int, seconds: float) -> None:
+        """Jedno wywołanie apply_batched: liczba dopasowań, zastosowanych RHS i czas."""
+        trace = self._get(production)
+        trace.batch_calls += 1
+        trace.batch_matches += matches
+        trace.batch_applied += applied
+        trace.batch_time += seconds
+
+    def reset(self) -> None:
+        self.productions.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "productions": {
+                name: trace.to_dict() for name, trace in sorted(self.productions.items())
+            }
+        }
+
+    def dump_json(self, target: Union[str, TextIO], indent: int = 2) -> None:
+        """Zapisuje ślad jako JSON do pliku (ścieżka) lub otwartego strumienia."""
+        if isinstance(target, str):
+            with open(target, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=indent, ensure_ascii=False)
+        else:
+            json.dump(self.to_dict(), target, indent=indent, ensure_ascii=False)
@@ -7,11 +7,13 @@ from ..graph import Graph
 from ..elements import Vertex, Hyperedge
 
 
-def visualize_graph(graph: Graph, title: str, filepath: str = None):
+def visualize_graph(graph: Graph, title: str, filepath: str = None, show_names: bool = False):
     """
     Visualizes an object of the model.graph.Graph class.
     Calculates the positions of logical nodes (Q, E) based on their neighboring vertices.
     Ensures vertices are drawn ON TOP of hyperedges and their labels for visibility.
+    With show_names=True hyperedges are labelled with their hierarchical
+    lineage name (graph.display_name), e.g. "Q1.2.0".
     """
     nx_graph = graph.nx_graph
     pos = {}
@@ -31,15 +33,12 @@ def visualize_graph(graph: Graph, title: str, filepath: str = None):
 
     # 1. Calculate Positions
     
-    # 1a. Vertex positions (fixed)
-    for node_id, data in nx_graph.nodes(data=True):
-        obj = data.get("data")
-        if isinstance(obj, Vertex):
-            x, y = obj.x, obj.y
-            # Offset dla hanging nodes - aby nie nakładały się z krawędziami
-            if obj.hanging:
-                y += 0.2
-            pos[node_id] = (x, y)
+    # 1a. Vertex positions (fixed) - taken in bulk from the graph's coordinate array
+    vertices = [graph.vertex_at_index(i) for i in range(len(graph.coords))]
+    xy = graph.coords.copy()
+    # Offset dla hanging nodes - aby nie nakładały się z krawędziami
+    xy[[v.hanging for v in vertices], 1] += 0.2
+    pos.update(zip((v.uid for v in vertices), map(tuple, xy.tolist())))
 
     # 1b. Hyperedge positions (centroids of neighbors)
     for node_id, data in nx_graph.nodes(data=True):
@@ -75,19 +74,20 @@ def visualize_graph(graph: Graph, title: str, filepath: str = None):
     # Hyperedges
     for node_id in hyperedge_nodes:
         obj = nx_graph.nodes[node_id]["data"]
+        name = f"{graph.display_name(node_id)}\n" if show_names else ""
         
         if obj.label == "Q":
             colors_h.append("#ff9999") # Red
             sizes_h.append(600)
-            labels_h[node_id] = f"Q\nR={obj.r}"
+            labels_h[node_id] = f"{name}Q\nR={obj.r}"
         elif obj.label == "E":
             colors_h.append("#99ff99") # Green
             sizes_h.append(300)
-            labels_h[node_id] = f"E\nB={obj.b}\nR={obj.r}"
+            labels_h[node_id] = f"{name}E\nB={obj.b}\nR={obj.r}"
         else:
             colors_h.append("#cccccc") # Grey
             sizes_h.append(300)
-            labels_h[node_id] = f"{obj.label}\nR={obj.r}"
+            labels_h[node_id] = f"{name}{obj.label}\nR={obj.r}"
 
     # 3. Drawing - Layered Approach
     plt.figure(figsize=(8, 8))
@@ -1,10 +1,11 @@
 import math
 
 from src.graph import Graph
+from src.storage import BACKEND_NETWORKX
 from src.elements import Vertex, Hyperedge
 
 
-def get_2x2_grid_graph():
+def get_2x2_grid_graph(backend: str = BACKEND_NETWORKX):
     """
     Tworzy siatkę 2x2 elementy (4 czworokąty).
 
@@ -15,7 +16,7 @@ def get_2x2_grid_graph():
     | Q1 | Q2 |
     1 -- 2 -- 3  (y=0.0)
     """
-    g = Graph()
+    g = Graph(backend=backend)
 
     # --- 1. Wierzchołki (Vertex) ---
     # Generujemy 9 wierzchołków w siatce 3x3 punkty
@@ -91,6 +92,52 @@ def get_2x2_grid_graph():
     return g
 
 
+def get_grid_graph(nx_cells: int, ny_cells: int = None, backend: str = BACKEND_NETWORKX):
+    """
+    Tworzy regularną siatkę nx_cells x ny_cells czworokątów o boku 1.
+    Wierzchołki numerowane wierszami od 1 (lewy-dolny róg), elementy Q1, Q2, ...
+    (wierszami), krawędzie E1, E2, ... - najpierw poziome, potem pionowe.
+    Dla 2x2 topologia jest taka sama jak w get_2x2_grid_graph (inne uid krawędzi).
+    """
+    ny_cells = nx_cells if ny_cells is None else ny_cells
+    g = Graph(backend=backend)
+
+    def vertex_id(i, j):
+        return j * (nx_cells + 1) + i + 1
+
+    for j in range(ny_cells + 1):
+        for i in range(nx_cells + 1):
+            g.add_vertex(Vertex(uid=vertex_id(i, j), x=float(i), y=float(j)))
+
+    for j in range(ny_cells):
+        for i in range(nx_cells):
+            q_uid = f"Q{j * nx_cells + i + 1}"
+            g.add_hyperedge(Hyperedge(uid=q_uid, label="Q", r=0, b=0))
+            for v_id in (
+                vertex_id(i, j),
+                vertex_id(i + 1, j),
+                vertex_id(i + 1, j + 1),
+                vertex_id(i, j + 1),
+            ):
+                g.connect(q_uid, v_id)
+
+    edges = []
+    for j in range(ny_cells + 1):
+        for i in range(nx_cells):
+            edges.append((vertex_id(i, j), vertex_id(i + 1, j), j in (0, ny_cells)))
+    for j in range(ny_cells):
+        for i in range(nx_cells + 1):
+            edges.append((vertex_id(i, j), vertex_id(i, j + 1), i in (0, nx_cells)))
+
+    for n, (v1, v2, boundary) in enumerate(edges, start=1):
+        e_uid = f"E{n}"
+        g.add_hyperedge(Hyperedge(uid=e_uid, label="E", r=0, b=int(boundary)))
+        g.connect(e_uid, v1)
+        g.connect(e_uid, v2)
+
+    return g
+
+
 def get_hexagonal_test_graph():
     """
     Tworzy geometrię sześciokąta, ale środek nazywa 'Q'.
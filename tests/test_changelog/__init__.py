@@ -0,0 +1 @@
+# Change log tests
@@ -0,0 +1,102 @@
+import pytest
+
+from src import marking
+from src.changelog import ChangeLogReader, ChangeLogWriter
+from src.elements import Vertex
+from src.engine import RefinementEngine
+from src.productions.p4 import ProductionP4
+from src.storage import BACKEND_SETS
+from tests.graphs import get_2x2_grid_graph, get_grid_graph
+
+
+def _state(graph):
+    state = {}
+    for node in graph.nodes():
+        if isinstance(node, Vertex):
+            attrs = (node.x, node.y, node.hanging)
+        else:
+            attrs = (node.label, node.r, node.b)
+        state[node.uid] = (attrs, frozenset(graph._storage.neighbors(node.uid)))
+    return state
+
+
+def test_every_step_can_be_reconstructed(tmp_path):
+    path = tmp_path / "history.gglog"
+    graph = get_grid_graph(4)
+    states = [_state(graph)]
+
+    with ChangeLogWriter(graph, path, chunk_steps=3, keyframe_every=4) as writer:
+        for box in [(0, 0, 1, 1), (3, 3, 4, 4), (1, 2, 2, 3), (2, 0, 3, 1)]:
+            seeds = marking.mark(graph, marking.in_box(*box))
+            assert writer.commit("mark") is not None
+            states.append(_state(graph))
+            RefinementEngine().run(graph, seeds=seeds)
+            assert writer.commit("engine") is not None
+            states.append(_state(graph))
+        assert writer.commit() is None
+
+    with ChangeLogReader(path) as reader:
+        assert len(reader) == len(states) - 1
+        assert reader.keyframes == list(range(0, len(states), 4))
+        for step, state in enumerate(states):
+            assert _state(reader.graph_at(step, backend=BACKEND_SETS)) == state
+        with pytest.raises(ValueError):
+            reader.graph_at(len(states))
+
+
+def test_recording_makes_a_step_per_production_application(tmp_path):
+    path = tmp_path / "history.gglog"
+    graph = get_grid_graph(5)
+    marking.mark(graph, marking.in_circle(2.5, 2.5, 1.5))
+
+    with ChangeLogWriter(graph, path, keyframe_every=10) as writer:
+        with writer.recording() as trace:
+            RefinementEngine().run(graph)
+
+    with ChangeLogReader(path) as reader:
+        labels = [label for _, label, _ in reader.steps()]
+        assert _state(reader.graph_at(len(reader))) == _state(graph)
+    assert labels.count("ProductionP1") == trace.productions["ProductionP1"].rhs_calls
+    assert "ProductionP5" in labels
+
+
+def test_replay_keeps_hanging_flag_changes(tmp_path):
+    path = tmp_path / "history.gglog"
+    graph = get_2x2_grid_graph()
+    graph.enable_vertex_dedup()
+    states = [_state(graph)]
+
+    with ChangeLogWriter(graph, path, keyframe_every=100) as writer:
+        graph.add_vertex(Vertex(100, 0.5, 0.0, hanging=True))
+        writer.commit()
+        states.append(_state(graph))
+        graph.update_hyperedge("E1", r=1)
+        # P4 używa wierzchołka 100 jako środka krawędzi brzegowej i zdejmuje hanging
+        ProductionP4().apply(graph, target_id="E1")
+        writer.commit()
+        states.append(_state(graph))
+
+    assert graph.get_vertex(100).hanging is False
+    with ChangeLogReader(path) as reader:
+        assert reader.keyframes == [0]
+        for step, state in enumerate(states):
+            assert _state(reader.graph_at(step)) == state
+
+
+def test_interrupted_write_keeps_complete_chunks(tmp_path):
+    path = tmp_path / "history.gglog"
+    graph = get_grid_graph(2)
+    with ChangeLogWriter(graph, path, chunk_steps=1) as writer:
+        for q in graph.find_hyperedges(label="Q"):
+            q.r = 1
+            writer.commit()
+
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+    with ChangeLogReader(path) as reader:
+        assert len(reader) == 3
+        assert len(reader.graph_at(3).find_hyperedges(label="Q", r=1)) == 3
+
+    path.write_bytes(b"junk" * 10)
+    with pytest.raises(ValueError):
+        ChangeLogReader(path)
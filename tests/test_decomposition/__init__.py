@@ -0,0 +1 @@
+# Domain decomposition tests
@@ -0,0 +1,122 @@
+import pytest
+
+from src.decomposition import (
+    DecompositionReport,
+    DomainDecomposition,
+    SubdomainDelta,
+    partition_elements,
+    subdomain_nodes,
+)
+from src.elements import Vertex
+from src.engine import RefinementEngine
+from src.graph import Graph
+from src.productions.p0 import ProductionP0
+from tests.graphs import get_grid_graph
+
+
+def _signature(graph: Graph):
+    """Stan grafu niezależny od nadanych uid - wierzchołki i hiperkrawędzie po współrzędnych."""
+    vertices = sorted(
+        (v.x, v.y, v.hanging) for v in graph.nodes() if isinstance(v, Vertex)
+    )
+    hyperedges = sorted(
+        (h.label, h.r, h.b, tuple(sorted((v.x, v.y) for v in graph.get_hyperedge_vertices(h.uid))))
+        for h in graph.find_hyperedges()
+    )
+    return vertices, hyperedges
+
+
+def _marked_grid(n, targets):
+    graph = get_grid_graph(n)
+    for uid in targets:
+        ProductionP0().apply(graph, target_id=uid)
+    return graph
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 4])
+def test_partition_covers_all_elements_once(k):
+    graph = get_grid_graph(4)
+
+    parts = partition_elements(graph, k)
+
+    assert len(parts) == k
+    assert sorted(uid for part in parts for uid in part) == sorted(
+        f"Q{i}" for i in range(1, 17)
+    )
+    assert max(map(len, parts)) - min(map(len, parts)) <= 1
+
+
+def test_partition_rejects_non_positive_k():
+    with pytest.raises(ValueError):
+        partition_elements(get_grid_graph(2), 0)
+
+
+def test_subdomain_contains_interface_edges():
+    graph = get_grid_graph(2)
+
+    nodes = subdomain_nodes(graph, ["Q1"])
+
+    # Q1 (lewy dolny) i wszystkie 4 jego krawędzie, w tym dwie współdzielone
+    assert {"Q1", 1, 2, 4, 5} <= nodes
+    assert {uid for uid in nodes if isinstance(uid, str) and uid.startswith("E")} == {
+        "E1", "E3", "E7", "E8"
+    }
+
+
+@pytest.mark.parametrize("k", [2, 3, 4])
+def test_decomposed_refinement_matches_serial(k):
+    targets = ["Q1", "Q2", "Q6", "Q7", "Q11", "Q16"]
+    serial = _marked_grid(4, targets)
+    RefinementEngine().run(serial)
+
+    graph = _marked_grid(4, targets)
+    report = DomainDecomposition(k, processes=2).run(graph)
+
+    assert report.converged
+    assert report.conflicts == 0
+    assert report.changed_subdomains[-1] == 0
+    assert _signature(graph) == _signature(serial)
+
+
+def test_shared_edge_split_on_both_sides_is_synced():
+    # Q1 i Q2 sąsiadują krawędzią E7 i trafiają do różnych poddziedzin
+    graph = _marked_grid(2, ["Q1", "Q2"])
+
+    report = DomainDecomposition(2, processes=2).run(graph)
+
+    assert report.synced == 3  # środek krawędzi i jej dwie połówki
+    midpoints = [
+        v for v in graph.nodes() if isinstance(v, Vertex) and (v.x, v.y) == (1.0, 0.5)
+    ]
+    assert len(midpoints) == 1
+
+
+def test_merged_children_keep_lineage():
+    # Elementy wewnętrzne - P5 dzieli tylko przy wiszących środkach wszystkich krawędzi
+    graph = _marked_grid(4, ["Q6", "Q11"])
+
+    DomainDecomposition(2, processes=2).run(graph)
+
+    children = [h for h in graph.find_hyperedges(label="Q") if graph.level(h.uid) == 1]
+    assert len(children) == 8
+    assert {graph.display_name(h.uid).split(".")[0] for h in children} == {"Q6", "Q11"}
+
+
+def test_merged_hanging_change_is_journaled_and_copy_on_write():
+    graph = get_grid_graph(2)
+    delta = SubdomainDelta(changed=[(1, ("V", 0.0, 0.0, True))])
+
+    # Scalanie w transakcji atomowej cofa się razem z flagą hanging
+    with pytest.raises(KeyError):
+        with graph.transaction(atomic=True):
+            DomainDecomposition._merge(graph, [delta], DecompositionReport())
+            assert graph.get_vertex(1).hanging
+            raise KeyError("przerwane")
+    assert not graph.get_vertex(1).hanging
+
+    # Scalanie w migawce nie zmienia grafu bazowego
+    variant = graph.snapshot()
+    DomainDecomposition._merge(variant, [delta], DecompositionReport())
+    assert variant.get_vertex(1).hanging
+    assert not graph.get_vertex(1).hanging
+    variant.release()
@@ -0,0 +1 @@
+# Refinement engine tests
@@ -0,0 +1,128 @@
+import pytest
+
+from src import marking
+from src.elements import Vertex, Hyperedge
+from src.engine import RefinementEngine, run_naive
+from src.graph import Graph
+from src.productions.p0 import ProductionP0
+from src.productions.p1 import ProductionP1
+from src.productions.p5 import ProductionP5
+from tests.graphs import get_2x2_grid_graph, get_grid_graph
+
+
+def _signature(graph: Graph):
+    """Stan grafu niezależny od nadanych uid - wierzchołki i hiperkrawędzie po współrzędnych."""
+    vertices = sorted(
+        (v.x, v.y, v.hanging) for _, v in graph._storage.nodes() if isinstance(v, Vertex)
+    )
+    hyperedges = sorted(
+        (h.label, h.r, h.b, tuple(sorted((v.x, v.y) for v in graph.get_hyperedge_vertices(h.uid))))
+        for h in graph.find_hyperedges()
+    )
+    return vertices, hyperedges
+
+
+def _marked_grid(n, targets):
+    graph = get_grid_graph(n)
+    for uid in targets:
+        ProductionP0().apply(graph, target_id=uid)
+    return graph
+
+
+def _quad_with_split_edges():
+    graph = Graph()
+    for uid, x, y in [(1, 0.0, 0.0), (2, 2.0, 0.0), (3, 2.0, 2.0), (4, 0.0, 2.0)]:
+        graph.add_vertex(Vertex(uid, x, y))
+    for uid, x, y in [(5, 1.0, 0.0), (6, 2.0, 1.0), (7, 1.0, 2.0), (8, 0.0, 1.0)]:
+        graph.add_vertex(Vertex(uid, x, y, hanging=True))
+    graph.add_hyperedge(Hyperedge("Q1", "Q", r=1))
+    for uid in (1, 2, 3, 4):
+        graph.connect("Q1", uid)
+    for i, (u, m) in enumerate([(1, 5), (5, 2), (2, 6), (6, 3), (3, 7), (7, 4), (4, 8), (8, 1)]):
+        graph.add_hyperedge(Hyperedge(f"E{i + 1}", "E", b=1))
+        graph.connect(f"E{i + 1}", u)
+        graph.connect(f"E{i + 1}", m)
+    return graph
+
+
+def test_take_changes_reports_touched_nodes():
+    graph = get_2x2_grid_graph()
+    with pytest.raises(ValueError):
+        graph.take_changes()
+
+    graph.start_tracking()
+    graph.update_hyperedge("E1", r=1)
+    graph.update_hyperedge("E2", r=0)  # bez zmiany wartości
+    graph.add_vertex(Vertex(10, 3.0, 3.0))
+    graph.remove_node("E3")
+    assert graph.take_changes() == {"E1", 10, 3, 6}
+    assert graph.take_changes() == set()
+
+    graph.stop_tracking()
+    assert not graph.is_tracking
+
+
+@pytest.mark.parametrize("targets", [["Q1"], ["Q5", "Q11"], [f"Q{i}" for i in range(1, 17)]])
+def test_engine_reaches_same_fixpoint_as_naive_loop(targets):
+    naive_graph = _marked_grid(4, targets)
+    naive = run_naive(naive_graph)
+
+    engine_graph = _marked_grid(4, targets)
+    report = RefinementEngine().run(engine_graph)
+
+    assert report.converged and naive.converged
+    assert _signature(engine_graph) == _signature(naive_graph)
+    assert report.applications == naive.applications
+    assert report.full_scans == 0
+
+
+def test_engine_seeded_with_marked_elements_examines_less():
+    naive_graph = _marked_grid(8, ["Q10"])
+    naive = run_naive(naive_graph)
+
+    engine_graph = _marked_grid(8, ["Q10"])
+    report = RefinementEngine().run(engine_graph, seeds=["Q10"])
+
+    assert _signature(engine_graph) == _signature(naive_graph)
+    assert report.savings(naive)["candidates_examined"] > 0
+    assert report.candidates_examined * 5 < naive.candidates_examined
+
+
+def test_engine_localized_refinement_calls_find_lhs_once_per_production_and_round():
+    naive_graph = get_grid_graph(12)
+    marking.mark(naive_graph, marking.in_box(0, 0, 3, 3))
+    naive = run_naive(naive_graph)
+
+    engine_graph = get_grid_graph(12)
+    seeds = marking.mark(engine_graph, marking.in_box(0, 0, 3, 3))
+    report = RefinementEngine().run(engine_graph, seeds=seeds)
+
+    assert _signature(engine_graph) == _signature(naive_graph)
+    assert report.applications == naive.applications
+    assert report.lhs_calls < naive.lhs_calls
+    assert report.candidates_examined * 4 < naive.candidates_examined
+
+
+def test_engine_splits_element_once_edges_are_broken():
+    graph = _quad_with_split_edges()
+    report = RefinementEngine([ProductionP1(), ProductionP5()]).run(graph)
+
+    assert len(graph.find_hyperedges(label="Q")) == 4
+    assert {graph.lineage(h.uid)[2] for h in graph.find_hyperedges(label="Q")} == {1}
+    # P1 nie pasuje - między narożnikami Q1 nie ma już krawędzi E, tylko połówki
+    assert report.applications == 1
+
+
+def test_engine_stops_at_application_limit():
+    graph = _marked_grid(2, ["Q1", "Q2", "Q3", "Q4"])
+    report = RefinementEngine(max_applications=3).run(graph)
+
+    assert not report.converged
+    assert report.applications == 3
+    assert not graph.is_tracking
+
+
+def test_engine_does_nothing_without_marked_elements():
+    graph = get_grid_graph(3)
+    report = RefinementEngine().run(graph)
+    assert report.applications == 0
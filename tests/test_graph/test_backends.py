@@ -0,0 +1,74 @@
+import pytest
+
+from src.graph import Graph
+from src.storage import BACKEND_NETWORKX, BACKEND_SETS
+from src.productions.p0 import ProductionP0
+from src.productions.p1 import ProductionP1
+from src.productions.p3 import ProductionP3
+from src.productions.p4 import ProductionP4
+from tests.graphs import get_2x2_grid_graph
+
+
+def _snapshot(graph: Graph):
+    """Stan grafu niezależny od backendu: atrybuty węzłów i zbiór krawędzi."""
+    nx_graph = graph.nx_graph
+    nodes = {}
+    for uid, data in nx_graph.nodes(data=True):
+        obj = data["data"]
+        if data["type"] == "vertex":
+            nodes[uid] = ("vertex", obj.x, obj.y, obj.hanging)
+        else:
+            nodes[uid] = ("hyperedge", obj.label, obj.r, obj.b)
+    edges = {frozenset(edge) for edge in nx_graph.edges()}
+    return nodes, edges
+
+
+def _refine(graph: Graph) -> Graph:
+    graph = ProductionP0().apply(graph, target_id="Q1")
+    graph = ProductionP1().apply(graph)
+    graph = ProductionP4().apply(graph)
+    graph = ProductionP3().apply(graph)
+    return graph
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        Graph(backend="nieistniejacy")
+
+
+@pytest.mark.parametrize("backend", [BACKEND_NETWORKX, BACKEND_SETS])
+def test_graph_api_on_backend(backend):
+    graph = get_2x2_grid_graph(backend=backend)
+    assert graph.backend == backend
+
+    assert {v.uid for v in graph.get_neighbors(5)} == set(range(1, 10)) - {5}
+    assert {h.uid for h in graph.get_vertex_hyperedges(1)} == {"Q1", "E1", "E8"}
+    assert {v.uid for v in graph.get_hyperedge_vertices("Q4")} == {5, 6, 8, 9}
+
+    graph.remove_edge("E9", 4)
+    with pytest.raises(ValueError):
+        graph.remove_edge("E9", 4)
+    graph.remove_node(5)
+    with pytest.raises(ValueError):
+        graph.get_node(5)
+    assert {v.uid for v in graph.get_hyperedge_vertices("Q4")} == {6, 8, 9}
+
+
+def test_sets_backend_matches_networkx_after_refinement():
+    reference = _refine(get_2x2_grid_graph(backend=BACKEND_NETWORKX))
+    light = _refine(get_2x2_grid_graph(backend=BACKEND_SETS))
+
+    assert _snapshot(light) == _snapshot(reference)
+
+
+def test_sets_backend_nx_view_is_materialized_on_demand():
+    graph = get_2x2_grid_graph(backend=BACKEND_SETS)
+
+    view = graph.nx_graph
+    assert view.nodes[1]["type"] == "vertex"
+    assert view.nodes["Q1"]["label"] == "Q"
+    assert view.number_of_edges() == 4 * 4 + 12 * 2
+
+    # Widok jest kopią - zmiany w nim nie trafiają do grafu
+    view.remove_node("Q1")
+    assert graph.get_hyperedge("Q1").label == "Q"
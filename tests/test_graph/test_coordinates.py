@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from src.elements import Vertex
+from tests.graphs import get_2x2_grid_graph
+
+
+def test_vertex_coordinates_are_views_onto_graph_array():
+    graph = get_2x2_grid_graph()
+    v5 = graph.get_vertex(5)
+    index = graph.vertex_index(5)
+
+    assert graph.coords.shape == (9, 2)
+    assert tuple(graph.coords[index]) == (1.0, 1.0)
+
+    # Zapis przez Vertex jest widoczny w tablicy i odwrotnie
+    v5.x = 1.5
+    assert graph.coords[index, 0] == 1.5
+    graph.coords[index, 1] = 0.5
+    assert v5.y == 0.5
+
+    graph.update_vertex(5, y=2.5)
+    assert graph.coords[index, 1] == 2.5
+
+
+def test_removed_vertex_keeps_coordinates_and_array_stays_dense():
+    graph = get_2x2_grid_graph()
+    v1 = graph.get_vertex(1)
+
+    graph.remove_node(1)
+
+    assert (v1.x, v1.y) == (0.0, 0.0)
+    assert graph.coords.shape == (8, 2)
+    for index in range(len(graph.coords)):
+        v = graph.vertex_at_index(index)
+        assert graph.vertex_index(v.uid) == index
+        assert tuple(graph.coords[index]) == (v.x, v.y)
+
+
+def test_coordinate_array_grows():
+    graph = get_2x2_grid_graph()
+    for i in range(200):
+        graph.add_vertex(Vertex(uid=f"n{i}", x=float(i), y=-float(i)))
+
+    assert graph.coords.shape == (209, 2)
+    assert graph.get_vertex("n150").y == -150.0
+    assert graph.get_vertex(9).x == 2.0
+
+
+def test_centroid_and_counter_clockwise_order():
+    graph = get_2x2_grid_graph()
+    corners = graph.get_hyperedge_vertices("Q4")
+
+    assert graph.centroid(corners) == (1.5, 1.5)
+    ordered = [v.uid for v in graph.sort_counter_clockwise(corners)]
+    # Start od kąta najbliższego -pi (lewy dolny narożnik), dalej CCW
+    assert ordered == [5, 6, 9, 8]
+    assert np.array_equal(
+        graph.coords[graph.vertex_indices(ordered)],
+        [[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 2.0]],
+    )
+
+
+def test_add_vertices_writes_coordinates_in_one_block():
+    graph = get_2x2_grid_graph()
+    vertices = [Vertex(uid=100 + i, x=0.0, y=0.0) for i in range(70)]
+    xy = np.arange(140, dtype=np.float64).reshape(70, 2)
+
+    graph.add_vertices(vertices, xy)
+
+    assert graph.coords.shape == (79, 2)
+    assert (graph.coords[graph.vertex_indices(range(100, 170))] == xy).all()
+    assert (vertices[3].x, vertices[3].y) == (6.0, 7.0)
+    assert graph.ids.next_vertex_uid() == 170
+
+
+def test_duplicate_uid_is_rejected_before_a_row_is_allocated():
+    graph = get_2x2_grid_graph()
+    rows = graph.coords.shape[0]
+
+    with pytest.raises(ValueError):
+        graph.add_vertex(Vertex(uid=1, x=5.0, y=5.0))
+    with pytest.raises(ValueError):
+        graph.add_vertices([Vertex(uid=100, x=0.0, y=0.0), Vertex(uid=100, x=1.0, y=1.0)])
+    with pytest.raises(ValueError):
+        graph.add_hyperedge(graph.get_hyperedge("Q1"))
+
+    assert graph.coords.shape[0] == rows
+    assert (graph.get_vertex(1).x, graph.get_vertex(1).y) == (0.0, 0.0)
+    assert 100 not in graph
+
+
+def test_vertex_dedup_registry_follows_graph():
+    graph = get_2x2_grid_graph()
+    assert graph.find_vertex_at(1.0, 1.0) is None
+
+    graph.enable_vertex_dedup(tolerance=1e-6)
+    center = graph.find_vertex_at(1.0 + 4e-7, 1.0 - 4e-7)
+    assert (center.x, center.y) == (1.0, 1.0)
+    assert graph.find_vertex_at(1.0 + 2e-6, 1.0) is None
+
+    graph.update_vertex(center.uid, x=5.0)
+    assert graph.find_vertex_at(1.0, 1.0) is None
+    assert graph.find_vertex_at(5.0, 1.0) is center
+
+    graph.add_vertices([Vertex(uid=200, x=7.0, y=7.0)])
+    assert graph.find_vertex_at(7.0, 7.0).uid == 200
+    graph.remove_node(200)
+    assert graph.find_vertex_at(7.0, 7.0) is None
+
+    with pytest.raises(ValueError):
+        graph.enable_vertex_dedup(tolerance=0)
@@ -0,0 +1,42 @@
+from src.engine import RefinementEngine
+from src.productions.p0 import ProductionP0
+from tests.graphs import get_2x2_grid_graph, get_grid_graph
+
+
+def _sorted_uids(graph, uid):
+    return tuple(v.uid for v in graph.sort_counter_clockwise(graph.get_hyperedge_vertices(uid)))
+
+
+def test_corner_cycle_matches_geometric_order():
+    graph = get_2x2_grid_graph()
+    q = graph.find_hyperedges(label="Q")[0]
+
+    assert graph.corner_cycle(q.uid) == _sorted_uids(graph, q.uid)
+    assert [v.uid for v in graph.get_hyperedge_corners(q.uid)] == list(graph.corner_cycle(q.uid))
+
+
+def test_elements_created_by_split_keep_recorded_order():
+    graph = get_grid_graph(3)
+    ProductionP0().apply(graph)
+    RefinementEngine().run(graph)
+
+    elements = graph.find_hyperedges(label="Q")
+    assert all(q.uid in graph._corners for q in elements)
+    for q in elements:
+        assert graph.corner_cycle(q.uid) == _sorted_uids(graph, q.uid)
+
+
+def test_corner_cycle_is_invalidated_by_changes():
+    graph = get_2x2_grid_graph()
+    q = graph.find_hyperedges(label="Q")[0]
+    first, *_ = graph.corner_cycle(q.uid)
+
+    # Przesunięcie narożnika może zmienić kolejność
+    v = graph.get_vertex(first)
+    graph.update_vertex(first, x=v.x + 10)
+    assert q.uid not in graph._corners
+    assert graph.corner_cycle(q.uid) == _sorted_uids(graph, q.uid)
+
+    graph.remove_edge(q.uid, first)
+    assert first not in graph.corner_cycle(q.uid)
+    assert len(graph.corner_cycle(q.uid)) == 3
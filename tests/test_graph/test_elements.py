@@ -0,0 +1,24 @@
+import pytest
+
+from src.elements import Vertex, Hyperedge
+
+
+def test_elements_are_slotted():
+    v = Vertex(uid=1, x=0.0, y=1.0)
+    h = Hyperedge(uid="E1", label="E", r=1, b=0)
+
+    assert not hasattr(v, "__dict__")
+    assert not hasattr(h, "__dict__")
+    with pytest.raises(AttributeError):
+        v.z = 2.0
+    with pytest.raises(AttributeError):
+        h.extra = 1
+
+
+def test_equality_and_hashing_by_uid():
+    assert Vertex(uid=1, x=0.0, y=0.0) == Vertex(uid=1, x=5.0, y=5.0)
+    assert Vertex(uid=1, x=0.0, y=0.0) != Vertex(uid=2, x=0.0, y=0.0)
+    assert Hyperedge(uid="Q1", label="Q") == Hyperedge(uid="Q1", label="E", r=1)
+    assert len({Hyperedge(uid="Q1", label="Q"), Hyperedge(uid="Q1", label="Q")}) == 1
+    assert Vertex(uid=1, x=0.0, y=0.0) != Hyperedge(uid=1, label="E")
+    assert repr(Hyperedge("E7", "E", 1, 1)) == "E(id=E7, R=1, B=1)"
@@ -0,0 +1,135 @@
+import pytest
+
+from src.elements import Vertex, Hyperedge
+from src.events import (
+    Connected,
+    Disconnected,
+    HyperedgeChanged,
+    NodeAdded,
+    NodeRemoved,
+    VertexChanged,
+    VertexMoved,
+)
+from src.productions.p3 import ProductionP3
+from tests.graphs import get_2x2_grid_graph, get_graph_with_shared_edge_marked_simple
+
+
+def _recording_graph():
+    graph = get_2x2_grid_graph()
+    events = []
+    graph.subscribe(events.append)
+    return graph, events
+
+
+def test_mutations_emit_typed_events():
+    graph, events = _recording_graph()
+    v = Vertex(10, 3.0, 3.0)
+    h = Hyperedge("E13", "E")
+
+    graph.add_vertex(v)
+    graph.add_hyperedge(h)
+    graph.connect("E13", 10)
+    graph.update_vertex(10, x=4.0)
+    graph.update_vertex(10, hanging=True)
+    graph.update_vertex(10, hanging=True)  # bez zmiany - bez zdarzenia
+    graph.update_hyperedge("E13", r=1)
+    graph.remove_edge("E13", 10)
+    graph.remove_node(10)
+
+    assert events == [
+        NodeAdded(10, v),
+        NodeAdded("E13", h),
+        Connected("E13", 10),
+        VertexMoved(10, (3.0, 3.0), (4.0, 3.0)),
+        VertexChanged(10, False, True),
+        HyperedgeChanged("E13", ("E", 0, 0), ("E", 1, 0)),
+        Disconnected("E13", 10),
+        NodeRemoved(10, v),
+    ]
+
+
+def test_removing_node_disconnects_it_first():
+    graph, events = _recording_graph()
+    node = graph.get_hyperedge("E1")
+    graph.remove_node("E1")
+    assert events == [Disconnected("E1", 1), Disconnected("E1", 2), NodeRemoved("E1", node)]
+
+
+def test_direct_attribute_change_is_reported_and_noop_is_not():
+    graph, events = _recording_graph()
+    graph.get_hyperedge("Q1").r = 1
+    graph.update_hyperedge("Q1", r=1)
+    graph.update_vertex(1, x=0.0)
+    graph.connect("Q1", 1)  # połączenie już istnieje
+
+    assert events == [HyperedgeChanged("Q1", ("Q", 0, 0), ("Q", 1, 0))]
+
+
+def test_unsubscribe():
+    graph, events = _recording_graph()
+    graph.unsubscribe(events.append)
+    graph.update_hyperedge("Q1", r=1)
+    assert events == []
+    with pytest.raises(ValueError):
+        graph.unsubscribe(events.append)
+
+
+def test_transaction_delivers_coalesced_events_on_exit():
+    graph, events = _recording_graph()
+    with graph.transaction():
+        graph.update_hyperedge("Q1", r=1)
+        graph.update_hyperedge("Q1", b=1)
+        graph.update_hyperedge("Q2", r=1)
+        graph.update_hyperedge("Q2", r=0)
+        graph.add_vertex(Vertex(10, 3.0, 3.0))
+        graph.update_vertex(10, y=5.0)
+        graph.connect("Q1", 10)
+        graph.remove_node(10)
+        graph.remove_edge("E1", 1)
+        graph.connect("E1", 1)
+        assert events == []
+
+    assert events == [
+        HyperedgeChanged("Q1", ("Q", 0, 0), ("Q", 1, 1)),
+        Disconnected("E1", 1),
+        Connected("E1", 1),
+    ]
+
+
+def test_transaction_coalesces_moves_and_hanging_changes_separately():
+    graph, events = _recording_graph()
+    with graph.transaction():
+        graph.update_vertex(1, x=0.5)
+        graph.update_vertex(1, hanging=True)
+        graph.update_vertex(1, x=0.0)
+        graph.update_vertex(2, hanging=True)
+        graph.update_vertex(2, hanging=False)
+
+    assert events == [VertexChanged(1, False, True)]
+
+
+def test_nested_transaction_joins_outer_and_flushes_on_error():
+    graph, events = _recording_graph()
+    with pytest.raises(RuntimeError):
+        with graph.transaction():
+            with graph.transaction():
+                graph.update_hyperedge("Q1", r=1)
+            assert events == []
+            raise RuntimeError
+
+    assert events == [HyperedgeChanged("Q1", ("Q", 0, 0), ("Q", 1, 0))]
+
+
+def test_production_in_transaction():
+    graph = get_graph_with_shared_edge_marked_simple()
+    events = []
+    graph.subscribe(events.append)
+    with graph.transaction():
+        ProductionP3().apply(graph)
+
+    added = [e.uid for e in events if isinstance(e, NodeAdded)]
+    assert added == ["E_shared_v", "E_shared_e1", "E_shared_e2"]
+    assert sum(isinstance(e, Connected) for e in events) == 4
+    assert [e for e in events if isinstance(e, HyperedgeChanged)] == [
+        HyperedgeChanged("E_shared", ("E", 1, 0), ("E", 0, 0))
+    ]
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from src.elements import Vertex, Hyperedge
+from src.graph import Graph
+from src.ids import IdAllocator
+from src.productions.p4 import ProductionP4
+from tests.graphs import get_2x2_grid_graph
+
+
+def test_allocator_continues_above_observed_ids():
+    ids = IdAllocator()
+    ids.observe(7)
+    ids.observe("E12")
+    ids.observe("Q3")
+    ids.observe("E_shared_v")  # nazwy spoza schematu są ignorowane
+
+    assert ids.next_vertex_uid() == 8
+    assert ids.next_hyperedge_uid("E") == "E13"
+    assert ids.next_hyperedge_uid("Q") == "Q4"
+    assert ids.next_hyperedge_uid("P") == "P1"
+
+
+def test_allocator_rejects_unknown_namespace():
+    with pytest.raises(ValueError):
+        IdAllocator().next("X")
+
+
+def test_graph_observes_added_nodes():
+    graph = get_2x2_grid_graph()
+    assert graph.ids.next_vertex_uid() == 10
+    assert graph.ids.next_hyperedge_uid("E") == "E13"
+
+
+def test_allocator_is_thread_safe():
+    ids = IdAllocator()
+    results = []
+
+    def worker():
+        results.extend(ids.next_vertex_uid() for _ in range(1000))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == list(range(1, 4001))
+
+
+def test_p4_handles_mixed_vertex_ids():
+    graph = Graph()
+    graph.add_vertex(Vertex(1, 0.0, 0.0, False))
+    graph.add_vertex(Vertex("extra", 5.0, 5.0, False))
+    graph.add_vertex(Vertex(2, 1.0, 0.0, False))
+    graph.add_hyperedge(Hyperedge("E1", "E", r=1, b=1))
+    graph.connect("E1", 1)
+    graph.connect("E1", 2)
+
+    graph = ProductionP4().apply(graph, target_id="E1")
+
+    midpoint = graph.get_midpoint(1, 2)
+    assert midpoint.uid == 3
+    assert graph.get_hyperedge("E2").label == "E"
+    assert graph.get_hyperedge("E3").label == "E"
@@ -0,0 +1,91 @@
+import pytest
+
+from src import marking
+from src.elements import Vertex, Hyperedge
+from src.engine import RefinementEngine
+from src.productions.p3 import ProductionP3
+from tests.graphs import get_grid_graph
+
+
+def _state(graph):
+    nodes = {}
+    for node in graph.nodes():
+        if isinstance(node, Vertex):
+            attrs = (node.x, node.y, node.hanging, graph.vertex_index(node.uid))
+        else:
+            attrs = (node.label, node.r, node.b)
+        neighbors = sorted(map(str, graph._storage.neighbors(node.uid)))
+        nodes[node.uid] = (attrs, neighbors, graph.uid_index(node.uid), graph.lineage(node.uid))
+    return (
+        nodes,
+        [h.uid for h in graph.find_hyperedges()],
+        graph.coords.tolist(),
+        dict(graph._midpoints),
+        dict(graph.ids._counters),
+    )
+
+
+class _FailingP3(ProductionP3):
+    """P3, które przerywa się po kilku zastosowaniach RHS."""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def apply_rhs(self, graph, match):
+        if self.limit == 0:
+            raise RuntimeError("przerwane RHS")
+        self.limit -= 1
+        return super().apply_rhs(graph, match)
+
+
+def test_failed_atomic_apply_restores_graph():
+    graph = get_grid_graph(4)
+    for edge in graph.find_hyperedges(label="E", b=0):
+        edge.r = 1
+    before = _state(graph)
+    events = []
+    graph.subscribe(events.append)
+
+    with pytest.raises(RuntimeError):
+        _FailingP3(limit=5).apply(graph, atomic=True)
+
+    assert _state(graph) == before
+    assert events == []
+
+    ProductionP3().apply(graph, atomic=True)
+    assert graph.find_hyperedges(label="E", r=1) == []
+
+
+def test_rollback_of_refinement_keeps_node_objects_and_indices():
+    graph = get_grid_graph(5)
+    RefinementEngine().run(graph, seeds=marking.mark(graph, marking.in_box(0, 0, 2, 2)))
+    before = _state(graph)
+    objects = {node.uid: node for node in graph.nodes()}
+
+    with graph.transaction(atomic=True):
+        RefinementEngine().run(graph, seeds=marking.mark(graph, marking.in_box(0, 0, 5, 5)))
+        graph.rollback()
+
+    assert _state(graph) == before
+    assert all(graph.get_node(uid) is node for uid, node in objects.items())
+
+
+def test_nested_atomic_transaction_is_a_savepoint():
+    graph = get_grid_graph(2)
+    v = Vertex(graph.ids.next_vertex_uid(), 5.0, 5.0)
+
+    with graph.transaction(atomic=True):
+        graph.add_vertex(v)
+        with pytest.raises(KeyError):
+            with graph.transaction(atomic=True):
+                graph.update_vertex(v.uid, x=6.0, hanging=True)
+                graph.remove_node(1)
+                graph.add_hyperedge(Hyperedge(graph.ids.next_hyperedge_uid("E"), "E"))
+                raise KeyError("wewnętrzna")
+        assert 1 in graph and v.x == 5.0 and v.hanging is False
+        assert [h.uid for h in graph.find_hyperedges(label="E")][-1] == "E12"
+
+    assert v.uid in graph
+    assert graph.ids.next_hyperedge_uid("E") == "E13"
+    with pytest.raises(ValueError):
+        graph.rollback()
@@ -0,0 +1,56 @@
+from src.elements import Hyperedge
+from tests.graphs import get_2x2_grid_graph, get_2x2_grid_graph_marked
+
+
+def test_find_hyperedges_by_label_and_flags():
+    graph = get_2x2_grid_graph()
+
+    quads = graph.find_hyperedges(label="Q")
+    assert [q.uid for q in quads] == ["Q1", "Q2", "Q3", "Q4"]
+
+    boundary = graph.find_hyperedges(label="E", b=1)
+    assert {e.uid for e in boundary} == {f"E{i}" for i in range(1, 9)}
+
+    shared = graph.find_hyperedges(label="E", r=0, b=0)
+    assert {e.uid for e in shared} == {"E9", "E10", "E11", "E12"}
+
+    assert graph.find_hyperedges(label="Q", r=1) == []
+    assert len(graph.find_hyperedges()) == 16
+
+
+def test_index_follows_update_hyperedge():
+    graph = get_2x2_grid_graph()
+
+    graph.update_hyperedge("Q3", r=1)
+    assert [q.uid for q in graph.find_hyperedges(label="Q", r=1)] == ["Q3"]
+    assert "Q3" not in {q.uid for q in graph.find_hyperedges(label="Q", r=0)}
+
+    graph.update_hyperedge("Q3", label="P")
+    assert graph.find_hyperedges(label="Q", r=1) == []
+    assert [h.uid for h in graph.find_hyperedges(label="P")] == ["Q3"]
+
+
+def test_index_follows_direct_attribute_changes():
+    graph = get_2x2_grid_graph_marked(marked_quad_ids=["Q1"])
+    assert [q.uid for q in graph.find_hyperedges(label="Q", r=1)] == ["Q1"]
+
+    graph.get_hyperedge("Q1").r = 0
+    graph.get_hyperedge("E9").b = 1
+
+    assert graph.find_hyperedges(label="Q", r=1) == []
+    assert "E9" in {e.uid for e in graph.find_hyperedges(label="E", b=1)}
+
+
+def test_index_follows_remove_node():
+    graph = get_2x2_grid_graph()
+    q1 = graph.get_hyperedge("Q1")
+
+    graph.remove_node("Q1")
+    assert "Q1" not in {q.uid for q in graph.find_hyperedges(label="Q")}
+
+    # Odłączony obiekt nie wpływa już na indeks grafu
+    q1.r = 1
+    assert graph.find_hyperedges(label="Q", r=1) == []
+
+    graph.add_hyperedge(Hyperedge(uid="Q1", label="Q", r=1))
+    assert [q.uid for q in graph.find_hyperedges(label="Q", r=1)] == ["Q1"]
@@ -0,0 +1,104 @@
+import pytest
+
+from src.elements import Hyperedge, Vertex
+from src.graph import Graph
+from src.ids import NO_PARENT, UidInterner
+from src.productions.p4 import ProductionP4
+from src.productions.p5 import ProductionP5
+from tests.graphs import get_2x2_grid_graph
+
+
+def test_interner_assigns_dense_indices_in_insertion_order():
+    interner = UidInterner()
+    assert [interner.intern(uid) for uid in (1, "E1", "Q7")] == [0, 1, 2]
+    assert interner.index("E1") == 1
+    assert interner.uid(2) == "Q7"
+    assert interner.lineage(0) == (NO_PARENT, 0, 0)
+
+    interner.release("E1")
+    assert "E1" not in interner
+    with pytest.raises(ValueError):
+        interner.index("E1")
+    # Ponowne dodanie to nowy węzeł - nowy indeks, stary rekord zostaje
+    assert interner.intern("E1") == 3
+    assert interner.uid(1) == "E1"
+
+
+def test_interner_grows_beyond_initial_capacity():
+    interner = UidInterner()
+    for uid in range(UidInterner.INITIAL_CAPACITY * 3):
+        interner.intern(uid)
+    interner.set_parent(150, 0, 1)
+    assert interner.lineage(150) == (0, 1, 1)
+    assert len(interner.lineage_array) == UidInterner.INITIAL_CAPACITY * 3
+
+
+def test_graph_uid_index_follows_insertion_order():
+    graph = get_2x2_grid_graph()
+    assert graph.uid_index(1) == 0
+    assert graph.uid_at(graph.uid_index("Q4")) == "Q4"
+    assert graph.display_name("Q4") == "Q4"
+    assert graph.level("Q4") == 0
+
+
+def _quad_with_split_edges():
+    """Element Q1 (R=1) z podzielonymi wszystkimi bokami - LHS produkcji P5."""
+    graph = Graph()
+    corners = [(1, 0.0, 0.0), (2, 2.0, 0.0), (3, 2.0, 2.0), (4, 0.0, 2.0)]
+    midpoints = [(5, 1.0, 0.0), (6, 2.0, 1.0), (7, 1.0, 2.0), (8, 0.0, 1.0)]
+    for uid, x, y in corners:
+        graph.add_vertex(Vertex(uid, x, y))
+    for uid, x, y in midpoints:
+        graph.add_vertex(Vertex(uid, x, y, hanging=True))
+
+    graph.add_hyperedge(Hyperedge("Q1", "Q", r=1))
+    for uid in (1, 2, 3, 4):
+        graph.connect("Q1", uid)
+    for i, (u, m) in enumerate([(1, 5), (5, 2), (2, 6), (6, 3), (3, 7), (7, 4), (4, 8), (8, 1)]):
+        graph.add_hyperedge(Hyperedge(f"E{i + 1}", "E", b=1))
+        graph.connect(f"E{i + 1}", u)
+        graph.connect(f"E{i + 1}", m)
+    return graph
+
+
+def test_p4_records_lineage_of_split_edge():
+    graph = get_2x2_grid_graph()
+    e1_index = graph.uid_index("E1")
+    graph.update_hyperedge("E1", r=1)
+
+    graph = ProductionP4().apply(graph, target_id="E1")
+
+    children = sorted(
+        graph.lineage(uid)
+        for uid, _ in graph._storage.nodes()
+        if graph.lineage(uid)[0] == e1_index
+    )
+    assert children == [(e1_index, slot, 1) for slot in range(3)]
+
+
+def test_p5_records_lineage_of_split_element():
+    graph = _quad_with_split_edges()
+    q1_index = graph.uid_index("Q1")
+
+    graph = ProductionP5().apply(graph)
+
+    quads = graph.find_hyperedges(label="Q")
+    assert [graph.lineage(h.uid) for h in quads] == [(q1_index, i, 1) for i in range(4)]
+    assert [graph.display_name(h.uid) for h in quads] == [f"Q1.{i}" for i in range(4)]
+
+    center = graph.vertex_at_index(len(graph.coords) - 1)
+    assert graph.display_name(center.uid) == "Q1.4"
+    inner = [h for h in graph.find_hyperedges(label="E") if graph.level(h.uid) == 1]
+    assert [graph.lineage(h.uid)[1] for h in inner] == [5, 6, 7, 8]
+
+
+def test_lineage_level_accumulates():
+    graph = get_2x2_grid_graph()
+    graph.add_hyperedge(Hyperedge("Q10", "Q"))
+    graph.record_lineage("Q10", graph.uid_index("Q1"), 2)
+    graph.add_hyperedge(Hyperedge("Q11", "Q"))
+    graph.record_lineage("Q11", graph.uid_index("Q10"), 0)
+    graph.remove_node("Q10")
+
+    assert graph.level("Q11") == 2
+    assert graph.display_name("Q11") == "Q1.2.0"
@@ -0,0 +1,143 @@
+import pytest
+
+from src.elements import Hyperedge, Vertex
+from src.productions.p3 import ProductionP3
+from src.productions.p4 import ProductionP4
+from src.productions.p5 import ProductionP5
+from tests.graphs import get_2x2_grid_graph, get_graph_with_shared_edge_marked_simple
+
+
+def test_p3_registers_midpoint_of_split_edge():
+    graph = get_graph_with_shared_edge_marked_simple()
+    assert graph.get_midpoint(1, 2) is None
+
+    graph = ProductionP3().apply(graph)
+
+    midpoint = graph.get_midpoint(2, 1)
+    assert midpoint is not None
+    assert midpoint.uid == "E_shared_v"
+
+
+def test_p4_registers_midpoint_of_boundary_edge():
+    graph = get_2x2_grid_graph()
+    graph.update_hyperedge("E1", r=1)
+
+    graph = ProductionP4().apply(graph, target_id="E1")
+
+    midpoint = graph.get_midpoint(1, 2)
+    assert midpoint is not None
+    assert (midpoint.x, midpoint.y) == (0.5, 0.0)
+
+
+def _element_with_unregistered_midpoints():
+    # Boki podzielone ręcznie - środki są tylko w topologii, nie w rejestrze
+    graph = get_2x2_grid_graph()
+    graph.update_hyperedge("Q1", r=1)
+    q1 = [v.uid for v in graph.get_hyperedge_vertices("Q1")]
+    corners = sorted(q1, key=lambda uid: graph.get_vertex(uid).x + 10 * graph.get_vertex(uid).y)
+    corners[2], corners[3] = corners[3], corners[2]
+    for i, v1 in enumerate(corners):
+        v2 = corners[(i + 1) % 4]
+        a, b = graph.get_vertex(v1), graph.get_vertex(v2)
+        mid = f"m{i}"
+        graph.add_vertex(Vertex(uid=mid, x=(a.x + b.x) / 2, y=(a.y + b.y) / 2, hanging=True))
+        for k, end in enumerate((v1, v2)):
+            graph.add_hyperedge(Hyperedge(uid=f"E{mid}{k}", label="E", r=0, b=0))
+            graph.connect(f"E{mid}{k}", mid)
+            graph.connect(f"E{mid}{k}", end)
+    return graph, corners
+
+
+def test_find_lhs_does_not_register_midpoints():
+    graph, corners = _element_with_unregistered_midpoints()
+
+    assert [he.uid for he in ProductionP5().find_lhs(graph)] == ["Q1"]
+    assert graph._midpoints == {}
+
+    # Rejestr wypełnia dopiero podział elementu
+    ProductionP5().apply(graph)
+    for i, v1 in enumerate(corners):
+        assert graph.get_midpoint(v1, corners[(i + 1) % 4]).uid == f"m{i}"
+
+
+def test_registered_midpoint_is_invalidated_by_topology_changes():
+    graph = get_graph_with_shared_edge_marked_simple()
+    graph = ProductionP3().apply(graph)
+
+    # Bez krawędzi E do narożnika wpis nie jest już ważnym podziałem
+    graph.remove_edge("E_shared_e1", 1)
+    assert graph.get_midpoint(1, 2) is None
+    graph.connect("E_shared_e1", 1)
+    assert graph.get_midpoint(1, 2).uid == "E_shared_v"
+
+    graph.remove_node("E_shared_v")
+    assert graph.get_midpoint(1, 2) is None
+    assert graph._midpoints == {}
+
+
+def test_register_midpoint_requires_vertices():
+    graph = get_2x2_grid_graph()
+    graph.add_vertex(Vertex(uid="m", x=0.5, y=0.0))
+
+    with pytest.raises(ValueError):
+        graph.register_midpoint(1, "E1", "m")
+
+
+def _with_duplicate_shared_edge():
+    # Każdy element ma własną kopię wspólnej krawędzi (1, 2), obie oznaczone
+    graph = get_graph_with_shared_edge_marked_simple()
+    graph.add_hyperedge(Hyperedge(uid="E_twin", label="E", r=1, b=0))
+    graph.connect("E_twin", 1)
+    graph.connect("E_twin", 2)
+    return graph
+
+
+def test_p3_reuses_midpoint_from_coordinate_registry():
+    graph = _with_duplicate_shared_edge()
+    graph.enable_vertex_dedup()
+    ProductionP3().apply(graph)
+
+    at_midpoint = [v for v in graph.nodes() if isinstance(v, Vertex) and (v.x, v.y) == (1.0, 0.0)]
+    assert [v.uid for v in at_midpoint] == ["E_shared_v"]
+    # Połówki krawędzi nie są dublowane
+    assert len(graph.get_hyperedges_between_vertices(1, "E_shared_v", label="E")) == 1
+    assert len(graph.get_hyperedges_between_vertices("E_shared_v", 2, label="E")) == 1
+    assert graph.get_midpoint(1, 2).uid == "E_shared_v"
+
+    # Bez rejestru każda kopia krawędzi dostaje własny wierzchołek
+    graph = _with_duplicate_shared_edge()
+    ProductionP3().apply(graph)
+    assert graph.get_vertex("E_twin_v").x == graph.get_vertex("E_shared_v").x
+
+
+def test_p4_reuses_vertex_at_midpoint():
+    graph = get_2x2_grid_graph()
+    graph.enable_vertex_dedup()
+    graph.add_vertex(Vertex(uid=100, x=0.5, y=0.0, hanging=False))
+    graph.update_hyperedge("E1", r=1)
+
+    ProductionP4().apply(graph, target_id="E1")
+
+    assert graph.get_midpoint(1, 2).uid == 100
+
+
+def test_p4_reuses_midpoint_from_coordinate_registry():
+    # Dwie kopie krawędzi brzegowej (1, 2), obie oznaczone
+    graph = get_2x2_grid_graph()
+    graph.update_hyperedge("E1", r=1)
+    graph.add_hyperedge(Hyperedge(uid="E_twin", label="E", r=1, b=1))
+    graph.connect("E_twin", 1)
+    graph.connect("E_twin", 2)
+    graph.enable_vertex_dedup()
+    graph.add_vertex(Vertex(uid=100, x=0.5, y=0.0, hanging=True))
+
+    ProductionP4().apply(graph)
+
+    at_midpoint = [v for v in graph.nodes() if isinstance(v, Vertex) and (v.x, v.y) == (0.5, 0.0)]
+    assert graph.find_hyperedges(label="E", r=1) == []
+    assert [v.uid for v in at_midpoint] == [100]
+    # Środek krawędzi brzegowej nie wisi, a połówki krawędzi nie są dublowane
+    assert graph.get_vertex(100).hanging is False
+    assert len(graph.get_hyperedges_between_vertices(1, 100, label="E")) == 1
+    assert len(graph.get_hyperedges_between_vertices(100, 2, label="E")) == 1
+    assert graph.get_midpoint(1, 2).uid == 100
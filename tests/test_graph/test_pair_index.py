@@ -0,0 +1,76 @@
+import pytest
+
+from src.elements import Hyperedge
+from tests.graphs import get_2x2_grid_graph
+
+
+def _uids(hyperedges):
+    return {h.uid for h in hyperedges}
+
+
+def test_hyperedges_between_vertices_from_pair_index():
+    graph = get_2x2_grid_graph()
+
+    # Krawędź współdzielona 4-5: oba czworokąty i krawędź E9
+    assert _uids(graph.get_hyperedges_between_vertices(4, 5)) == {"Q1", "Q3", "E9"}
+    assert _uids(graph.get_hyperedges_between_vertices(5, 4, label="E")) == {"E9"}
+    assert _uids(graph.get_hyperedges_between_vertices(4, 5, label="Q")) == {"Q1", "Q3"}
+
+    # Przekątna - tylko wnętrze
+    assert _uids(graph.get_hyperedges_between_vertices(1, 5)) == {"Q1"}
+    assert graph.get_hyperedges_between_vertices(1, 5, label="E") == []
+
+    # Wierzchołki bez wspólnych hiperkrawędzi
+    assert graph.get_hyperedges_between_vertices(1, 9) == []
+
+
+def test_pair_index_follows_mutations():
+    graph = get_2x2_grid_graph()
+
+    graph.remove_edge("E9", 4)
+    assert graph.get_hyperedges_between_vertices(4, 5, label="E") == []
+    graph.connect(4, "E9")
+    assert _uids(graph.get_hyperedges_between_vertices(4, 5, label="E")) == {"E9"}
+
+    graph.update_hyperedge("E9", label="X")
+    assert graph.get_hyperedges_between_vertices(4, 5, label="E") == []
+    assert _uids(graph.get_hyperedges_between_vertices(4, 5, label="X")) == {"E9"}
+
+    graph.remove_node("Q1")
+    assert _uids(graph.get_hyperedges_between_vertices(1, 5)) == set()
+    assert _uids(graph.get_hyperedges_between_vertices(4, 5)) == {"Q3", "E9"}
+
+    graph.remove_node(5)
+    assert _uids(graph.get_hyperedges_between_vertices(4, 8)) == {"Q3"}
+    assert _uids(graph.get_hyperedges_between_vertices(4, 7)) == {"Q3", "E7"}
+
+    graph.add_hyperedge(Hyperedge(uid="E_new", label="E"))
+    graph.connect("E_new", 1)
+    graph.connect("E_new", 9)
+    assert _uids(graph.get_hyperedges_between_vertices(9, 1, label="E")) == {"E_new"}
+
+
+def test_add_hyperedges_indexes_pairs_like_connect():
+    bulk = get_2x2_grid_graph()
+    bulk.add_hyperedges(
+        [
+            (Hyperedge(uid="E_a", label="E"), [1, 9]),
+            (Hyperedge(uid="Q_a", label="Q"), [1, 3, 9, 7]),
+        ]
+    )
+    serial = get_2x2_grid_graph()
+    for uid, label, vertices in (("E_a", "E", [1, 9]), ("Q_a", "Q", [1, 3, 9, 7])):
+        serial.add_hyperedge(Hyperedge(uid=uid, label=label))
+        for v in vertices:
+            serial.connect(uid, v)
+
+    assert bulk._pair_index == serial._pair_index
+    assert _uids(bulk.get_hyperedges_between_vertices(3, 7)) == {"Q_a"}
+    assert {v.uid for v in bulk.get_hyperedge_vertices("Q_a")} == {1, 3, 7, 9}
+
+
+def test_add_hyperedges_requires_vertices():
+    graph = get_2x2_grid_graph()
+    with pytest.raises(ValueError):
+        graph.add_hyperedges([(Hyperedge(uid="E_a", label="E"), [1, "Q1"])])
+    assert "E_a" not in graph
@@ -0,0 +1,134 @@
+import gc
+
+import pytest
+
+from src import marking
+from src.elements import Vertex
+from src.engine import RefinementEngine
+from src.productions.p0 import ProductionP0
+from tests.graphs import get_grid_graph
+
+
+def _state(graph):
+    nodes = []
+    for node in graph.nodes():
+        if isinstance(node, Vertex):
+            attrs = (node.x, node.y, node.hanging, graph.vertex_index(node.uid))
+        else:
+            attrs = (node.label, node.r, node.b)
+        neighbors = sorted(map(str, graph._storage.neighbors(node.uid)))
+        nodes.append((node.uid, attrs, neighbors, graph.lineage(node.uid)))
+    return nodes, [h.uid for h in graph.find_hyperedges(r=0)], graph.coords.tolist()
+
+
+def _refine(graph, box):
+    RefinementEngine().run(graph, seeds=marking.mark(graph, marking.in_box(*box)))
+
+
+def test_variants_match_independent_graphs_and_leave_base_intact():
+    base = get_grid_graph(5)
+    before = _state(base)
+
+    for box in [(1, 1, 2, 2), (0, 0, 5, 5)]:
+        variant = base.snapshot()
+        _refine(variant, box)
+        nested = variant.snapshot()
+        _refine(nested, (2, 2, 4, 4))
+
+        expected = get_grid_graph(5)
+        _refine(expected, box)
+        assert _state(variant) == _state(expected)
+        _refine(expected, (2, 2, 4, 4))
+        assert _state(nested) == _state(expected)
+
+        nested.release()
+        variant.release()
+        assert _state(base) == before
+
+
+def test_base_is_read_only_while_snapshots_live():
+    base = get_grid_graph(2)
+    q1 = base.get_hyperedge("Q1")
+    corner = base.get_hyperedge_vertices("Q1")[0]
+    variant = base.snapshot()
+
+    assert base.read_only
+    with pytest.raises(ValueError):
+        base.update_hyperedge("Q1", r=1)
+    with pytest.raises(ValueError):
+        q1.r = 1
+    assert q1.r == 0 and base.find_hyperedges(label="Q", r=1) == []
+    with pytest.raises(ValueError):
+        corner.x = 10.0
+
+    with pytest.raises(ValueError):
+        base.release()
+    nested = variant.snapshot()
+    with pytest.raises(ValueError):
+        variant.release()
+    nested.release()
+    variant.release()
+
+    assert not base.read_only
+    q1.r = 1
+    corner.x = 10.0
+    assert base.find_hyperedges(label="Q", r=1) == [q1]
+
+
+def test_dropped_snapshot_releases_base_without_gc():
+    base = get_grid_graph(3)
+    gc.disable()
+    try:
+        variant = base.snapshot()
+        variant.update_hyperedge("Q1", r=1)
+        variant.update_vertex(1, x=0.25)
+        marking.mark(variant, marking.in_box(0, 0, 1, 1))
+        RefinementEngine().run(variant)
+        nested = variant.snapshot()
+        del nested, variant
+        # Bez gc.collect() - migawka nie może trzymać się przez cykl referencji
+        assert not base.read_only
+        base.update_hyperedge("Q1", r=1)
+    finally:
+        gc.enable()
+
+
+def test_snapshot_copies_only_written_nodes():
+    base = get_grid_graph(6)
+    variant = base.snapshot()
+
+    assert len(list(variant.nodes())) == len(base)
+    assert ProductionP0().find_lhs(variant) != []
+    assert variant._storage._objects == {}
+    assert variant._pair_index._local == {} and variant._label_index._local == {}
+
+    q1 = variant.get_hyperedge("Q1")
+    assert q1 is base.get_hyperedge("Q1")
+    with pytest.raises(ValueError):
+        q1.r = 1
+    variant.update_hyperedge("Q1", r=1)
+    v = variant.get_hyperedge_vertices("Q1")[0]
+    variant.update_vertex(v.uid, x=v.x + 0.25)
+
+    assert variant.get_hyperedge("Q1") is not q1
+    assert [h.uid for h in variant.find_hyperedges(label="Q", r=1)] == ["Q1"]
+    assert base.get_hyperedge("Q1").r == 0
+    assert variant.get_vertex(v.uid).x == base.get_vertex(v.uid).x + 0.25
+    assert set(variant._storage._objects) == {"Q1", v.uid}
+
+
+def test_many_snapshots_of_one_base():
+    base = get_grid_graph(4)
+    variants = [base.snapshot() for _ in range(3)]
+
+    for variant, box in zip(variants, [(0, 0, 1, 1), (1, 1, 3, 3), (0, 0, 4, 4)]):
+        _refine(variant, box)
+        expected = get_grid_graph(4)
+        _refine(expected, box)
+        assert _state(variant) == _state(expected)
+
+    for variant in variants:
+        variant.release()
+    assert not base.read_only
+    with pytest.raises(ValueError):
+        variants[0].snapshot()
@@ -0,0 +1 @@
+# Marking tests
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from benchmarks.bench_engine import _signature
+from src import marking
+from src.engine import RefinementEngine
+from src.events import HyperedgeChanged
+from src.productions.p0 import ProductionP0
+from tests.graphs import get_grid_graph
+
+
+def _marked(graph):
+    return [h.uid for h in graph.find_hyperedges(r=1)]
+
+
+def test_mark_everything_matches_p0():
+    bulk = get_grid_graph(4)
+    serial = get_grid_graph(4)
+
+    marked = marking.mark(bulk, lambda arrays: np.ones(len(arrays), dtype=bool))
+    ProductionP0().apply(serial)
+
+    assert marked == _marked(serial) == _marked(bulk)
+    assert bulk.find_hyperedges(label="Q", r=0) == []
+
+
+def test_region_predicates():
+    graph = get_grid_graph(4)
+
+    # Środki ciężkości elementów siatki 4x4: (i + 0.5, j + 0.5)
+    assert marking.select(graph, marking.in_box(0, 0, 2, 2)) == ["Q1", "Q2", "Q5", "Q6"]
+    assert marking.select(graph, marking.overlaps_box(3.5, 3.5, 9, 9)) == ["Q16"]
+    assert marking.select(graph, marking.in_circle(2, 2, 0.8)) == ["Q6", "Q7", "Q10", "Q11"]
+    both = marking.all_of(marking.in_box(0, 0, 2, 2), marking.in_circle(2, 2, 0.8))
+    assert marking.select(graph, both) == ["Q6"]
+    either = marking.any_of(marking.in_box(0, 0, 1, 1), marking.overlaps_box(3.5, 3.5, 9, 9))
+    assert marking.select(graph, either) == ["Q1", "Q16"]
+
+
+def test_error_indicator():
+    graph = get_grid_graph(3)
+    errors = np.zeros(len(graph._interner))
+    errors[graph.uid_index("Q5")] = 0.9
+    errors[graph.uid_index("Q7")] = 0.2
+
+    assert marking.mark(graph, marking.error_above(errors, 0.5)) == ["Q5"]
+    assert marking.select(graph, marking.error_above({"Q7": 0.2, "Q8": 0.7}, 0.1)) == ["Q7", "Q8"]
+    assert graph.get_hyperedge("Q5").r == 1
+
+
+def test_level_predicate_after_refinement():
+    graph = get_grid_graph(3)
+    marking.mark(graph, marking.in_box(1, 1, 2, 2))
+    RefinementEngine().run(graph)
+
+    fine = marking.select(graph, marking.at_level(1))
+    assert len(fine) == 4
+    assert all(graph.level(uid) == 1 for uid in fine)
+    assert len(marking.select(graph, marking.below_level(1))) == 8
+
+
+def test_mark_then_engine_matches_p0():
+    bulk = get_grid_graph(5)
+    seeds = marking.mark(bulk, marking.in_circle(2.5, 2.5, 1.2))
+    RefinementEngine().run(bulk, seeds=seeds)
+
+    serial = get_grid_graph(5)
+    ProductionP0().apply(serial, target_id=seeds)
+    RefinementEngine().run(serial)
+
+    assert _signature(bulk) == _signature(serial)
+
+
+def test_mark_emits_changes_in_one_transaction():
+    graph = get_grid_graph(2)
+    events = []
+    graph.subscribe(events.append)
+
+    marking.mark(graph, marking.in_box(0, 0, 2, 1))
+
+    assert events == [
+        HyperedgeChanged("Q1", ("Q", 0, 0), ("Q", 1, 0)),
+        HyperedgeChanged("Q2", ("Q", 0, 0), ("Q", 1, 0)),
+    ]
+    assert [h.uid for h in graph.find_hyperedges(label="Q", r=0)] == ["Q3", "Q4"]
+
+
+def test_verify_uses_marking_production():
+    graph = get_grid_graph(2)
+    # Bok między wierzchołkami 1 i 2 przestaje być krawędzią E - P0 nie pasuje do Q1
+    graph.update_hyperedge("E1", label="X")
+
+    everything = marking.in_box(-1, -1, 3, 3)
+    assert marking.select(graph, everything) == ["Q1", "Q2", "Q3", "Q4"]
+    assert marking.mark(graph, everything, verify=True) == ["Q2", "Q3", "Q4"]
+
+
+def test_invalid_input():
+    graph = get_grid_graph(2)
+    with pytest.raises(ValueError):
+        marking.select(graph, lambda arrays: np.ones(3, dtype=bool))
+    with pytest.raises(ValueError):
+        marking.element_arrays(graph, labels=["E"])
@@ -0,0 +1 @@
+# Parallel matching tests
@@ -0,0 +1,131 @@
+import pytest
+
+from src.elements import Vertex
+from src.packed import PackedGraph
+from src.parallel import ParallelMatcher
+from src.productions.p0 import ProductionP0
+from src.productions.p1 import ProductionP1
+from src.productions.p2 import ProductionP2
+from src.productions.p3 import ProductionP3
+from src.productions.p5 import ProductionP5
+from src.storage import BACKEND_SETS
+from tests.graphs import get_grid_graph
+
+
+def _marked_grid(n, targets):
+    graph = get_grid_graph(n)
+    for uid in targets:
+        ProductionP0().apply(graph, target_id=uid)
+    return graph
+
+
+def test_candidate_scope_limits_find_hyperedges():
+    graph = get_grid_graph(2)
+
+    with graph.candidate_scope(["Q3", "E1", "Q1", "Q3", "missing"]):
+        assert [h.uid for h in graph.find_hyperedges()] == ["Q1", "Q3", "E1"]
+        assert [h.uid for h in graph.find_hyperedges(label="Q")] == ["Q1", "Q3"]
+
+    assert len(graph.find_hyperedges(label="Q")) == 4
+
+
+def test_find_lhs_in_candidate_scope():
+    graph = _marked_grid(3, ["Q2", "Q5", "Q9"])
+
+    with graph.candidate_scope(["Q9", "Q1", "Q2"]):
+        matches = ProductionP1().find_lhs(graph)
+
+    assert [m.uid for m in matches] == ["Q2", "Q9"]
+
+
+def test_packed_round_trip():
+    graph = _marked_grid(3, ["Q5"])
+    ProductionP1().apply(graph)
+    ProductionP2().apply(graph)
+
+    packed = PackedGraph.from_graph(graph)
+    rebuilt = packed.to_graph(backend=BACKEND_SETS)
+
+    assert [n.uid for n in rebuilt.nodes()] == [n.uid for n in graph.nodes()]
+    for node in graph.nodes():
+        other = rebuilt.get_node(node.uid)
+        if isinstance(node, Vertex):
+            assert (other.x, other.y, other.hanging) == (node.x, node.y, node.hanging)
+        else:
+            assert (other.label, other.r, other.b) == (node.label, node.r, node.b)
+        assert set(rebuilt._storage.neighbors(node.uid)) == set(
+            graph._storage.neighbors(node.uid)
+        )
+    assert rebuilt._midpoints == graph._midpoints
+
+
+def test_packed_from_buffer_is_a_view():
+    graph = get_grid_graph(2)
+    packed = PackedGraph.from_graph(graph)
+    layout, size = packed.layout()
+    buffer = bytearray(size)
+    packed.write_into(buffer, layout)
+
+    loaded = PackedGraph.from_buffer(buffer, layout, packed.labels)
+
+    assert loaded.uids() == packed.uids()
+    assert not loaded.arrays["indices"].flags.owndata
+
+
+def test_packed_view_matches_graph_without_rebuilding_it():
+    graph = _marked_grid(4, ["Q1", "Q6", "Q7", "Q16"])
+    ProductionP1().apply(graph)
+    ProductionP2().apply(graph)
+    ProductionP3().apply(graph)
+
+    view = PackedGraph.from_graph(graph).view()
+    assert view._storage._objects == {}
+    assert not view._storage.arrays["indices"].flags.writeable
+
+    for production in [ProductionP0(), ProductionP1(), ProductionP2(), ProductionP5()]:
+        expected = [production.match_node(m).uid for m in production.find_lhs(graph)]
+        assert [production.match_node(m).uid for m in production.find_lhs(view)] == expected
+    assert view.get_midpoint(1, 2) == graph.get_midpoint(1, 2)
+
+    # Zawężone dopasowanie tworzy obiekty tylko dla odczytanych węzłów
+    view = PackedGraph.from_graph(graph).view()
+    with view.candidate_scope(["Q6"]):
+        assert [m.uid for m in ProductionP5().find_lhs(view)] == ["Q6"]
+    assert 0 < len(view._storage._objects) < len(graph) // 4
+
+    with pytest.raises(ValueError):
+        view.update_hyperedge("Q6", r=0)
+    with pytest.raises(ValueError):
+        view.get_hyperedge("Q6").r = 0
+
+
+@pytest.mark.parametrize("production", [ProductionP1(), ProductionP5()])
+def test_parallel_find_lhs_matches_serial(production):
+    graph = _marked_grid(4, ["Q1", "Q6", "Q7", "Q16"])
+
+    with ParallelMatcher(graph, processes=2) as matcher:
+        parallel = matcher.find_lhs(production)
+
+    assert parallel == production.find_lhs(graph)
+
+
+def test_parallel_snapshot_refreshes_after_change():
+    graph = _marked_grid(3, ["Q1"])
+
+    with ParallelMatcher(graph, processes=2) as matcher:
+        assert [m.uid for m in matcher.find_lhs(ProductionP1())] == ["Q1"]
+        ProductionP0().apply(graph, target_id="Q4")
+        assert [m.uid for m in matcher.find_lhs(ProductionP1())] == ["Q1", "Q4"]
+
+    assert not graph._subscribers
+
+
+def test_compare_reports_identical_results():
+    graph = _marked_grid(3, ["Q2", "Q8"])
+
+    with ParallelMatcher(graph, processes=2) as matcher:
+        reports = matcher.compare([ProductionP1(), ProductionP2()])
+
+    assert [r.production for r in reports] == ["ProductionP1", "ProductionP2"]
+    assert all(r.identical for r in reports)
+    assert reports[0].matches == 2
@@ -0,0 +1 @@
+# Production base class tests
@@ -0,0 +1,111 @@
+from src.elements import Vertex
+from src.graph import Graph
+from src.productions.p1 import ProductionP1
+from src.productions.p3 import ProductionP3
+from src.productions.p5 import ProductionP5
+from src.productions.production import Production
+from tests.graphs import get_grid_graph
+
+
+def _signature(graph: Graph):
+    vertices = sorted(
+        (v.x, v.y, v.hanging) for _, v in graph._storage.nodes() if isinstance(v, Vertex)
+    )
+    hyperedges = sorted(
+        (h.label, h.r, h.b, tuple(sorted((v.x, v.y) for v in graph.get_hyperedge_vertices(h.uid))))
+        for h in graph.find_hyperedges()
+    )
+    return vertices, hyperedges
+
+
+def _grid_with_marked_inner_edges(n):
+    graph = get_grid_graph(n)
+    for edge in graph.find_hyperedges(label="E", b=0):
+        edge.r = 1
+    return graph
+
+
+class _ClaimNeighbourEdges(Production):
+    """Testowa produkcja: krawędź E z R=1 zeruje R wszystkim krawędziom E ze wspólnym wierzchołkiem."""
+
+    LHS_LABEL = "E"
+
+    def find_lhs(self, graph, target_id=None):
+        return [
+            he
+            for he in graph.find_hyperedges(label="E", r=1)
+            if target_id is None or he.uid == target_id
+        ]
+
+    def footprint(self, graph, match):
+        reads, writes = super().footprint(graph, match)
+        return reads, reads - {v.uid for v in graph.get_hyperedge_vertices(match.uid)}
+
+    def apply_rhs(self, graph, match):
+        self.applied.append(match.uid)
+        for v in graph.get_hyperedge_vertices(match.uid):
+            for he in graph.get_vertex_hyperedges(v.uid):
+                if he.label == "E":
+                    he.r = 0
+
+
+def test_batched_apply_matches_serial_result():
+    serial = _grid_with_marked_inner_edges(4)
+    ProductionP3().apply(serial)
+
+    batched = _grid_with_marked_inner_edges(4)
+    matches = ProductionP3().find_lhs(batched)
+    stats = ProductionP3().apply_batched(batched, matches)
+
+    assert _signature(batched) == _signature(serial)
+    assert stats.applied == len(matches) == 24
+    # Krawędzie ze wspólnym wierzchołkiem czytają się nawzajem - kilka zbiorów
+    assert 1 < stats.groups < len(matches)
+    assert stats.dropped == 0
+
+
+def test_independent_element_splits_form_one_group():
+    graph = get_grid_graph(3)
+    for q in graph.find_hyperedges(label="Q"):
+        q.r = 1
+    graph = ProductionP1().apply(graph)
+    graph = ProductionP3().apply(graph)
+    # P5 wymaga wiszących środków na wszystkich bokach - tylko element środkowy
+    matches = ProductionP5().find_lhs(graph)
+    assert [m.uid for m in matches] == ["Q5"]
+
+    stats = ProductionP5().apply_batched(graph, matches)
+    assert (stats.groups, stats.applied) == (1, 1)
+
+
+def test_p1_on_neighbours_is_split_into_groups():
+    graph = get_grid_graph(2)
+    for q in graph.find_hyperedges(label="Q"):
+        q.r = 1
+    matches = ProductionP1().find_lhs(graph)
+    stats = ProductionP1().apply_batched(graph, matches)
+
+    # Każdy element zapisuje krawędź czytaną przez pozostałe (wspólny wierzchołek 5)
+    assert stats.groups == 4
+    assert all(edge.r == 1 for edge in graph.find_hyperedges(label="E"))
+
+
+def test_matches_invalidated_by_earlier_group_are_dropped():
+    graph = get_grid_graph(1, 3)
+    # Lewy bok kolumny trzech elementów: E5 - E7 - E9, kolejne mają wspólny wierzchołek
+    for uid in ("E5", "E7", "E9"):
+        graph.update_hyperedge(uid, r=1)
+
+    production = _ClaimNeighbourEdges()
+    production.applied = []
+    stats = production.apply_batched(graph, production.find_lhs(graph))
+
+    # E5 zeruje E7, więc E7 odpada przy ponownym sprawdzeniu; E9 nadal pasuje
+    assert production.applied == ["E5", "E9"]
+    assert (stats.groups, stats.applied, stats.revalidated, stats.dropped) == (3, 2, 2, 1)
+
+
+def test_apply_with_batched_flag():
+    graph = _grid_with_marked_inner_edges(2)
+    ProductionP3().apply(graph, batched=True)
+    assert graph.find_hyperedges(label="E", r=1) == []
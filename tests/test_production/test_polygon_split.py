@@ -0,0 +1,118 @@
+import math
+
+import pytest
+
+from src.elements import Hyperedge, Vertex
+from src.engine import RefinementEngine
+from src.graph import Graph
+from src.productions.p0 import ProductionP0
+from src.productions.p1 import ProductionP1
+from src.productions.p3 import ProductionP3
+from src.productions.p5 import ProductionP5
+from src.productions.p8 import ProductionP8
+from src.productions.p11 import ProductionP11
+from src.productions.p14 import ProductionP14
+from src.productions.polygon_split import PolygonSplit
+from tests.graphs import get_grid_graph
+
+
+def _polygon_with_split_edges(n, label):
+    """Element n-kątny (R=1) na okręgu jednostkowym z wiszącymi środkami wszystkich boków."""
+    graph = Graph()
+    for i in range(n):
+        angle = 2 * math.pi * i / n
+        graph.add_vertex(Vertex(i + 1, math.cos(angle), math.sin(angle)))
+    graph.add_hyperedge(Hyperedge(f"{label}1", label, r=1))
+    for i in range(n):
+        graph.connect(f"{label}1", i + 1)
+        a, b = graph.get_vertex(i + 1), graph.get_vertex((i + 1) % n + 1)
+        mid = 100 + i
+        graph.add_vertex(Vertex(mid, (a.x + b.x) / 2, (a.y + b.y) / 2, hanging=True))
+        for k, corner in enumerate((a.uid, b.uid)):
+            graph.add_hyperedge(Hyperedge(f"E{2 * i + k + 1}", "E", b=1))
+            graph.connect(f"E{2 * i + k + 1}", corner)
+            graph.connect(f"E{2 * i + k + 1}", mid)
+    return graph
+
+
+def _state(graph):
+    return sorted(
+        (h.uid, h.label, sorted(str(v.uid) for v in graph.get_hyperedge_vertices(h.uid)))
+        for h in graph.find_hyperedges()
+    ), sorted((str(v.uid), v.x, v.y) for v in graph.nodes() if isinstance(v, Vertex))
+
+
+def test_productions_are_polygon_splits():
+    productions = [ProductionP5(), ProductionP8(), ProductionP11(), ProductionP14()]
+    assert all(isinstance(p, PolygonSplit) for p in productions)
+    assert [(p.ARITY, p.LHS_LABEL) for p in productions] == [(4, "Q"), (5, "P"), (6, "Q"), (7, "Q")]
+    with pytest.raises(ValueError):
+        PolygonSplit(arity=2)
+
+
+@pytest.mark.parametrize("n", [3, 4, 5, 8])
+def test_generic_split(n):
+    graph = _polygon_with_split_edges(n, "S")
+    parent = graph.uid_index("S1")
+
+    PolygonSplit(arity=n, label="S").apply(graph)
+
+    assert "S1" not in graph
+    quads = graph.find_hyperedges(label="Q")
+    assert len(quads) == n
+    assert all(len(graph.get_hyperedge_vertices(q.uid)) == 4 for q in quads)
+    assert [graph.lineage(q.uid) for q in quads] == [(parent, i, 1) for i in range(n)]
+
+    center = graph.vertex_at_index(len(graph.coords) - 1)
+    assert graph.lineage(center.uid) == (parent, n, 1)
+    assert center.x == pytest.approx(0.0) and center.y == pytest.approx(0.0)
+    inner = [e for e in graph.find_hyperedges(label="E") if graph.level(e.uid) == 1]
+    assert len(inner) == n
+    assert all(center in graph.get_hyperedge_vertices(e.uid) for e in inner)
+
+
+def test_wrong_arity_is_rejected():
+    graph = _polygon_with_split_edges(6, "Q")
+    assert ProductionP5().find_lhs(graph) == []
+    assert [m.uid for m in ProductionP11().find_lhs(graph)] == ["Q1"]
+
+
+def test_batched_split_matches_one_by_one():
+    def prepared():
+        graph = get_grid_graph(4)
+        ProductionP0().apply(graph)
+        ProductionP1().apply(graph)
+        ProductionP3().apply(graph)
+        return graph
+
+    serial = prepared()
+    matches = ProductionP5().find_lhs(serial)
+    assert len(matches) == 4  # elementy wewnętrzne (brzegowe środki nie są wiszące)
+    for match in matches:
+        ProductionP5().apply_rhs(serial, match)
+
+    batched = prepared()
+    stats = ProductionP5().apply_batched(batched, ProductionP5().find_lhs(batched))
+
+    assert (stats.groups, stats.applied, stats.dropped) == (1, 4, 0)
+    assert _state(batched) == _state(serial)
+
+
+def test_engine_applies_split_once_per_round():
+    graph = get_grid_graph(4)
+    ProductionP0().apply(graph)
+    ProductionP1().apply(graph)
+    ProductionP3().apply(graph)
+
+    report = RefinementEngine([ProductionP5()]).run(graph)
+    # Jedno find_lhs na rundę: podział i runda sprawdzająca nowe elementy
+    assert (report.applications, report.lhs_calls) == (4, 2)
+
+    graph = get_grid_graph(4)
+    ProductionP0().apply(graph)
+    ProductionP1().apply(graph)
+    ProductionP3().apply(graph)
+    report = RefinementEngine([ProductionP5()], max_applications=3).run(graph)
+    assert not report.converged
+    assert report.applications == 3
+    assert len(graph.find_hyperedges(label="Q", r=1)) == 16 - 3
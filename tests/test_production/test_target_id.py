@@ -0,0 +1,55 @@
+from src.productions.p0 import ProductionP0
+from src.productions.p1 import ProductionP1
+from src.productions.p3 import ProductionP3
+from tests.graphs import get_grid_graph
+
+
+class _NoFullScan(dict):
+    """Indeks etykiet, którego nie wolno przeglądać (pełny skan find_hyperedges)."""
+
+    def items(self):
+        raise AssertionError("find_lhs z target_id przeglądał cały indeks etykiet")
+
+
+def test_single_target_marks_only_that_element():
+    graph = get_grid_graph(3)
+
+    ProductionP0().apply(graph, target_id="Q5")
+
+    assert [h.uid for h in graph.find_hyperedges(label="Q", r=1)] == ["Q5"]
+
+
+def test_list_of_targets():
+    graph = get_grid_graph(3)
+
+    ProductionP0().apply(graph, target_id=["Q9", "Q1", "Q5"])
+
+    assert [h.uid for h in graph.find_hyperedges(label="Q", r=1)] == ["Q1", "Q5", "Q9"]
+
+
+def test_target_not_matching_lhs_is_ignored():
+    graph = get_grid_graph(2)
+    ProductionP0().apply(graph, target_id="Q1")
+
+    # Q1 ma już R=1, E1 ma zła etykietę, "X" nie istnieje
+    assert ProductionP0().find_lhs(graph, target_id=["Q1", "E1", "X"]) == []
+    assert [h.uid for h in ProductionP1().find_lhs(graph, target_id=["Q1", "Q2"])] == ["Q1"]
+
+
+def test_targeted_find_lhs_does_not_scan_graph():
+    graph = get_grid_graph(4)
+    graph.get_hyperedge("E5").r = 1
+    graph._label_index = _NoFullScan(graph._label_index)
+
+    matches = ProductionP3().find_lhs(graph, target_id="E5")
+
+    assert [m.uid for m in matches] == ["E5"]
+
+
+def test_positional_target_id():
+    graph = get_grid_graph(3)
+
+    assert [h.uid for h in ProductionP0().find_lhs(graph, "Q1")] == ["Q1"]
+    ProductionP0().apply(graph, "Q1")
+
+    assert [h.uid for h in graph.find_hyperedges(label="Q", r=1)] == ["Q1"]
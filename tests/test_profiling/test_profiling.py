@@ -0,0 +1,103 @@
+import io
+import json
+
+import pytest
+
+from src import profiling
+from src.graph import Graph
+from src.productions.p0 import ProductionP0
+from src.productions.p1 import ProductionP1
+from src.productions.production import Production
+from tests.graphs import get_grid_graph
+
+
+def test_methods_restored_after_profiling():
+    original_neighbors = Graph.__dict__["get_neighbors"]
+    original_find = ProductionP0.__dict__["find_lhs"]
+
+    with profiling.profiling() as prof:
+        assert profiling.active() is prof
+        assert Graph.__dict__["get_neighbors"] is not original_neighbors
+
+    assert profiling.active() is None
+    assert Graph.__dict__["get_neighbors"] is original_neighbors
+    assert ProductionP0.__dict__["find_lhs"] is original_find
+
+
+def test_counts_and_self_time():
+    graph = get_grid_graph(2)
+
+    with profiling.profiling() as prof:
+        ProductionP0().apply(graph, target_id="Q1")
+        ProductionP1().apply(graph)
+
+    stats = prof.to_dict()
+    assert stats["ProductionP0.find_lhs"]["calls"] == 1
+    assert stats["ProductionP0.apply_rhs"]["calls"] == 1
+    assert stats["ProductionP1.apply_rhs"]["calls"] == 1
+    assert stats["Graph.get_hyperedge_vertices"]["calls"] > 0
+
+    find = stats["ProductionP1.find_lhs"]
+    assert find["self_s"] <= find["total_s"]
+    assert find["p50_s"] <= find["p99_s"]
+
+    table = prof.table()
+    assert table.splitlines()[0].startswith("funkcja")
+    assert "ProductionP1.find_lhs" in table
+
+
+def test_measures_productions_defined_inside_the_block():
+    graph = get_grid_graph(2)
+
+    with profiling.profiling() as prof:
+
+        class LateProduction(Production):
+            def find_lhs(self, graph, target_id=None):
+                return graph.find_hyperedges(label="Q")
+
+            def apply_rhs(self, graph, match):
+                graph.update_hyperedge(match.uid, r=1)
+
+        LateProduction().apply(graph, batched=True)
+
+    stats = prof.to_dict()
+    assert stats["LateProduction.find_lhs"]["calls"] == 1
+    assert stats["LateProduction.apply_batched"]["calls"] == 1
+    assert stats["LateProduction.apply_rhs"]["calls"] == 4
+
+    LateProduction().apply(graph)
+    assert prof.stats["LateProduction.find_lhs"].calls == 1
+
+
+def test_nested_time_is_not_self_time():
+    graph = get_grid_graph(2)
+
+    with profiling.profiling() as prof:
+        graph.get_neighbors(5)
+
+    outer = prof.stats["Graph.get_neighbors"]
+    inner = prof.stats["Graph.get_hyperedge_vertices"]
+    assert outer.calls == 1 and inner.calls > 0
+    assert outer.self_time == pytest.approx(outer.total - inner.total)
+
+
+def test_chrome_trace():
+    graph = get_grid_graph(2)
+
+    with profiling.profiling() as prof:
+        ProductionP0().apply(graph)
+
+    stream = io.StringIO()
+    prof.dump_chrome_trace(stream)
+    trace = json.loads(stream.getvalue())
+
+    events = trace["traceEvents"]
+    assert len(events) == sum(s.calls for s in prof.stats.values())
+    assert {e["ph"] for e in events} == {"X"}
+    assert any(e["name"] == "ProductionP0.apply_rhs" for e in events)
+    assert all(e["dur"] >= 0 and e["ts"] >= 0 for e in events)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        profiling.Profiler(graph_methods=["no_such_method"])
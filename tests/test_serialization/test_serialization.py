@@ -0,0 +1,66 @@
+import pytest
+
+from src import marking
+from src.elements import Vertex
+from src.engine import RefinementEngine
+from src.serialization import load_graph, load_packed, save_graph
+from src.storage import BACKEND_NETWORKX, BACKEND_SETS
+from tests.graphs import get_grid_graph
+
+
+def _refined_grid():
+    graph = get_grid_graph(6)
+    RefinementEngine().run(graph, seeds=marking.mark(graph, marking.in_circle(3, 3, 2)))
+    return graph
+
+
+@pytest.mark.parametrize("backend", [BACKEND_NETWORKX, BACKEND_SETS])
+def test_round_trip(tmp_path, backend):
+    graph = _refined_grid()
+    path = tmp_path / "mesh.gg"
+    save_graph(graph, path)
+
+    loaded = load_graph(path, backend=backend)
+
+    assert [n.uid for n in loaded.nodes()] == [n.uid for n in graph.nodes()]
+    for node in graph.nodes():
+        other = loaded.get_node(node.uid)
+        if isinstance(node, Vertex):
+            assert (other.x, other.y, other.hanging) == (node.x, node.y, node.hanging)
+        else:
+            assert (other.label, other.r, other.b) == (node.label, node.r, node.b)
+            assert set(loaded._hyperedge_vertex_ids(node.uid)) == set(
+                graph._hyperedge_vertex_ids(node.uid)
+            )
+    assert loaded._midpoints == graph._midpoints
+    assert loaded.ids.counters == graph.ids.counters
+    assert loaded._pair_index.keys() == graph._pair_index.keys()
+
+
+def test_loaded_graph_refines_like_the_original(tmp_path):
+    graph = _refined_grid()
+    path = tmp_path / "mesh.gg"
+    save_graph(graph, path)
+    loaded = load_graph(path)
+
+    for g in (graph, loaded):
+        RefinementEngine().run(g, seeds=marking.mark(g, marking.in_box(0, 0, 2, 6)))
+
+    assert sorted(map(str, (n.uid for n in loaded.nodes()))) == sorted(
+        map(str, (n.uid for n in graph.nodes()))
+    )
+
+
+def test_packed_arrays_are_read_only_views_on_the_file(tmp_path):
+    path = tmp_path / "mesh.gg"
+    save_graph(get_grid_graph(2), path)
+
+    packed = load_packed(path)
+
+    assert len(packed) == 9 + 16
+    assert not packed.arrays["xy"].flags.writeable
+    assert not packed.arrays["indices"].flags.owndata
+
+    path.write_bytes(b"not a mesh at all")
+    with pytest.raises(ValueError):
+        load_packed(path)
@@ -0,0 +1 @@
+# Spatial index tests
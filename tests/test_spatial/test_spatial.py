@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from src import marking
+from src.elements import Vertex
+from src.engine import RefinementEngine
+from src.spatial import SpatialIndex
+from tests.graphs import get_grid_graph
+
+
+def _brute_nearest(graph, x, y):
+    vertices = [graph.vertex_at_index(i) for i in range(len(graph.coords))]
+    return min(vertices, key=lambda v: ((v.x - x) ** 2 + (v.y - y) ** 2, graph.uid_index(v.uid)))
+
+
+def test_range_queries_on_grid():
+    graph = get_grid_graph(4)
+    with SpatialIndex(graph) as index:
+        assert [(v.x, v.y) for v in index.vertices_in_box(0.5, 0.5, 2, 1)] == [(1, 1), (2, 1)]
+        assert [h.uid for h in index.elements_in_box(3.5, 3.5, 9, 9)] == ["Q16"]
+        assert len(index.elements_in_box(-1, -1, 9, 9)) == 16
+
+
+def test_nearest_vertex_matches_brute_force():
+    graph = get_grid_graph(5)
+    rng = random.Random(0)
+    with SpatialIndex(graph) as index:
+        for _ in range(50):
+            x, y = rng.uniform(-3, 8), rng.uniform(-3, 8)
+            assert index.nearest_vertex(x, y) == _brute_nearest(graph, x, y)
+
+
+def test_index_follows_graph_changes():
+    graph = get_grid_graph(3)
+    with SpatialIndex(graph) as index:
+        v = index.vertex_at(1, 1)
+        assert v is not None
+
+        graph.update_vertex(v.uid, x=10, y=10)
+        assert index.vertex_at(1, 1) is None
+        assert index.nearest_vertex(9, 9).uid == v.uid
+
+        graph.add_vertex(Vertex(uid=graph.ids.next_vertex_uid(), x=9.5, y=9.5, hanging=False))
+        assert index.nearest_vertex(9, 9).uid != v.uid
+
+        graph.remove_node(v.uid)
+        assert v.uid not in {u.uid for u in index.vertices_in_box(-100, -100, 100, 100)}
+
+
+def test_point_location_after_refinement():
+    graph = get_grid_graph(4)
+    marking.mark(graph, marking.in_box(1, 1, 2, 2))
+    with SpatialIndex(graph) as index:
+        RefinementEngine().run(graph)
+        rng = random.Random(1)
+        for _ in range(100):
+            x, y = rng.uniform(0, 4), rng.uniform(0, 4)
+            expected = [
+                h.uid
+                for h in graph.find_hyperedges()
+                if h.label != "E" and index._contains(h.uid, x, y)
+            ]
+            assert [h.uid for h in index.elements_at(x, y)] == expected
+            assert len(expected) == 1
+
+        element = index.locate(1.3, 1.3)
+        assert graph.level(element.uid) == 1
+        assert index.locate(50, 50) is None
+
+
+def test_rebuild_on_growth_and_invalid_cell_size():
+    graph = get_grid_graph(2)
+    with SpatialIndex(graph, cell_size=1.0) as index:
+        for i in range(40):
+            graph.add_vertex(Vertex(uid=graph.ids.next_vertex_uid(), x=i * 0.05, y=0.5, hanging=False))
+        assert len(index.vertices_in_box(0, 0.4, 2, 0.6)) == 40
+        assert index._built_size > 9
+
+    with pytest.raises(ValueError):
+        SpatialIndex(graph, cell_size=0)
@@ -0,0 +1,83 @@
+import io
+import json
+
+from src import tracing
+from src.engine import RefinementEngine
+from src.productions.p0 import ProductionP0
+from src.productions.p1 import ProductionP1
+from src.productions.p5 import ProductionP5
+from tests.graphs import get_grid_graph
+
+
+def test_disabled_by_default():
+    assert tracing.active() is None
+
+    with tracing.tracing() as trace:
+        assert tracing.active() is trace
+
+    assert tracing.active() is None
+
+
+def test_productions_do_not_print(capsys):
+    graph = get_grid_graph(3)
+
+    ProductionP0().apply(graph, target_id="Q5")
+    RefinementEngine().run(graph)
+
+    assert capsys.readouterr().out == ""
+
+
+def test_counts_matches_and_rhs():
+    graph = get_grid_graph(3)
+
+    with tracing.tracing() as trace:
+        ProductionP0().apply(graph, target_id=["Q1", "Q5"])
+        ProductionP1().apply(graph)
+
+    p0 = trace.productions["ProductionP0"]
+    assert (p0.find_lhs_calls, p0.matches, p0.rhs_calls) == (1, 2, 2)
+    assert p0.rhs_time > 0
+    assert trace.productions["ProductionP1"].matches == 2
+
+
+def test_engine_run_records_batched_splits():
+    graph = get_grid_graph(3)
+
+    with tracing.tracing() as trace:
+        ProductionP0().apply(graph, target_id="Q5")
+        RefinementEngine().run(graph)
+
+    # P5 dzieli elementy przez apply_batched, z pominięciem apply_rhs
+    p5 = trace.productions["ProductionP5"]
+    assert (p5.matches, p5.rhs_calls) == (1, 0)
+    assert (p5.batch_calls, p5.batch_matches, p5.batch_applied) == (1, 1, 1)
+    assert p5.batch_time > 0
+    assert trace.to_dict()["productions"]["ProductionP5"]["batch"]["applied"] == p5.batch_applied
+
+
+def test_rejection_reasons():
+    graph = get_grid_graph(2)
+    for uid in ("Q1", "Q2"):
+        graph.get_hyperedge(uid).r = 1
+
+    with tracing.tracing() as trace:
+        assert ProductionP5().find_lhs(graph) == []
+
+    # Żadna krawędź elementów nie jest jeszcze podzielona
+    assert trace.productions["ProductionP5"].rejections == {"unbroken_edge": 2}
+
+
+def test_dump_json():
+    graph = get_grid_graph(2)
+    with tracing.tracing() as trace:
+        ProductionP0().apply(graph, target_id="Q1")
+
+    out = io.StringIO()
+    trace.dump_json(out)
+    data = json.loads(out.getvalue())
+
+    p0 = data["productions"]["ProductionP0"]
+    assert p0["matches"] == 1
+    assert p0["rhs"]["calls"] == 1
+    assert p0["batch"]["calls"] == 0
+    assert p0["rejections"] == {}